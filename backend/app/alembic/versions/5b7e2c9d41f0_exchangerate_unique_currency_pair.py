@@ -0,0 +1,51 @@
+"""Unique currency pair and wider rate on exchangerate
+
+Revision ID: 5b7e2c9d41f0
+Revises: 1a31ce608336
+Create Date: 2026-10-18 09:12:41.503217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e2c9d41f0'
+down_revision = '1a31ce608336'
+branch_labels = None
+depends_on = None
+
+
+def _has_exchangerate_table():
+    return sa.inspect(op.get_bind()).has_table('exchangerate')
+
+
+def upgrade():
+    if not _has_exchangerate_table():
+        return
+    # Keep the most recently updated row per pair before adding the constraint
+    op.execute(
+        """
+        DELETE FROM exchangerate a
+        USING exchangerate b
+        WHERE a.base_currency_id = b.base_currency_id
+          AND a.target_currency_id = b.target_currency_id
+          AND (a.last_updated, a.id) < (b.last_updated, b.id)
+        """
+    )
+    op.create_unique_constraint(
+        'uq_exchangerate_base_target', 'exchangerate', ['base_currency_id', 'target_currency_id']
+    )
+    op.alter_column('exchangerate', 'rate',
+               existing_type=sa.Numeric(precision=10, scale=7),
+               type_=sa.Numeric(precision=20, scale=10))
+
+
+def downgrade():
+    if not _has_exchangerate_table():
+        return
+    op.alter_column('exchangerate', 'rate',
+               existing_type=sa.Numeric(precision=20, scale=10),
+               type_=sa.Numeric(precision=10, scale=7))
+    op.drop_constraint('uq_exchangerate_base_target', 'exchangerate', type_='unique')
@@ -0,0 +1,33 @@
+"""Composite (created_at, id) index for keyset pagination of services
+
+Revision ID: 7c3d9a1e5b24
+Revises: 5b7e2c9d41f0
+Create Date: 2026-10-18 14:03:27.118642
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3d9a1e5b24'
+down_revision = '5b7e2c9d41f0'
+branch_labels = None
+depends_on = None
+
+
+def _has_service_table():
+    return sa.inspect(op.get_bind()).has_table('service')
+
+
+def upgrade():
+    if not _has_service_table():
+        return
+    op.create_index('ix_service_created_at_id', 'service', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    if not _has_service_table():
+        return
+    op.drop_index('ix_service_created_at_id', table_name='service')
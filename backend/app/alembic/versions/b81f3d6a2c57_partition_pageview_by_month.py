@@ -0,0 +1,118 @@
+"""Partition pageview by month on timestamp and add hourly/daily rollup tables
+
+Revision ID: b81f3d6a2c57
+Revises: 7c3d9a1e5b24
+Create Date: 2026-10-18 17:41:09.302115
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81f3d6a2c57'
+down_revision = '7c3d9a1e5b24'
+branch_labels = None
+depends_on = None
+
+# Partitions created ahead of the current month; the maintenance task keeps
+# extending this (see app.services.pageview_service)
+PARTITIONS_AHEAD = 2
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _create_partition(month: datetime) -> None:
+    upper = _add_months(month, 1)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS pageview_y{month:%Y}m{month:%m} PARTITION OF pageview "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+    )
+
+
+def _create_pageview(partition_by: str | None) -> None:
+    kwargs = {'postgresql_partition_by': partition_by} if partition_by else {}
+    op.create_table(
+        'pageview',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('url', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column('user_agent', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id']),
+        sa.PrimaryKeyConstraint('id', 'timestamp') if partition_by else sa.PrimaryKeyConstraint('id'),
+        **kwargs,
+    )
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('user'):
+        return
+
+    existing = inspector.has_table('pageview')
+    if existing:
+        op.rename_table('pageview', 'pageview_unpartitioned')
+        op.execute('ALTER TABLE pageview_unpartitioned RENAME CONSTRAINT pageview_pkey TO pageview_unpartitioned_pkey')
+
+    _create_pageview('RANGE (timestamp)')
+    op.create_index('ix_pageview_timestamp', 'pageview', ['timestamp'], unique=False)
+
+    current = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    first = current
+    if existing:
+        oldest = op.get_bind().execute(sa.text('SELECT min(timestamp) FROM pageview_unpartitioned')).scalar()
+        if oldest is not None:
+            first = min(first, datetime(oldest.year, oldest.month, 1))
+    month = first
+    while month <= _add_months(current, PARTITIONS_AHEAD):
+        _create_partition(month)
+        month = _add_months(month, 1)
+
+    if existing:
+        op.execute(
+            'INSERT INTO pageview (id, user_id, url, user_agent, timestamp) '
+            'SELECT id, user_id, url, user_agent, timestamp FROM pageview_unpartitioned'
+        )
+        op.drop_table('pageview_unpartitioned')
+
+    op.create_table(
+        'pageviewurlrollup',
+        sa.Column('grain', sqlmodel.sql.sqltypes.AutoString(length=8), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('url', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('grain', 'bucket', 'url'),
+    )
+    op.create_table(
+        'pageviewuserrollup',
+        sa.Column('grain', sqlmodel.sql.sqltypes.AutoString(length=8), nullable=False),
+        sa.Column('bucket', sa.DateTime(), nullable=False),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('views', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('grain', 'bucket', 'user_id'),
+    )
+
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('pageview'):
+        return
+    op.drop_table('pageviewuserrollup')
+    op.drop_table('pageviewurlrollup')
+
+    op.rename_table('pageview', 'pageview_partitioned')
+    op.execute('ALTER TABLE pageview_partitioned RENAME CONSTRAINT pageview_pkey TO pageview_partitioned_pkey')
+    _create_pageview(None)
+    op.execute(
+        'INSERT INTO pageview (id, user_id, url, user_agent, timestamp) '
+        'SELECT id, user_id, url, user_agent, timestamp FROM pageview_partitioned'
+    )
+    # Drops every monthly partition with it
+    op.drop_table('pageview_partitioned')
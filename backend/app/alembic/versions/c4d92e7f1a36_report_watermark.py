@@ -0,0 +1,35 @@
+"""Report watermarks and record created_at index
+
+Revision ID: c4d92e7f1a36
+Revises: b81f3d6a2c57
+Create Date: 2026-10-18 19:22:54.610381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d92e7f1a36'
+down_revision = 'b81f3d6a2c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'reportwatermark',
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=64), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    if sa.inspect(op.get_bind()).has_table('record'):
+        op.create_index('ix_record_created_at', 'record', ['created_at'], unique=False)
+
+
+def downgrade():
+    if sa.inspect(op.get_bind()).has_table('record'):
+        op.drop_index('ix_record_created_at', table_name='record')
+    op.drop_table('reportwatermark')
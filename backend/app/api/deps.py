@@ -1,4 +1,4 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 from typing import Annotated
 
 import jwt
@@ -7,10 +7,12 @@ from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
 from pydantic import ValidationError
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core import security
 from app.core.config import settings
-from app.core.db import engine
+from app.core.db import AsyncSessionLocal, engine
+from app.core.user_cache import CachedUser, user_cache
 from app.models import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -21,21 +23,27 @@ def get_db() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        yield session
+
 SessionDep = Annotated[Session, Depends(get_db)]
+AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_db)]
 TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
-def get_current_user(session: SessionDep, token: TokenDep) -> User:
+def _decode_token(token: str) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+        return TokenPayload(**payload)
     except (InvalidTokenError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = session.get(User, token_data.sub)
+
+def _check_user(user: User | CachedUser | None) -> None:
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -46,13 +54,46 @@ def get_current_user(session: SessionDep, token: TokenDep) -> User:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
+
+def _cache_user(user: User, generation: int) -> CachedUser:
+    cached = CachedUser(id=user.id, is_active=user.is_active, is_superuser=user.is_superuser)
+    user_cache.put(str(user.id), cached, generation=generation)
+    return cached
+
+def get_current_user(session: SessionDep, token: TokenDep) -> User:
+    token_data = _decode_token(token)
+    generation = user_cache.generation()
+    user = session.get(User, token_data.sub)
+    _check_user(user)
+    _cache_user(user, generation)
     return user
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
-def get_current_active_superuser(current_user: CurrentUser) -> User:
+def get_current_principal(session: SessionDep, token: TokenDep) -> CachedUser:
+    """
+    Resolve the caller from the user cache, only loading the row on a miss.
+
+    Use this instead of ``CurrentUser`` when the route only needs the id and
+    the active/superuser flags.
+    """
+    token_data = _decode_token(token)
+    cached = user_cache.get(str(token_data.sub))
+    if cached is None:
+        generation = user_cache.generation()
+        user = session.get(User, token_data.sub)
+        _check_user(user)
+        return _cache_user(user, generation)
+    _check_user(cached)
+    return cached
+
+
+CurrentPrincipal = Annotated[CachedUser, Depends(get_current_principal)]
+
+
+def get_current_active_superuser(current_user: CurrentPrincipal) -> CachedUser:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -9,6 +9,7 @@ from app.api.routes import (
     items,
     login,
     mongo,
+    notifications,
     otp,
     pageviews,
     payments,
@@ -17,6 +18,7 @@ from app.api.routes import (
     roles,
     services,
     settings,
+    social,
     theme,
     userRoles,
     users,
@@ -32,6 +34,7 @@ api_router.include_router(ipAddresses.router, prefix="/ipAddress", tags=["ipAddr
 api_router.include_router(items.router, prefix="/items", tags=["Items"])
 api_router.include_router(login.router, tags=["Login"])
 api_router.include_router(mongo.router, prefix="/mongo", tags=["Mongo"])
+api_router.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
 api_router.include_router(otp.router, prefix="/otp", tags=["OTP"])
 api_router.include_router(pageviews.router, prefix="/pageviews", tags=["PageViews"])
 api_router.include_router(payments.router, prefix="/payments", tags=["Payments"])
@@ -40,6 +43,7 @@ api_router.include_router(profiles.router, prefix="/settings/profiles", tags=["P
 api_router.include_router(roles.router, prefix="/settings/roles", tags=["Roles"])
 api_router.include_router(services.router, prefix="/services", tags=["Services"])
 api_router.include_router(settings.router, prefix="/settings", tags=["Settings"])
+api_router.include_router(social.router, prefix="/social", tags=["Social"])
 api_router.include_router(theme.router, prefix="/theme", tags=["Theme"])
 api_router.include_router(userRoles.router, prefix="/userRoles", tags=["UserRoles"])
 api_router.include_router(users.router, prefix="/users", tags=["Users"])
@@ -1,60 +1,73 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlmodel import Session
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
 from app.models import Currency
 from app.schemas.currencySchema import (
     CurrencyCreate,
     CurrencyRead,
     CurrencyUpdate,
 )
-from app.api.deps import get_db
+from app.api.deps import AsyncSessionDep
+from app.api.streaming import ExportFormat, export_response
+from app.core.route_cache import CachedRoute, cached, invalidates
 from typing import List
 import uuid
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 # Get all currencies
 @router.get("/", response_model=List[CurrencyRead])
-async def get_all_currencies(session: Session = Depends(get_db)):
-    currencies = session.query(Currency).all()
-    return currencies
+@cached(ttl=3600, tags=["currencies"])
+async def get_all_currencies(session: AsyncSessionDep):
+    currencies = await session.exec(select(Currency))
+    return currencies.all()
+
+# Stream all currencies as NDJSON or CSV
+@router.get("/export")
+async def export_currencies(format: ExportFormat = ExportFormat.ndjson) -> StreamingResponse:
+    return export_response(select(Currency).order_by(Currency.iso_code), CurrencyRead, format, "currencies")
 
 # Get currency by ID
 @router.get("/{currency_id}", response_model=CurrencyRead)
-async def get_currency(currency_id: uuid.UUID, session: Session = Depends(get_db)):
-    currency = session.get(Currency, currency_id)
+@cached(ttl=3600, tags=["currencies"])
+async def get_currency(currency_id: uuid.UUID, session: AsyncSessionDep):
+    currency = await session.get(Currency, currency_id)
     if not currency:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Currency not found")
     return currency
 
 # Create a new currency
 @router.post("/", response_model=CurrencyRead, status_code=status.HTTP_201_CREATED)
-async def create_currency(currency_data: CurrencyCreate, session: Session = Depends(get_db)):
-    currency = Currency.form_orm(currency_data)
+@invalidates("currencies")
+async def create_currency(currency_data: CurrencyCreate, session: AsyncSessionDep):
+    currency = Currency.model_validate(currency_data)
     session.add(currency)
-    session.commit()
-    session.refresh(currency)
+    await session.commit()
+    await session.refresh(currency)
     return currency
 
 # Update currency by ID
 @router.put("/{currency_id}", response_model=CurrencyRead)
-async def update_currency(currency_id: uuid.UUID, currency_data: CurrencyUpdate, session: Session = Depends(get_db)):
-    existing_currency = session.get(Currency, currency_id)
+@invalidates("currencies")
+async def update_currency(currency_id: uuid.UUID, currency_data: CurrencyUpdate, session: AsyncSessionDep):
+    existing_currency = await session.get(Currency, currency_id)
     if not existing_currency:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Currency not found")
     update_data = currency_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(existing_currency, field, value)
     session.add(existing_currency)
-    session.commit()
-    session.refresh(existing_currency)
+    await session.commit()
+    await session.refresh(existing_currency)
     return existing_currency
 
 # Delete currency by ID
 @router.delete("/{currency_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_currency(currency_id: uuid.UUID, session: Session = Depends(get_db)):
-    currency = session.get(Currency, currency_id)
+@invalidates("currencies")
+async def delete_currency(currency_id: uuid.UUID, session: AsyncSessionDep):
+    currency = await session.get(Currency, currency_id)
     if not currency:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Currency not found")
-    session.delete(currency)
-    session.commit()
+    await session.delete(currency)
+    await session.commit()
     return {"detail": "Currency deleted"}
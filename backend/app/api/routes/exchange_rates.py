@@ -1,31 +1,82 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session
 
 from app.core.db import get_database_session
+from app.core.route_cache import CachedRoute, cached, invalidates
 from app.models import ExchangeRate
 from app.schemas.exchangeRateSchema import (
+    BatchConversionCreateSchema,
+    BatchConversionReadSchema,
+    ConversionReadSchema,
     ExchangeRateCreateSchema,
     ExchangeRateUpdateSchema,
 )
-from app.services.exchange_rate_service import ExchangeRateService
+from app.services.exchange_rate_service import ExchangeRateService, exchange_rate_matrix
 from app.workers.celery_worker import celery_worker as celery_app
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 # Dependency to provide the service
-@router.get("/exchange-rates")
 def get_exchange_rate_service(db_session: Session = Depends(get_database_session)):
-    return db_session.exec(ExchangeRate).all()
+    return ExchangeRateService(db_session=db_session, celery_app=celery_app)
+
+# Convert an amount between two currencies
+# (declared before "/{exchange_rate_id}" so "convert" is not parsed as an id)
+@router.get("/convert", response_model=ConversionReadSchema)
+def convert_amount(
+    from_currency: str = Query(..., alias="from", min_length=3, max_length=3),
+    to_currency: str = Query(..., alias="to", min_length=3, max_length=3),
+    amount: float = Query(...),
+    service: ExchangeRateService = Depends(get_exchange_rate_service),
+) -> ConversionReadSchema:
+    """
+    Convert an amount using the in-memory cross-rate matrix.
+    """
+    try:
+        rate, converted = service.convert(from_currency, to_currency, amount)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    return ConversionReadSchema(
+        from_currency=from_currency.upper(),
+        to_currency=to_currency.upper(),
+        rate=rate,
+        amount=amount,
+        converted_amount=converted,
+    )
+
+# Convert many amounts between two currencies in one call
+@router.post("/convert/batch", response_model=BatchConversionReadSchema)
+def convert_amounts(
+    conversion: BatchConversionCreateSchema,
+    service: ExchangeRateService = Depends(get_exchange_rate_service),
+) -> BatchConversionReadSchema:
+    """
+    Convert a batch of amounts with one vectorized lookup.
+    """
+    try:
+        rate, converted = service.convert_many(
+            conversion.from_currency, conversion.to_currency, conversion.amounts
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+    return BatchConversionReadSchema(
+        from_currency=conversion.from_currency.upper(),
+        to_currency=conversion.to_currency.upper(),
+        rate=rate,
+        converted_amounts=converted,
+    )
 
 # Get all exchange rates
 @router.get("/", response_model=list[ExchangeRate])
+@cached(ttl=300, tags=["exchange-rates"])
 async def get_all_exchange_rates(service: ExchangeRateService = Depends(get_exchange_rate_service)):
     return service.get_all_exchange_rates()
 
 # Get exchange rate by ID
 @router.get("/{exchange_rate_id}", response_model=ExchangeRate)
+@cached(ttl=300, tags=["exchange-rates"])
 async def get_exchange_rate_by_id(
     exchange_rate_id: uuid.UUID,
     service: ExchangeRateService = Depends(get_exchange_rate_service),
@@ -43,6 +94,7 @@ async def get_exchange_rate_by_id(
 
 # Create a new exchange rate
 @router.post("/", response_model=ExchangeRate, status_code=status.HTTP_201_CREATED)
+@invalidates("exchange-rates")
 async def create_exchange_rate(
     exchange_rate_data: ExchangeRateCreateSchema,
     service: ExchangeRateService = Depends(get_exchange_rate_service),
@@ -54,6 +106,7 @@ async def create_exchange_rate(
 
 # Update exchange rate by ID
 @router.put("/{exchange_rate_id}", response_model=ExchangeRate)
+@invalidates("exchange-rates")
 async def update_exchange_rate(
     exchange_rate_id: uuid.UUID,
     exchange_rate_data: ExchangeRateUpdateSchema,
@@ -72,6 +125,7 @@ async def update_exchange_rate(
 
 # Delete exchange rate by ID
 @router.delete("/{exchange_rate_id}", status_code=status.HTTP_204_NO_CONTENT)
+@invalidates("exchange-rates")
 async def delete_exchange_rate(
     exchange_rate_id: uuid.UUID,
     service: ExchangeRateService = Depends(get_exchange_rate_service),
@@ -87,11 +141,15 @@ async def delete_exchange_rate(
     return {"detail": "Exchange rate deleted"}
 
 @router.post("/update", status_code=status.HTTP_202_ACCEPTED)
-def update_exchange_rates(service: ExchangeRateService = Depends(get_exchange_rate_service)):
+@invalidates("exchange-rates")
+async def update_exchange_rates(service: ExchangeRateService = Depends(get_exchange_rate_service)):
     """
     Update all exchange rates from the external API.
     """
-    service.update_exchange_rates()
+    written = await service.update_exchange_rates_async()
+    if not written:
+        return {"message": "Exchange rates unchanged"}
+    exchange_rate_matrix.publish_update()
     return {"message": "Exchange rates updated successfully"}
 
 
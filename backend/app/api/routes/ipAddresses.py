@@ -2,10 +2,14 @@
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 
+from app import crud
 from app.api.deps import get_db  # Assuming you have a dependency to manage sessions
+from app.api.streaming import ExportFormat, export_response
 from app.core.db import engine
+from app.core.pagination import CountMode
 from app.models import GeoLocation, IPAddress
 from app.schemas.ipvSchema import (
     GeoLocationCreateSchema,
@@ -13,6 +17,7 @@ from app.schemas.ipvSchema import (
     GeoLocationUpdateSchema,
     IPAddressCreateSchema,
     IPAddressDetailSchema,
+    IPAddressPageSchema,
     IPAddressReadSchema,
     IPAddressUpdateSchema,
 )
@@ -41,26 +46,19 @@ def read_ip_address(*, db: Session = Depends(get_db), ip_address_id: int):
         raise HTTPException(status_code=404, detail="IP address not found")
     return ip_address
 
-# Get a list of all IP addresses with optional filtering by city or country
-@router.get("/", response_model=list[IPAddressReadSchema])
+# Get a page of IP addresses with optional filtering by city or country
+@router.get("/", response_model=IPAddressPageSchema)
 def read_ip_addresses(
     *,
     db: Session = Depends(get_db),
-    skip: int = 0,
     limit: int = 100,
-    city_id: int | None,
-    country_id: int | None
+    cursor: str | None = None,
+    city_id: int | None = None,
+    country_id: int | None = None,
+    count: CountMode = CountMode.none,
 ):
-    query = select(IPAddress)
-
-    # Apply filters if provided
-    if city_id:
-        query = query.where(IPAddress.city_id == city_id)
-    if country_id:
-        query = query.where(IPAddress.country_id == country_id)
-
-    results = db.exec(query.offset(skip).limit(limit)).all()
-    return results
+    page = crud.get_all_ip_addresses(db, limit, cursor, city_id, country_id, count)
+    return IPAddressPageSchema(data=page.data, count=page.count, next_cursor=page.next_cursor)
 
 # Update an IP address
 @router.put("/{ip_address_id}", response_model=IPAddressReadSchema)
@@ -95,6 +93,11 @@ def delete_ip_address(*, db: Session = Depends(get_db), ip_address_id: int):
     return None
 
 # GeoLocation
+# Stream all geo locations as NDJSON or CSV
+@router.get("/geo-locations/export")
+async def export_geo_locations(format: ExportFormat = ExportFormat.ndjson) -> StreamingResponse:
+    return export_response(select(GeoLocation).order_by(GeoLocation.id), GeoLocationReadSchema, format, "geo_locations")
+
 @router.get("/", response_model=list[GeoLocationReadSchema])
 async def get_all_geo_locations(session: Session = Depends(get_db)):
     locations = session.query(GeoLocation).all()
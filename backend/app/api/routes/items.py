@@ -1,48 +1,44 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException, status
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Query, status
+from sqlmodel import select
 
-from app.api.deps import CurrentUser, SessionDep
+from app.api.deps import CurrentPrincipal, SessionDep
+from app.core.pagination import CountMode, KeysetPaginator
 from app.models import Item, ItemCreate, ItemPublic, ItemsPublic, ItemUpdate, Message
 
 router = APIRouter()
 
+item_paginator = KeysetPaginator(Item.id)
+
 
 @router.get("/", response_model=ItemsPublic)
 def read_items(
-    session: SessionDep, current_user: CurrentUser, skip: int = 0, limit: int = 100
+    session: SessionDep,
+    current_user: CurrentPrincipal,
+    limit: int = 100,
+    cursor: str | None = None,
+    count: CountMode = CountMode.none,
+    skip: int | None = Query(default=None, ge=0, deprecated=True),
 ) -> Any:
     """
-    Retrieve items.
+    Retrieve items, one keyset page at a time: pass `next_cursor` back as `cursor`.
+    `skip` still pages by offset, with the exact count, for older clients.
     """
 
-    if current_user.is_superuser:
-        count_statement = select(func.count()).select_from(Item)
-        count = session.exec(count_statement).one()
-        statement = select(Item).offset(skip).limit(limit)
-        items = session.exec(statement).all()
-    else:
-        count_statement = (
-            select(func.count())
-            .select_from(Item)
-            .where(Item.owner_id == current_user.id)
-        )
-        count = session.exec(count_statement).one()
-        statement = (
-            select(Item)
-            .where(Item.owner_id == current_user.id)
-            .offset(skip)
-            .limit(limit)
-        )
-        items = session.exec(statement).all()
+    statement = select(Item)
+    if not current_user.is_superuser:
+        statement = statement.where(Item.owner_id == current_user.id)
+    if skip is not None and count == CountMode.none:
+        count = CountMode.exact
+    page = item_paginator.paginate(session, statement, limit, cursor, count, offset=skip)
 
-    return ItemsPublic(data=items, count=count)
+    return ItemsPublic(data=page.data, count=page.count, next_cursor=page.next_cursor)
 
 
 @router.get("/{id}", response_model=ItemPublic)
-def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) -> Any:
+def read_item(session: SessionDep, current_user: CurrentPrincipal, id: uuid.UUID) -> Any:
     """
     Get item by ID.
     """
@@ -62,7 +58,7 @@ def read_item(session: SessionDep, current_user: CurrentUser, id: uuid.UUID) ->
 
 @router.post("/", response_model=ItemPublic)
 def create_item(
-    *, session: SessionDep, current_user: CurrentUser, item_in: ItemCreate
+    *, session: SessionDep, current_user: CurrentPrincipal, item_in: ItemCreate
 ) -> Any:
     """
     Create new item.
@@ -78,7 +74,7 @@ def create_item(
 def update_item(
     *,
     session: SessionDep,
-    current_user: CurrentUser,
+    current_user: CurrentPrincipal,
     id: uuid.UUID,
     item_in: ItemUpdate,
 ) -> Any:
@@ -106,7 +102,7 @@ def update_item(
 
 @router.delete("/{id}")
 def delete_item(
-    session: SessionDep, current_user: CurrentUser, id: uuid.UUID
+    session: SessionDep, current_user: CurrentPrincipal, id: uuid.UUID
 ) -> Message:
     """
     Delete an item.
@@ -7,15 +7,21 @@ from fastapi.responses import HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 
 from app import crud
-from app.api.deps import CurrentUser, SessionDep, get_current_active_superuser
+from app.api.deps import (
+    AsyncSessionDep,
+    CurrentUser,
+    SessionDep,
+    get_current_active_superuser,
+)
 from app.core import security
 from app.core.config import settings
-from app.core.security import get_password_hash
+from app.core.password_hasher import password_hasher
+from app.core.user_cache import user_cache
 from app.models import Message, NewPassword, Token, UserPublic
 from app.utils import (
     generate_password_reset_token,
     generate_reset_password_email,
-    send_email,
+    queue_email,
     verify_password_reset_token,
 )
 
@@ -25,13 +31,13 @@ router = APIRouter()
 LOGGER = logging.getLogger(__name__)
 
 @router.post("/login/access-token")
-def login_access_token(
-    session: SessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
+async def login_access_token(
+    session: AsyncSessionDep, form_data: Annotated[OAuth2PasswordRequestForm, Depends()]
 ) -> Token:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = crud.authenticate(
+    user = await crud.aauthenticate(
         session=session, email=form_data.username, password=form_data.password
     )
     if not user:
@@ -76,7 +82,7 @@ def recover_password(email: str, session: SessionDep) -> Message:
     email_data = generate_reset_password_email(
         email_to=user.email, email=email, token=password_reset_token
     )
-    send_email(
+    queue_email(
         email_to=user.email,
         subject=email_data.subject,
         html_content=email_data.html_content,
@@ -85,7 +91,7 @@ def recover_password(email: str, session: SessionDep) -> Message:
 
 
 @router.post("/reset-password/")
-def reset_password(session: SessionDep, body: NewPassword) -> Message:
+async def reset_password(session: AsyncSessionDep, body: NewPassword) -> Message:
     """
     Reset password
     """
@@ -95,7 +101,7 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid token"
         )
-    user = crud.get_user_by_email(session=session, email=email)
+    user = await crud.aget_user_by_email(session=session, email=email)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -106,10 +112,11 @@ def reset_password(session: SessionDep, body: NewPassword) -> Message:
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
-    hashed_password = get_password_hash(password=body.new_password)
+    hashed_password = await password_hasher.hash(body.new_password)
     user.hashed_password = hashed_password
     session.add(user)
-    session.commit()
+    await session.commit()
+    await user_cache.ainvalidate(user.id)
     return Message(message="Password updated successfully")
 
 
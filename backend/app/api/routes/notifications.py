@@ -0,0 +1,81 @@
+from typing import Any
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import CurrentPrincipal
+from app.core.db import get_mongodb
+from app.schemas.notificationSchema import (
+    NotificationPageSchema,
+    NotificationReadSchema,
+    UnreadCountSchema,
+)
+from app.services.notification_service import NotificationService
+
+router = APIRouter()
+
+def get_notification_service(mongodb: Any = Depends(get_mongodb)) -> NotificationService:
+    return NotificationService(db=mongodb)
+
+def _object_id(value: str | None, name: str) -> ObjectId | None:
+    if value is None:
+        return None
+    try:
+        return ObjectId(value)
+    except InvalidId:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid {name} cursor")
+
+# Current user's inbox, newest first
+@router.get("/", response_model=NotificationPageSchema)
+async def list_notifications(
+    principal: CurrentPrincipal,
+    limit: int = Query(20, ge=1, le=100),
+    before: str | None = None,
+    after: str | None = None,
+    unread_only: bool = False,
+    service: NotificationService = Depends(get_notification_service),
+) -> NotificationPageSchema:
+    if before is not None and after is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Use either before or after, not both")
+    page = await service.list_notifications(
+        str(principal.id),
+        limit=limit,
+        before=_object_id(before, "before"),
+        after=_object_id(after, "after"),
+        unread_only=unread_only,
+    )
+    return NotificationPageSchema(
+        data=[NotificationReadSchema.from_document(doc) for doc in page["data"]],
+        before=page["before"],
+        after=page["after"],
+    )
+
+# Unread badge count
+@router.get("/unread-count", response_model=UnreadCountSchema)
+async def unread_count(
+    principal: CurrentPrincipal,
+    service: NotificationService = Depends(get_notification_service),
+) -> UnreadCountSchema:
+    return UnreadCountSchema(unread=await service.get_unread_count(str(principal.id)))
+
+# Mark all as read
+@router.post("/read-all", response_model=UnreadCountSchema)
+async def mark_all_read(
+    principal: CurrentPrincipal,
+    service: NotificationService = Depends(get_notification_service),
+) -> UnreadCountSchema:
+    await service.mark_all_as_read(str(principal.id))
+    return UnreadCountSchema(unread=0)
+
+# Mark one as read; repeating it is a no-op
+@router.post("/{notification_id}/read", response_model=UnreadCountSchema)
+async def mark_read(
+    notification_id: str,
+    principal: CurrentPrincipal,
+    service: NotificationService = Depends(get_notification_service),
+) -> UnreadCountSchema:
+    _object_id(notification_id, "notification")
+    if not await service.mark_notification_as_read(notification_id, user_id=str(principal.id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Notification not found")
+    return UnreadCountSchema(unread=await service.get_unread_count(str(principal.id)))
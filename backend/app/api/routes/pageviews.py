@@ -1,26 +1,56 @@
-from fastapi import APIRouter, Depends, Request
-from sqlmodel import Session
+from datetime import datetime, timedelta
 
-from app.api.deps import get_db
-from app.models import PageView
+from fastapi import APIRouter, Depends, Query, Request, status
 
-router = APIRouter()
+from app.api.deps import AsyncSessionDep, CurrentPrincipal, get_current_active_superuser
+from app.models import PageViewUrlRollup, PageViewUserRollup
+from app.schemas.pageViewSchema import RollupGrain, UrlViewsSchema, UserViewsSchema
+from app.services.pageview_service import (
+    page_view_buffer,
+    page_view_rollup_query,
+    page_view_row,
+)
 
-@router.post("/track-page-view/")
-async def track_page_view(page_url: str, request: Request, db: Session = Depends(get_db)):
-    user_agent = request.headers.get('user-agent')
-    ip_address = request.client.host
-    user_id = request.state.user_id  # Assuming user_id is extracted from a token
+router = APIRouter()
 
-    # Create a new PageView record
-    page_view = PageView(
-        user_id=user_id,
-        page_url=page_url,
-        user_agent=user_agent,
-        ip_address=ip_address
+# Page views are buffered and written in bulk, so this only appends a row
+@router.post("/track-page-view/", status_code=status.HTTP_202_ACCEPTED)
+async def track_page_view(page_url: str, request: Request, current_user: CurrentPrincipal):
+    page_view_buffer.add(
+        page_view_row(current_user.id, page_url, request.headers.get("user-agent"))
     )
+    return {"message": "Page view accepted"}
 
-    db.add(page_view)
-    db.commit()
+# Most viewed URLs over a period, read from the hourly/daily rollups
+@router.get(
+    "/stats/urls",
+    response_model=list[UrlViewsSchema],
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def top_urls(
+    session: AsyncSessionDep,
+    grain: RollupGrain = RollupGrain.day,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> list[UrlViewsSchema]:
+    since = since or datetime.utcnow() - timedelta(days=30)
+    result = await session.exec(page_view_rollup_query(PageViewUrlRollup, grain.value, since, until, limit))
+    return [UrlViewsSchema(url=url, views=views) for url, views in result.all()]
 
-    return {"message": "Page view tracked successfully"}
+# Most active users over a period, read from the hourly/daily rollups
+@router.get(
+    "/stats/users",
+    response_model=list[UserViewsSchema],
+    dependencies=[Depends(get_current_active_superuser)],
+)
+async def top_users(
+    session: AsyncSessionDep,
+    grain: RollupGrain = RollupGrain.day,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+) -> list[UserViewsSchema]:
+    since = since or datetime.utcnow() - timedelta(days=30)
+    result = await session.exec(page_view_rollup_query(PageViewUserRollup, grain.value, since, until, limit))
+    return [UserViewsSchema(user_id=user_id, views=views) for user_id, views in result.all()]
@@ -1,16 +1,15 @@
 import uuid
 from typing import List
 from fastapi import APIRouter, HTTPException, Depends, status
-from fastapi_limiter.depends import RateLimiter
 from sqlmodel import Session, select
 
+from app.core.rate_limiter import RateLimiter
 from app.models import Payment, PaymentStatus
 from app.services.payment_service import PaymentService
 from app.schemas.paymentSchema import PaymentRequestSchema, PaymentResponseSchema, RefundRequestSchema, RefundResponseSchema
 from app.api.deps import get_db
 
 router = APIRouter()
-payment_service = PaymentService()
 
 @router.post("/", response_model=PaymentResponseSchema, status_code=status.HTTP_201_CREATED, dependencies=[Depends(RateLimiter(times=3, seconds=60))])
 def create_payment(payment_data: PaymentRequestSchema, session: Session = Depends(get_db)):
@@ -38,12 +37,12 @@ def refund_payment(refund_data: RefundRequestSchema, session: Session = Depends(
     return refund
 
 # Webhooks for payment services
-@router.post("/webhooks/paypal", dependencies=[Depends(RateLimiter(times= 10, seconds=60))])
+@router.post("/webhooks/paypal", dependencies=[Depends(RateLimiter(times=10, seconds=60))])
 async def handle_paypal_webhook(webhook_data: dict, session: Session = Depends(get_db)):
     # Extract data and update payment status
     transaction_id = webhook_data.get("transaction_id")
     status = PaymentStatus.COMPLETED if webhook_data.get("status") == "COMPLETED" else PaymentStatus.FAILED
-    payment = payment_service.update_payment_status(transaction_id, status)
+    payment = PaymentService(session).update_payment_status(transaction_id, status)
     if not payment:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Payment not found.")
     payment.payment_statux = status
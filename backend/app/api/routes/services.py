@@ -1,59 +1,77 @@
 import uuid
-from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
 from app.models import Service
-from app.schemas.serviceSchema import ServiceCreate, ServiceUpdate, ServiceRead
-from app.api.deps import get_db
+from app.schemas.serviceSchema import ServiceCreate, ServiceUpdate, ServiceRead, ServicePageSchema
+from app.api.deps import AsyncSessionDep
+from app.api.streaming import ExportFormat, export_response
+from app.core.pagination import CountMode, KeysetPaginator
+from app.core.route_cache import CachedRoute, cached, invalidates
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
+service_paginator = KeysetPaginator(Service.created_at, Service.id, descending=True)
 
-# Get all services
-@router.get("/", response_model=list[Service])
-async def get_all_services(session: Session = Depends(get_db)):
-    services = session.query(Service).all()
-    return services
+
+# Get services, newest first, one keyset page at a time
+@router.get("/", response_model=ServicePageSchema)
+@cached(ttl=300, tags=["services"])
+async def list_services(
+    session: AsyncSessionDep,
+    limit: int = 10,
+    cursor: str | None = None,
+    count: CountMode = CountMode.none,
+):
+    page = await service_paginator.apaginate(session, select(Service), limit, cursor, count)
+    return ServicePageSchema(data=page.data, count=page.count, next_cursor=page.next_cursor)
+
+# Stream all services as NDJSON or CSV
+@router.get("/export")
+async def export_services(format: ExportFormat = ExportFormat.ndjson) -> StreamingResponse:
+    return export_response(select(Service).order_by(Service.id), ServiceRead, format, "services")
 
 # Get service by ID
 @router.get("/{service_id}", response_model=Service)
-async def get_service(service_id: uuid.UUID, session: Session = Depends(get_db)):
-    service = session.get(Service, service_id)
+@cached(ttl=300, tags=["services"])
+async def get_service(service_id: uuid.UUID, session: AsyncSessionDep):
+    service = await session.get(Service, service_id)
     if not service:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
     return service
 
 # Create a new service
 @router.post("/", response_model=ServiceRead)
-async def create_service(service: ServiceCreate, db: Session = Depends(get_db)):
+@invalidates("services")
+async def create_service(service: ServiceCreate, db: AsyncSessionDep):
     db_service = Service(**service.dict())
     db.add(db_service)
-    db.commit()
-    db.refresh(db_service)
+    await db.commit()
+    await db.refresh(db_service)
     return db_service
 
 # Update service by ID
 @router.put("/{service_id}", response_model=Service)
-async def update_service(service_id: uuid.UUID, service: ServiceUpdate, session: Session = Depends(get_db)):
-    existing_service = session.get(Service, service_id)
+@invalidates("services")
+async def update_service(service_id: uuid.UUID, service: ServiceUpdate, session: AsyncSessionDep):
+    existing_service = await session.get(Service, service_id)
     if not existing_service:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
     for key, value in service.dict(exclude_unset=True).items():
         setattr(existing_service, key, value)
     session.add(existing_service)
-    session.commit()
-    session.refresh(existing_service)
+    await session.commit()
+    await session.refresh(existing_service)
     return existing_service
 
 # Delete service by ID
 @router.delete("/{service_id}")
-async def delete_service(service_id: uuid.UUID, session: Session = Depends(get_db)):
-    service = session.get(Service, service_id)
+@invalidates("services")
+async def delete_service(service_id: uuid.UUID, session: AsyncSessionDep):
+    service = await session.get(Service, service_id)
     if not service:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Service not found")
-    session.delete(service)
-    session.commit()
+    await session.delete(service)
+    await session.commit()
     return {"detail": "Service deleted"}
 
-@router.get("/", response_model=list[ServiceRead])
-def list_services(skip: int = 0, limit: int = 10, db: Session = Depends(get_db)):
-    return db.query(Service).offset(skip).limit(limit).all()
@@ -0,0 +1,79 @@
+import uuid
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import CurrentPrincipal, get_current_active_superuser
+from app.core.config import settings
+from app.schemas.socialSchema import (
+    ConnectionSchema,
+    GraphSyncSchema,
+    MutualContactSchema,
+    PersonSuggestionSchema,
+    ProfessionalSuggestionSchema,
+)
+from app.services.social_graph_service import SocialGraphService
+from app.workers.celery_worker import celery_worker
+
+router = APIRouter()
+
+def get_social_graph_service() -> SocialGraphService:
+    return SocialGraphService()
+
+# Users within N hops of the current user, nearest first
+@router.get("/connections", response_model=list[ConnectionSchema])
+async def list_connections(
+    principal: CurrentPrincipal,
+    hops: int = Query(2, ge=1, le=settings.SOCIAL_GRAPH_MAX_HOPS),
+    limit: int = Query(50, ge=1, le=200),
+    service: SocialGraphService = Depends(get_social_graph_service),
+) -> list[dict[str, Any]]:
+    return await service.connections(principal.id, hops=hops, limit=limit)
+
+# Contacts the current user shares with another user
+@router.get("/mutual/{user_id}", response_model=list[MutualContactSchema])
+async def list_mutual_contacts(
+    user_id: uuid.UUID,
+    principal: CurrentPrincipal,
+    limit: int = Query(50, ge=1, le=200),
+    service: SocialGraphService = Depends(get_social_graph_service),
+) -> list[dict[str, Any]]:
+    if user_id == principal.id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pick another user")
+    return await service.mutual_contacts(principal.id, user_id, limit=limit)
+
+# People you may know: friends-of-friends ranked by mutual contacts
+@router.get("/suggestions/people", response_model=list[PersonSuggestionSchema])
+async def suggest_people(
+    principal: CurrentPrincipal,
+    limit: int = Query(20, ge=1, le=100),
+    service: SocialGraphService = Depends(get_social_graph_service),
+) -> list[dict[str, Any]]:
+    return await service.people_you_may_know(principal.id, limit=limit)
+
+# Professionals you may know, through your connections
+@router.get("/suggestions/professionals", response_model=list[ProfessionalSuggestionSchema])
+async def suggest_professionals(
+    principal: CurrentPrincipal,
+    limit: int = Query(20, ge=1, le=100),
+    service: SocialGraphService = Depends(get_social_graph_service),
+) -> list[dict[str, Any]]:
+    return await service.professionals_you_may_know(principal.id, limit=limit)
+
+# Queue a projection of Postgres into the graph
+@router.post(
+    "/sync",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=GraphSyncSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def sync_social_graph(since: datetime | None = None) -> GraphSyncSchema:
+    """
+    Users and professionals are always re-projected; `since` limits posts and
+    comments to those created after it.
+    """
+    result = celery_worker.send_task(
+        "tasks.sync_social_graph_task", args=[since.isoformat() if since else None]
+    )
+    return GraphSyncSchema(task_id=result.id)
@@ -1,18 +1,25 @@
 import uuid
+from functools import partial
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, col, delete, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import col, delete, select
 
 from app import crud
 from app.api.deps import (
+    AsyncSessionDep,
+    CurrentPrincipal,
     CurrentUser,
     SessionDep,
     get_current_active_superuser,
-    get_db,
 )
+from app.api.streaming import ExportFormat, export_response
+from app.core.concurrency import executors
 from app.core.config import settings
-from app.core.security import get_password_hash, verify_password
+from app.core.pagination import CountMode, KeysetPaginator
+from app.core.password_hasher import password_hasher
+from app.core.user_cache import user_cache
 from app.models import (
     Item,
     Message,
@@ -28,18 +35,41 @@ from app.schemas.userSchema import (
     UserUpdateMeSchema,
     UserUpdateSchema,
 )
-from app.utils import generate_new_account_email, send_email
+from app.utils import generate_new_account_email, queue_email
 
 router = APIRouter()
 
-@router.get("/", response_model=list[UserReadSchema])
-async def get_all_users(session: Session = Depends(get_db)):
-    users = session.query(User).all()
-    return users
+user_paginator = KeysetPaginator(User.id)
+
+@router.get(
+    "/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=UsersPublic,
+)
+async def read_users(
+    session: AsyncSessionDep,
+    limit: int = 100,
+    cursor: str | None = None,
+    count: CountMode = CountMode.none,
+    skip: int | None = Query(default=None, ge=0, deprecated=True),
+) -> Any:
+    """
+    Retrieve users, one keyset page at a time: pass `next_cursor` back as `cursor`.
+    `skip` still pages by offset, with the exact count, for older clients.
+    """
+    if skip is not None and count == CountMode.none:
+        count = CountMode.exact
+    page = await user_paginator.apaginate(session, select(User), limit, cursor, count, offset=skip)
+    return UsersPublic(data=page.data, count=page.count, next_cursor=page.next_cursor)
+
+# Stream every user as NDJSON or CSV
+@router.get("/export", dependencies=[Depends(get_current_active_superuser)])
+async def export_users(format: ExportFormat = ExportFormat.ndjson) -> StreamingResponse:
+    return export_response(select(User).order_by(User.id), UserReadSchema, format, "users")
 
 @router.get("/{user_id}", response_model=UserReadSchema)
-async def get_user(user_id: uuid.UUID, session: Session = Depends(get_db)):
-    user = session.get(User, user_id)
+async def get_user(user_id: uuid.UUID, session: AsyncSessionDep):
+    user = await session.get(User, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     return user
@@ -47,24 +77,28 @@ async def get_user(user_id: uuid.UUID, session: Session = Depends(get_db)):
 @router.post(
     "/", dependencies=[Depends(get_current_active_superuser)], response_model=UserPublic
 )
-def create_user(*, session: SessionDep, user_in: UserCreateSchema) -> Any:
+async def create_user(*, session: AsyncSessionDep, user_in: UserCreateSchema) -> Any:
     """ Create new user. """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
+    user = await crud.aget_user_by_email(session=session, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="The user with this email already exists in the system.",
         )
 
-    user = crud.create_user(session=session, user_create=user_in)
+    user = await crud.acreate_user(session=session, user_create=user_in)
     if settings.emails_enabled and user_in.email:
         email_data = generate_new_account_email(
             email_to=user_in.email, username=user_in.email, password=user_in.password
         )
-        send_email(
-            email_to=user_in.email,
-            subject=email_data.subject,
-            html_content=email_data.html_content,
+        # Published to a worker; the request doesn't wait on SMTP
+        await executors.io.run(
+            partial(
+                queue_email,
+                email_to=user_in.email,
+                subject=email_data.subject,
+                html_content=email_data.html_content,
+            )
         )
     return user
 
@@ -107,13 +141,13 @@ def update_user( *, session: SessionDep, user_id: uuid.UUID, user_in: UserUpdate
     return db_user
 
 @router.patch("/me/password", response_model=Message)
-def update_password_me(
-    *, session: SessionDep, body: UpdatePasswordSchema, current_user: CurrentUser
+async def update_password_me(
+    *, session: AsyncSessionDep, body: UpdatePasswordSchema, current_user: CurrentUser
 ) -> Any:
     """
     Update own password.
     """
-    if not verify_password(body.current_password, current_user.hashed_password):
+    if not await password_hasher.verify(body.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect password"
@@ -122,30 +156,15 @@ def update_password_me(
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="New password cannot be the same as the current one"
         )
-    hashed_password = get_password_hash(body.new_password)
-    current_user.hashed_password = hashed_password
-    session.add(current_user)
-    session.commit()
+    user = await session.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user.hashed_password = await password_hasher.hash(body.new_password)
+    session.add(user)
+    await session.commit()
+    await user_cache.ainvalidate(current_user.id)
     return Message(message="Password updated successfully")
 
-@router.get(
-    "/",
-    dependencies=[Depends(get_current_active_superuser)],
-    response_model=UsersPublic,
-)
-def read_users(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
-    """
-    Retrieve users.
-    """
-
-    count_statement = select(func.count()).select_from(User)
-    count = session.exec(count_statement).one()
-
-    statement = select(User).offset(skip).limit(limit)
-    users = session.exec(statement).all()
-
-    return UsersPublic(data=users, count=count)
-
 @router.get("/me", response_model=UserPublic)
 def read_user_me(current_user: CurrentUser) -> Any:
     """
@@ -167,34 +186,35 @@ def delete_user_me(session: SessionDep, current_user: CurrentUser) -> Any:
     session.exec(statement)  # type: ignore
     session.delete(current_user)
     session.commit()
+    user_cache.invalidate(current_user.id)
     return Message(message="User deleted successfully")
 
 
 @router.post("/signup", response_model=UserPublic)
-def register_user(session: SessionDep, user_in: UserRegisterSchema) -> Any:
+async def register_user(session: AsyncSessionDep, user_in: UserRegisterSchema) -> Any:
     """
     Create new user without the need to be logged in.
     """
-    user = crud.get_user_by_email(session=session, email=user_in.email)
+    user = await crud.aget_user_by_email(session=session, email=user_in.email)
     if user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="The user with this email already exists in the system",
         )
     user_create = UserCreateSchema.model_validate(user_in)
-    user = crud.create_user(session=session, user_create=user_create)
+    user = await crud.acreate_user(session=session, user_create=user_create)
     return user
 
 
 @router.get("/{user_id}", response_model=UserPublic)
 def read_user_by_id(
-    user_id: uuid.UUID, session: SessionDep, current_user: CurrentUser
+    user_id: uuid.UUID, session: SessionDep, current_user: CurrentPrincipal
 ) -> Any:
     """
     Get a specific user by id.
     """
     user = session.get(User, user_id)
-    if user == current_user:
+    if user and user.id == current_user.id:
         return user
     if not current_user.is_superuser:
         raise HTTPException(
@@ -208,7 +228,7 @@ def read_user_by_id(
 
 @router.delete("/{user_id}", dependencies=[Depends(get_current_active_superuser)])
 def delete_user(
-    session: SessionDep, current_user: CurrentUser, user_id: uuid.UUID
+    session: SessionDep, current_user: CurrentPrincipal, user_id: uuid.UUID
 ) -> Message:
     """
     Delete a user.
@@ -219,7 +239,7 @@ def delete_user(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    if user == current_user:
+    if user.id == current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Super users are not allowed to delete themselves"
@@ -228,4 +248,5 @@ def delete_user(
     session.exec(statement)  # type: ignore
     session.delete(user)
     session.commit()
+    user_cache.invalidate(user_id)
     return Message(message="User deleted successfully")
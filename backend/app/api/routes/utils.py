@@ -1,8 +1,19 @@
+from typing import Any
+
 from fastapi import APIRouter, Depends, status
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
+from app.core.concurrency import executors
+from app.core.db import async_engine, engine
+from app.core.db_pool import pool_status
+from app.core.password_hasher import password_hasher
+from app.core.rate_limiter import rate_limit_store
+from app.core.route_cache import route_cache
+from app.core.user_cache import user_cache
 from app.models import Message
+from app.services.otp_delivery_service import otp_delivery_stats
+from app.services.pageview_service import page_view_buffer
 from app.utils import generate_test_email, send_email
 
 router = APIRouter()
@@ -29,3 +40,95 @@ def test_email(email_to: EmailStr) -> Message:
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
+
+
+@router.get(
+    "/user-cache-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def user_cache_stats() -> dict[str, int | float]:
+    """
+    Hit/miss counters for the authenticated user cache.
+    """
+    return user_cache.stats()
+
+
+@router.get(
+    "/route-cache-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def route_cache_stats() -> dict[str, int]:
+    """
+    Hit/stale/miss/304 counters for the Redis route cache in this worker process.
+    """
+    return route_cache.stats()
+
+
+@router.get(
+    "/page-view-buffer-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def page_view_buffer_stats() -> dict[str, int | float]:
+    """
+    Buffered, dropped and flushed page-view counts for this worker process.
+    """
+    return page_view_buffer.stats()
+
+
+@router.get(
+    "/executor-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def executor_stats() -> dict[str, dict[str, Any]]:
+    """
+    Pool size and queue depth of the io and cpu executors in this worker process.
+    """
+    return executors.stats()
+
+
+@router.get(
+    "/password-hasher-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def password_hasher_stats() -> dict[str, int | float]:
+    """
+    Queue depth, rejections and latency of the password hashing process pool.
+    """
+    return password_hasher.stats()
+
+
+@router.get(
+    "/db-pool-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def db_pool_stats() -> dict[str, dict[str, Any]]:
+    """
+    Connection pool occupancy and checkout wait times for this worker process.
+    """
+    return {
+        "sync": pool_status(engine.pool),
+        "async": pool_status(async_engine.pool),
+    }
+
+
+@router.get(
+    "/otp-delivery-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def otp_delivery_stats_endpoint() -> dict[str, Any]:
+    """
+    Latency histograms of the OTP generate/resend handlers in this worker
+    process, per delivery mode, to compare inline and queued delivery.
+    """
+    return otp_delivery_stats()
+
+
+@router.get(
+    "/rate-limiter-stats/",
+    dependencies=[Depends(get_current_active_superuser)],
+)
+def rate_limiter_stats() -> dict[str, int]:
+    """
+    Redis checks, local-tier decisions and denials of the rate limiter in this worker process.
+    """
+    return rate_limit_store.stats()
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Iterable
+from enum import StrEnum
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+
+
+class ExportFormat(StrEnum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv",
+}
+
+
+def encode_ndjson(schema: type[BaseModel], rows: Iterable[Any]) -> str:
+    """Serialize a batch of ORM rows as newline-delimited JSON."""
+    return "".join(
+        schema.model_validate(row, from_attributes=True).model_dump_json() + "\n" for row in rows
+    )
+
+
+class CsvEncoder:
+    """
+    Serialize batches of ORM rows as CSV, emitting the header with the first batch.
+    Nested values (dicts, lists) are written as JSON strings.
+    """
+
+    def __init__(self, schema: type[BaseModel]):
+        self.schema = schema
+        self.fields = list(schema.model_fields)
+        self._header_written = False
+
+    def encode(self, rows: Iterable[Any]) -> str:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.fields, extrasaction="ignore")
+        if not self._header_written:
+            writer.writeheader()
+            self._header_written = True
+        for row in rows:
+            record = self.schema.model_validate(row, from_attributes=True).model_dump(mode="json")
+            writer.writerow({
+                key: json.dumps(value) if isinstance(value, dict | list) else value
+                for key, value in record.items()
+            })
+        return buffer.getvalue()
+
+
+async def stream_export(
+    statement: Select[Any], schema: type[BaseModel], format: ExportFormat, batch_size: int | None = None
+) -> AsyncIterator[str]:
+    """
+    Stream the rows of `statement` through a server-side cursor, one encoded
+    batch at a time, so memory stays bounded by the batch size rather than
+    the table size.
+
+    The session is opened here rather than taken from a request dependency,
+    because dependencies are torn down before a streaming body finishes.
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    csv_encoder = CsvEncoder(schema) if format == ExportFormat.csv else None
+    async with AsyncSessionLocal() as session:
+        result = await session.stream_scalars(statement.execution_options(yield_per=batch_size))
+        if csv_encoder is not None:
+            # Header first, so an empty table still yields a valid CSV
+            yield csv_encoder.encode([])
+        async for rows in result.partitions(batch_size):
+            yield csv_encoder.encode(rows) if csv_encoder is not None else encode_ndjson(schema, rows)
+
+
+def export_response(
+    statement: Select[Any], schema: type[BaseModel], format: ExportFormat, filename: str
+) -> StreamingResponse:
+    """
+    Build a StreamingResponse that downloads `statement` as NDJSON or CSV.
+    """
+    return StreamingResponse(
+        stream_export(statement, schema, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format.value}"'},
+    )
@@ -1,15 +1,199 @@
 import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import Callable, Coroutine, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
 from concurrent.futures.thread import ThreadPoolExecutor
-from typing import Callable
+from dataclasses import dataclass
+from typing import Any, Literal
 
-_executor = ThreadPoolExecutor()
+from app.core.config import settings
 
-async def cpu_bound_task(func: Callable, *args):
+logger = logging.getLogger(__name__)
+
+def _worker_pid() -> int:
+    return os.getpid()
+
+
+@dataclass
+class ExecutorStats:
+    submitted: int = 0
+    completed: int = 0
+    peak_pending: int = 0
+    total_seconds: float = 0.0
+
+
+class NamedExecutor:
+    """
+    A lazily created, fixed-size thread or process pool with queue-depth gauges.
+
+    Each kind of work gets its own pool, so a burst of blocking I/O cannot
+    occupy the workers CPU-bound tasks need, or the reverse. Process pools
+    use the spawn context, since forking a process that runs threads and an
+    event loop is unsafe; functions sent to them must be picklable.
+    """
+
+    def __init__(self, name: str, kind: Literal["thread", "process"], max_workers: int) -> None:
+        self.name = name
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._stats = ExecutorStats()
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.max_workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers, thread_name_prefix=f"{self.name}-executor"
+                        )
+        return self._executor
+
+    async def run[T](self, func: Callable[..., T], *args: Any) -> T:
+        """Run `func(*args)` on this pool without blocking the event loop."""
+        with self._lock:
+            self._pending += 1
+            self._stats.submitted += 1
+            self._stats.peak_pending = max(self._stats.peak_pending, self._pending)
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._pending -= 1
+                self._stats.completed += 1
+                self._stats.total_seconds += elapsed
+
+    async def warm(self) -> None:
+        """
+        Start every worker up front, so the first requests don't pay for
+        spawning processes and importing the app in each of them.
+        """
+        # Submitted together, no worker is idle yet, so each call spawns one
+        pids = await asyncio.gather(*(self.run(_worker_pid) for _ in range(self.max_workers)))
+        logger.info(f"Executor {self.name!r} warmed with {len(set(pids))} worker(s)")
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats, pending = self._stats, self._pending
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "started": self._executor is not None,
+                "pending": pending,
+                # Calls waiting for a free worker, beyond those running
+                "queued": max(0, pending - self.max_workers),
+                "peak_pending": stats.peak_pending,
+                "submitted": stats.submitted,
+                "completed": stats.completed,
+                "avg_seconds": stats.total_seconds / stats.completed if stats.completed else 0.0,
+            }
+
+
+class Executors:
     """
-    Execute async function in a seperate thread, without blocking the main event loop.
+    The process-wide executors, one per purpose:
 
-    :param func: async function that will be executed in separate thread
-    :param args: async function parameters
-    :return: async function result
+    - `io`: threads for blocking I/O (sync clients, file access)
+    - `cpu`: processes for CPU-bound work, pre-warmed at startup
     """
-    return await asyncio.get_event_loop().run_in_executor(_executor, func, *args)
+
+    def __init__(self) -> None:
+        self.io = NamedExecutor("io", "thread", settings.IO_EXECUTOR_WORKERS)
+        self.cpu = NamedExecutor("cpu", "process", settings.CPU_EXECUTOR_WORKERS)
+
+    def __iter__(self) -> Iterator[NamedExecutor]:
+        return iter((self.io, self.cpu))
+
+    async def start(self) -> None:
+        if settings.CPU_EXECUTOR_PREWARM:
+            await self.cpu.warm()
+
+    def shutdown(self, wait: bool = True) -> None:
+        for executor in self:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {executor.name: executor.stats() for executor in self}
+
+
+executors = Executors()
+
+
+async def io_bound_task[T](func: Callable[..., T], *args: Any) -> T:
+    """
+    Execute a blocking function on the `io` thread pool, without blocking the main event loop.
+
+    :param func: function that will be executed in a separate thread
+    :param args: function parameters
+    :return: function result
+    """
+    return await executors.io.run(func, *args)
+
+
+async def cpu_bound_task[T](func: Callable[..., T], *args: Any, executor: Executor | None = None) -> T:
+    """
+    Execute function in a seperate process, without blocking the main event loop
+    or holding the GIL.
+
+    :param func: picklable (module-level) function that will be executed in the `cpu` pool
+    :param args: function parameters, picklable as well
+    :param executor: a dedicated executor to run on instead of the `cpu` pool
+    :return: function result
+    """
+    if executor is not None:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    return await executors.cpu.run(func, *args)
+
+
+class WorkerLoop:
+    """
+    One background event loop per process, for running coroutines from sync
+    code (Celery tasks) without `asyncio.run()` creating and tearing down a
+    loop, and whatever connections were opened on it, on every call.
+
+    The loop is created lazily and re-created after a fork, so prefork Celery
+    children never share the parent's loop or connections.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._pid: int | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name=self.name, daemon=True).start()
+                self._loop = loop
+                self._pid = os.getpid()
+            return self._loop
+
+    def run[T](self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """Run a coroutine on the worker loop and block until it finishes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+worker_loop = WorkerLoop("worker-loop")
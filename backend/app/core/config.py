@@ -2,10 +2,12 @@ import os
 import secrets
 import warnings
 from typing import Annotated, Any, Literal, Self
+from urllib.parse import quote
 
 from pydantic import (
     AnyUrl,
     BeforeValidator,
+    Field,
     HttpUrl,
     PostgresDsn,
     computed_field,
@@ -72,12 +74,40 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Sync engine pool sizing, per process: size it against the uvicorn
+    # threadpool and Celery worker concurrency (see /utils/db-pool-stats/)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    # Recycle connections before server/proxy idle timeouts close them
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Server-side statement_timeout in milliseconds; 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+
+    # Rows per server-side cursor fetch for streaming exports
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Async engine pool sizing: connections a single worker keeps in flight
+    ASYNC_DB_POOL_SIZE: int = 20
+    ASYNC_DB_MAX_OVERFLOW: int = 10
+    ASYNC_DB_POOL_TIMEOUT: int = 30
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
     SMTP_HOST: str | None = None
     SMTP_USER: str | None = None
     SMTP_PASSWORD: str | None = None
+    # Pooled SMTP connections (see app.core.mail), per process
+    SMTP_POOL_SIZE: int = 4
+    # Idle connections older than this are checked with NOOP before reuse
+    SMTP_POOL_MAX_IDLE_SECONDS: float = 30.0
+    # Connections are retired after this many messages
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+    # Attempts after the first for messages a queued batch could not send
+    EMAIL_SEND_MAX_RETRIES: int = 3
     # TODO: update type to EmailStr when sqlmodel supports it
     EMAILS_FROM_EMAIL: str | None = None
     EMAILS_FROM_NAME: str | None = None
@@ -89,6 +119,11 @@ class Settings(BaseSettings):
         return self
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48
+    # Compiled email templates (see app.core.email_templates); edits to the
+    # built HTML are picked up without a restart in the local environment
+    EMAIL_TEMPLATES_AUTO_RELOAD: bool = True
+    # Jinja bytecode cache shared by processes; a per-user temp dir when unset
+    EMAIL_TEMPLATES_BYTECODE_CACHE_DIR: str | None = None
 
     @computed_field  # type: ignore[prop-decorator]
     @property
@@ -101,20 +136,86 @@ class Settings(BaseSettings):
     FIRST_SUPERUSER: str
     FIRST_SUPERUSER_PASSWORD: str
 
+    # Per-purpose executors (see app.core.concurrency)
+    IO_EXECUTOR_WORKERS: int = 32
+    CPU_EXECUTOR_WORKERS: int = max(1, (os.cpu_count() or 2) - 1)
+    # Spawn the CPU worker processes at startup instead of on first use
+    CPU_EXECUTOR_PREWARM: bool = True
+
+    # Password hashing (see app.core.password_hasher): bcrypt cost, and a
+    # dedicated process pool so hashing never runs on the event loop
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    # Hashes queued or running before new requests are rejected with a 503
+    PASSWORD_HASH_MAX_PENDING: int = 64
+
+    # Outbound HTTP client (rate APIs, polling)
+    HTTP_TIMEOUT_SECONDS: float = 10.0
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_HTTP2: bool = True
+    HTTP_RETRIES: int = 3
+    HTTP_BACKOFF_BASE_SECONDS: float = 0.5
+    HTTP_BACKOFF_MAX_SECONDS: float = 8.0
+
     # Exchange Rate API
     EXCHANGE_RATE_URI: str = os.getenv("EXCHANGE_RATE_URI", "https://api.exchangeratesapi.io/latest")
     EXCHANGE_RATE_KEY: str = os.getenv("EXCHANGE_RATE_KEY")
+    # Used when the rates payload does not name its base currency
+    EXCHANGE_RATE_BASE_CURRENCY: str = "EUR"
 
     # Twilio settings
     TWILIO_ACCOUNT_SID: str = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN: str = os.getenv("TWILIO_AUTH_TOKEN")
     TWILIO_PHONE_NUMBER: str = os.getenv("TWILIO_PHONE_NUMBER")
 
+    # One-time passwords (see app.services.otp_service)
+    OTP_BACKEND: Literal["redis", "postgres"] = "redis"
+    # Digits per code; the OTP table's otp_code column holds at most 6
+    OTP_LENGTH: int = Field(default=6, ge=4, le=6)
+    OTP_TTL_SECONDS: int = 600
+    OTP_RESEND_COOLDOWN_SECONDS: int = 120
+    # Wrong codes accepted before the code is discarded
+    OTP_MAX_ATTEMPTS: int = 5
+    # Delivery (see app.services.otp_delivery_service): "queued" publishes a
+    # task to the OTP queue, "inline" calls the provider during the request
+    OTP_DELIVERY_MODE: Literal["queued", "inline"] = "queued"
+    # "stub" keeps messages in memory instead of sending them
+    OTP_PROVIDER: Literal["twilio", "stub"] = "twilio"
+    # Attempts after the first before a delivery is dead-lettered
+    OTP_DELIVERY_MAX_RETRIES: int = 3
+    # Doubled after every failed attempt
+    OTP_DELIVERY_RETRY_BACKOFF_SECONDS: float = 2.0
+
     # Redis settings
     REDIS_HOST: str =  "localhost"
     REDIS_PORT: int =  6379
     REDIS_URL: str = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"  # Redis URL for Celery backend and cache
 
+    # Authenticated user cache (see app.core.user_cache)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10_000
+
+    # Redis response cache for reference-data routes (see app.core.route_cache)
+    ROUTE_CACHE_ENABLED: bool = True
+    # How long an expired response is still served while it is revalidated
+    ROUTE_CACHE_STALE_SECONDS: int = 60
+    # Upper bound on how long concurrent misses wait for one load
+    ROUTE_CACHE_LOCK_TIMEOUT_SECONDS: float = 5.0
+
+    # Redis rate limiting (see app.core.rate_limiter)
+    RATE_LIMIT_ENABLED: bool = True
+    # Share of a caller's remaining quota each process may admit without
+    # asking Redis, for up to RATE_LIMIT_LOCAL_TTL_SECONDS; 0 always asks
+    RATE_LIMIT_LOCAL_SHARE: float = 0.1
+    RATE_LIMIT_LOCAL_TTL_SECONDS: float = 1.0
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10_000
+    # Proxies (addresses or networks) whose X-Forwarded-For is believed, e.g.
+    # Traefik's Docker network; other peers are limited by their own address
+    RATE_LIMIT_TRUSTED_PROXIES: Annotated[list[str] | str, BeforeValidator(parse_cors)] = []
+
     # RabbitMQ settings
     RABBITMQ_HOST: str = os.getenv("RABBITMQ_HOST", "localhost")
     RABBITMQ_PORT: str = os.getenv("RABBITMQ_PORT", "5672")
@@ -122,6 +223,55 @@ class Settings(BaseSettings):
     RABBITMQ_PASSWORD: str = os.getenv("RABBITMQ_PASSWORD", "rabbitpass")
     RABBITMQ_VHOST: str = os.getenv("RABBITMQ_VHOST", "/")
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def RABBITMQ_URL(self) -> str:
+        # The vhost is a path segment, so the default "/" must be sent as %2F
+        return (
+            f"amqp://{quote(self.RABBITMQ_USER, safe='')}:{quote(self.RABBITMQ_PASSWORD, safe='')}"
+            f"@{self.RABBITMQ_HOST}:{self.RABBITMQ_PORT}/{quote(self.RABBITMQ_VHOST, safe='')}"
+        )
+
+    # Long-lived publisher (see app.services.message_queue)
+    RABBITMQ_CHANNEL_POOL_SIZE: int = 8
+    RABBITMQ_CONFIRM_BATCH_SIZE: int = 200
+    RABBITMQ_PUBLISH_TIMEOUT_SECONDS: float = 10.0
+
+    # Buffered page-view ingestion (see app.services.pageview_service):
+    # rows per bulk write, max seconds a row waits, and the per-process cap
+    # beyond which new page views are dropped
+    PAGE_VIEW_FLUSH_SIZE: int = 2_000
+    PAGE_VIEW_FLUSH_INTERVAL_SECONDS: float = 1.0
+    PAGE_VIEW_BUFFER_MAX_ROWS: int = 50_000
+    # Monthly partitions kept ahead of time, and whole months of raw page
+    # views kept before their partition is dropped (rollups are kept)
+    PAGE_VIEW_PARTITIONS_AHEAD: int = 2
+    PAGE_VIEW_RETENTION_MONTHS: int = 13
+    # Hours of raw page views re-aggregated on each rollup refresh
+    PAGE_VIEW_ROLLUP_LOOKBACK_HOURS: int = 2
+
+    # Incremental reports (see app.services.report_service)
+    # Recipient of scheduled reports, FIRST_SUPERUSER when unset
+    REPORT_RECIPIENT: str | None = None
+    # Window of a report's first run, before it has a watermark
+    REPORT_DEFAULT_LOOKBACK_HOURS: int = 24
+    REPORT_MAX_ROWS_PER_SECTION: int = 50
+
+    # Batched retention (see app.services.retention_service): days kept per
+    # table, rows per deleting transaction, pause between batches, and the
+    # time budget per table and run. "pageview" defaults to
+    # PAGE_VIEW_RETENTION_MONTHS of 31 days, so it never trims rows the
+    # partition drop keeps.
+    RETENTION_DAYS: dict[str, int] = {"record": 30, "otp": 1, "auditinfo": 365}
+    RETENTION_BATCH_SIZE: int = 5_000
+    RETENTION_BATCH_PAUSE_SECONDS: float = 0.1
+    RETENTION_MAX_SECONDS: float = 600.0
+
+    @model_validator(mode="after")
+    def _set_default_page_view_retention(self) -> Self:
+        self.RETENTION_DAYS.setdefault("pageview", self.PAGE_VIEW_RETENTION_MONTHS * 31)
+        return self
+
     # Celery configurations
     CELERY_BROKER_URL: str = f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASSWORD}@{RABBITMQ_HOST}:{RABBITMQ_PORT}/{RABBITMQ_VHOST}"
     CELERY_RESULT_BACKEND: str = f"redis://${REDIS_HOST}:${REDIS_PORT}/0"
@@ -132,6 +282,27 @@ class Settings(BaseSettings):
     # MongoDB settings
     MONGO_URI: str = "mongodb://${MONGO_INITDB_ROOT_USERNAME}:${MONGO_INITDB_ROOT_PASSWORD}@${DOMAIN}:27017"
     MONGO_DB_NAME: str = "log"
+
+    # Neo4J graph database (see app.core.graphDB)
+    NEO4J_URI: str = "neo4j://localhost:7687"
+    NEO4J_USER: str = "neo4j"
+    NEO4J_PASSWORD: str = "changethis"
+    # None uses the server's default database
+    NEO4J_DATABASE: str | None = None
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = 100
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT_SECONDS: float = 60.0
+    NEO4J_MAX_CONNECTION_LIFETIME_SECONDS: float = 3600.0
+    # Rows per UNWIND transaction for bulk graph writes
+    NEO4J_UNWIND_BATCH_SIZE: int = 1000
+
+    # Social graph queries (see app.services.social_graph_service)
+    SOCIAL_GRAPH_MAX_HOPS: int = 3
+    SOCIAL_GRAPH_CACHE_TTL_SECONDS: int = 30
+    SOCIAL_GRAPH_CACHE_MAX_SIZE: int = 10_000
+
+    # Notification fan-out: users per insert_many / broker message
+    NOTIFICATIONS_QUEUE: str = "notifications"
+    NOTIFICATION_FANOUT_CHUNK_SIZE: int = 1000
     
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
@@ -151,6 +322,7 @@ class Settings(BaseSettings):
         self._check_default_secret(
             "FIRST_SUPERUSER_PASSWORD", self.FIRST_SUPERUSER_PASSWORD
         )
+        self._check_default_secret("NEO4J_PASSWORD", self.NEO4J_PASSWORD)
 
         return self
 
@@ -1,13 +1,56 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import os
+from typing import Any
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
 from sqlmodel import Session, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app import crud
 from app.core.config import settings
+from app.core.db_pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
 from app.models import User, UserCreate
 
+# Applied to every new connection; statement_timeout keeps one runaway query
+# from holding a pooled connection indefinitely
+_connect_args = (
+    {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    if settings.DB_STATEMENT_TIMEOUT_MS > 0
+    else {}
+)
+
 # Create the SQLAlchemy (SQLModel)
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
-SessionLocal = Session(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args,
+)
+# Session factory: each request, thread or Celery task calls SessionLocal()
+# for its own session; sessions must never be shared across threads
+SessionLocal = sessionmaker(bind=engine, class_=Session, autoflush=False)
+
+# Async engine (psycopg3) for `async def` routes, so queries don't block the event loop
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=TimedAsyncAdaptedQueuePool,
+    pool_size=settings.ASYNC_DB_POOL_SIZE,
+    max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+    pool_timeout=settings.ASYNC_DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args,
+)
+# expire_on_commit=False: attributes stay loaded after commit, since lazy
+# refreshes are not possible outside of an awaited call
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
 
 # Initialize MongoDB (Motor) setup
 mongodb_client: AsyncIOMotorClient = None
@@ -52,6 +95,12 @@ def get_database_session():
     finally:
         db.close()
 
+async def close_async_engine() -> None:
+    """
+    Dispose of the async engine's connection pool.
+    """
+    await async_engine.dispose()
+
 # Initialize MongoDB
 async def init_mongo():
     """
@@ -70,7 +119,7 @@ async def close_mongo_connection():
         mongodb_client.close()
 
 # Dependency to get MongoDB connection
-def get_mongodb():
+def get_mongodb() -> AsyncIOMotorDatabase[Any]:
     """
     Returns the MongoDB database instance.
     """
@@ -78,5 +127,20 @@ def get_mongodb():
         raise RuntimeError("MongoDB has not been initialized. Call init_mongo first.")
     return mongodb_db
 
+# Per-process MongoDB handle for Celery workers, which never run the FastAPI lifespan
+_worker_mongodb: tuple[int, AsyncIOMotorClient[Any]] | None = None
+
+def get_worker_mongodb() -> AsyncIOMotorDatabase[Any]:
+    """
+    Returns a MongoDB database instance owned by this worker process.
+
+    Use it from coroutines run on `app.core.concurrency.worker_loop`; the
+    client is re-created after a fork so prefork children don't share sockets.
+    """
+    global _worker_mongodb
+    if _worker_mongodb is None or _worker_mongodb[0] != os.getpid():
+        _worker_mongodb = (os.getpid(), AsyncIOMotorClient(settings.MONGO_URI))
+    return _worker_mongodb[1][settings.MONGO_DB_NAME]
+
 # Explicitly expose mongodb_db as mongo_db for clarity
 mongo_db = mongodb_db  # Alias for better compatibilit
@@ -0,0 +1,104 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+@dataclass
+class PoolWaitStats:
+    """
+    Cumulative time callers spent waiting for a pooled connection.
+    """
+
+    checkouts: int = 0
+    timeouts: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def snapshot(self) -> dict[str, int | float]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "total_wait_seconds": round(self.total_wait_seconds, 6),
+                "avg_wait_seconds": round(self.total_wait_seconds / attempts, 6) if attempts else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 6),
+            }
+
+
+class _TimedPoolMixin(QueuePool):
+    """
+    Times every checkout so pool exhaustion shows up as wait time instead of
+    only as request latency. Stats survive `engine.dispose()`, which swaps in
+    a fresh pool through `recreate()`.
+    """
+
+    wait_stats: PoolWaitStats
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return conn
+
+    def recreate(self) -> Any:
+        pool: Any = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: Any) -> dict[str, Any]:
+    """
+    Report the occupancy of a connection pool.
+
+    Args:
+        pool: The engine's pool (`engine.pool` or `async_engine.pool`).
+
+    Returns:
+        dict: Configured size, checked-in/out and overflow counts, plus wait
+        statistics when the pool is a timed pool.
+    """
+    status: dict[str, Any] = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        # QueuePool reports overflow relative to pool_size (negative while the
+        # pool is not yet full); only connections beyond pool_size count here
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+    }
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["wait"] = wait_stats.snapshot()
+    return status
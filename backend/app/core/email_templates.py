@@ -0,0 +1,90 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Any
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "email-templates"
+# Compiled MJML, rendered at send time; regenerated by `python -m app.build_email_templates`
+BUILD_DIR = EMAIL_TEMPLATES_DIR / "build"
+SOURCE_DIR = EMAIL_TEMPLATES_DIR / "src"
+
+
+class TemplateRegistry:
+    """
+    Compiled Jinja templates for every email in `directory`.
+
+    Templates are compiled once per process by `preload` and rendered from
+    memory afterwards, with no file reads. Compiled bytecode is also cached
+    on disk, so each new API or Celery worker process skips recompiling.
+    With `auto_reload` (local environment only) a template whose file
+    changed is recompiled on its next render.
+    """
+
+    def __init__(
+        self,
+        directory: Path = BUILD_DIR,
+        auto_reload: bool | None = None,
+        bytecode_cache_dir: str | None = None,
+    ):
+        self.directory = directory
+        if auto_reload is None:
+            auto_reload = settings.ENVIRONMENT == "local" and settings.EMAIL_TEMPLATES_AUTO_RELOAD
+        self.auto_reload = auto_reload
+        cache_dir = bytecode_cache_dir or settings.EMAIL_TEMPLATES_BYTECODE_CACHE_DIR
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            bytecode_cache=FileSystemBytecodeCache(cache_dir) if cache_dir else FileSystemBytecodeCache(),
+            auto_reload=auto_reload,
+            # Keep every template compiled
+            cache_size=-1,
+        )
+        self._templates: dict[str, Template] = {}
+        self._lock = threading.Lock()
+        self.renders = 0
+
+    def preload(self) -> list[str]:
+        """
+        Compile every template in the directory.
+
+        Returns:
+            list[str]: Names of the loaded templates.
+        """
+        names = sorted(path.name for path in self.directory.glob("*.html"))
+        templates = {name: self.env.get_template(name) for name in names}
+        with self._lock:
+            self._templates = templates
+        logger.info(f"Loaded {len(templates)} email templates from {self.directory}")
+        return names
+
+    def get(self, name: str) -> Template:
+        if self.auto_reload:
+            # Checks the file's modification time and recompiles it if changed
+            return self.env.get_template(name)
+        template = self._templates.get(name)
+        if template is None:
+            template = self.env.get_template(name)
+            with self._lock:
+                self._templates[name] = template
+        return template
+
+    def render(self, name: str, context: dict[str, Any]) -> str:
+        html = self.get(name).render(context)
+        self.renders += 1
+        return html
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "directory": str(self.directory),
+            "templates": sorted(self._templates),
+            "auto_reload": self.auto_reload,
+            "renders": self.renders,
+        }
+
+
+email_templates = TemplateRegistry()
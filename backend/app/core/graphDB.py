@@ -1,31 +1,205 @@
-from typeing import Callable
-from neo4j import GraphDatabase as Neo4JGaphDb
-from app.core.conncurrency import cpu_bound_task
+import logging
+import re
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import Any
+
+from neo4j import (
+    AsyncDriver,
+    AsyncManagedTransaction,
+    AsyncSession,
+    Bookmarks,
+)
+from neo4j import AsyncGraphDatabase as Neo4jAsyncGraphDatabase
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Labels, relationship types and property keys cannot be query parameters
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _identifier(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid graph identifier: {name!r}")
+    return f"`{name}`"
+
+
+def _batches(rows: Iterable[dict[str, Any]], size: int) -> Iterable[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
 
 class AsyncGraphDatabase:
-    """Async wrapper over Neo4J driver, since it doesn't natively expose an async interface.
-       
-       HTTP APIs + https could have been used to avoid the need to run_in_executor
-       calls, at the cost of less convenient responses parsing and slightly worse performance.
+    """Async wrapper over the native Neo4J async driver.
+
+       Transactions are managed (`execute_read`/`execute_write`), so transient
+       failures and cluster leader switches are retried by the driver, and
+       sessions borrow connections from the driver's pool rather than a thread.
+
+       Every session shares one bookmark manager, which gives causal
+       consistency within the process: a read issued after a write sees it,
+       even when it is routed to another cluster member. To carry that
+       guarantee across processes, pass `current_bookmarks()` along and hand
+       it back as `bookmarks=`.
+
+       Transaction functions must consume their results before returning
+       (e.g. `await result.data()`), since the transaction closes afterwards.
     """
-    
-    def __init__(self, uri: str, user: str, password: str):
-        self._driver = Neo4JGaphDb.driver(uri, auth=(user, password))
-        
-    async def write_tx(self, tx_func: Callable):
-        """Async wrapper over Neo4J 'write_transaction' method."""
-        
-        def write_transaction():
-            with self._driver.session() as session:
-                return session.write_transaction(tx_func)
-            
-        return await cpu_bound_task(write_transaction)
-        
-    async def read_tx(self, tx_func: Callable):
-        """Async wrapper over Neo4J 'read_transaction' method."""
-        
-        def read_transaction():
-            with self._driver.session() as session:
-                return session.read_transaction(tx_func)
-        return await cpu_bound_task(read_transaction)
-    
\ No newline at end of file
+
+    def __init__(self, uri: str, user: str, password: str, database: str | None = None, **driver_config: Any):
+        self.uri = uri
+        self.database = database
+        self._auth = (user, password)
+        self._driver_config = {
+            "max_connection_pool_size": settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+            "connection_acquisition_timeout": settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT_SECONDS,
+            "max_connection_lifetime": settings.NEO4J_MAX_CONNECTION_LIFETIME_SECONDS,
+            **driver_config,
+        }
+        self._driver: AsyncDriver | None = None
+        self._bookmark_manager = Neo4jAsyncGraphDatabase.bookmark_manager()
+
+    @property
+    def driver(self) -> AsyncDriver:
+        # Creating the driver opens no connections; the pool fills on demand
+        if self._driver is None:
+            self._driver = Neo4jAsyncGraphDatabase.driver(self.uri, auth=self._auth, **self._driver_config)
+        return self._driver
+
+    async def verify_connectivity(self) -> None:
+        await self.driver.verify_connectivity()
+
+    async def close(self) -> None:
+        if self._driver is not None:
+            await self._driver.close()
+            self._driver = None
+
+    # -----------------
+    # Sessions and transactions
+    # -----------------
+
+    @asynccontextmanager
+    async def session(self, bookmarks: Bookmarks | None = None, **config: Any) -> AsyncIterator[AsyncSession]:
+        async with self.driver.session(
+            database=self.database,
+            bookmark_manager=self._bookmark_manager,
+            bookmarks=bookmarks,
+            **config,
+        ) as session:
+            yield session
+
+    async def write_tx[R](
+        self,
+        tx_func: Callable[..., Awaitable[R]],
+        *args: Any,
+        bookmarks: Bookmarks | None = None,
+        **kwargs: Any,
+    ) -> R:
+        """Run `tx_func(tx, *args, **kwargs)` in a managed write transaction."""
+        async with self.session(bookmarks) as session:
+            return await session.execute_write(tx_func, *args, **kwargs)
+
+    async def read_tx[R](
+        self,
+        tx_func: Callable[..., Awaitable[R]],
+        *args: Any,
+        bookmarks: Bookmarks | None = None,
+        **kwargs: Any,
+    ) -> R:
+        """Run `tx_func(tx, *args, **kwargs)` in a managed read transaction, routed to readers."""
+        async with self.session(bookmarks) as session:
+            return await session.execute_read(tx_func, *args, **kwargs)
+
+    async def read(self, query: str, bookmarks: Bookmarks | None = None, **params: Any) -> list[dict[str, Any]]:
+        """Run a read query and return its records as dicts."""
+
+        async def _read(tx: AsyncManagedTransaction) -> list[dict[str, Any]]:
+            result = await tx.run(query, params)
+            return await result.data()
+
+        return await self.read_tx(_read, bookmarks=bookmarks)
+
+    async def current_bookmarks(self) -> Bookmarks:
+        """Bookmarks of every transaction committed through this instance so far."""
+        return Bookmarks.from_raw_values(await self._bookmark_manager.get_bookmarks())
+
+    # -----------------
+    # UNWIND batch writes
+    # -----------------
+
+    async def write_batches(
+        self,
+        query: str,
+        rows: Iterable[dict[str, Any]],
+        batch_size: int | None = None,
+        **params: Any,
+    ) -> int:
+        """
+        Write `rows` with one round trip per batch instead of one per row.
+
+        Args:
+            query (str): Cypher starting with `UNWIND $rows AS row`.
+            rows (Iterable[dict]): Rows to write, consumed lazily.
+            batch_size (int | None): Rows per transaction, NEO4J_UNWIND_BATCH_SIZE by default.
+
+        Returns:
+            int: Number of rows sent.
+        """
+        batch_size = batch_size or settings.NEO4J_UNWIND_BATCH_SIZE
+
+        async def _write(tx: AsyncManagedTransaction, batch: list[dict[str, Any]]) -> None:
+            result = await tx.run(query, {**params, "rows": batch})
+            await result.consume()
+
+        written = 0
+        for batch in _batches(rows, batch_size):
+            # One transaction per batch keeps retries cheap and memory bounded
+            await self.write_tx(_write, batch)
+            written += len(batch)
+        return written
+
+    async def merge_nodes(
+        self, label: str, key: str, rows: Iterable[dict[str, Any]], batch_size: int | None = None
+    ) -> int:
+        """
+        MERGE nodes by `key` and set the remaining row values as properties.
+        """
+        query = (
+            f"UNWIND $rows AS row "
+            f"MERGE (n:{_identifier(label)} {{{_identifier(key)}: row[$key]}}) "
+            f"SET n += row"
+        )
+        return await self.write_batches(query, rows, batch_size, key=key)
+
+    async def merge_relationships(
+        self,
+        start_label: str,
+        end_label: str,
+        rel_type: str,
+        rows: Iterable[dict[str, Any]],
+        key: str = "id",
+        batch_size: int | None = None,
+    ) -> int:
+        """
+        MERGE `(start)-[:rel_type]->(end)` between existing nodes matched on `key`.
+
+        Each row holds `start` and `end` key values and optional `properties`.
+        """
+        query = (
+            f"UNWIND $rows AS row "
+            f"MATCH (a:{_identifier(start_label)} {{{_identifier(key)}: row.start}}) "
+            f"MATCH (b:{_identifier(end_label)} {{{_identifier(key)}: row.end}}) "
+            f"MERGE (a)-[r:{_identifier(rel_type)}]->(b) "
+            f"SET r += coalesce(row.properties, {{}})"
+        )
+        return await self.write_batches(query, rows, batch_size)
+
+
+graph_db = AsyncGraphDatabase(
+    settings.NEO4J_URI, settings.NEO4J_USER, settings.NEO4J_PASSWORD, settings.NEO4J_DATABASE
+)
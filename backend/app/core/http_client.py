@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Upstream statuses worth another attempt; everything else is returned as-is
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class _Validators:
+    etag: str | None
+    last_modified: str | None
+    digest: str
+    data: Any
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """
+    Outcome of a conditional JSON fetch.
+
+    `data` is always the current payload: on a 304 (or a byte-identical body)
+    it is the copy cached from the previous fetch and `modified` is False.
+    """
+
+    data: Any
+    modified: bool
+    status_code: int
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Full-jitter exponential backoff: a random delay in [0, base * 2**attempt], capped.
+    """
+    ceiling = min(settings.HTTP_BACKOFF_MAX_SECONDS, settings.HTTP_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if value and value.isdigit():
+        return min(float(value), settings.HTTP_BACKOFF_MAX_SECONDS)
+    return None
+
+
+class HttpClient:
+    """
+    Process-wide pooled HTTP client for outbound calls (rate APIs, polling).
+
+    Wraps one `httpx.Client` and one `httpx.AsyncClient` so connections are
+    kept alive and reused, HTTP/2 is negotiated where the server supports it,
+    and every request has connect/read timeouts. Requests are retried on
+    transport errors and retryable statuses with jittered backoff.
+
+    `fetch_json` remembers each URL's ETag / Last-Modified and body digest,
+    so callers can skip work when the upstream payload has not changed.
+    Callers that store the payload fetch with `commit=False` and call
+    `commit_validators` once it is stored, so a failed write is retried
+    with the next fetch instead of being skipped as unchanged.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport | None = None,
+                 async_transport: httpx.AsyncBaseTransport | None = None):
+        self._transport = transport
+        self._async_transport = async_transport
+        self._client: httpx.Client | None = None
+        self._async_client: httpx.AsyncClient | None = None
+        self._validators: dict[str, _Validators] = {}
+        # Validators of fetched payloads not yet confirmed stored, per URL
+        self._pending: dict[str, _Validators] = {}
+        self._lock = threading.Lock()
+
+    # -----------------
+    # Clients
+    # -----------------
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(
+                        http2=settings.HTTP_HTTP2,
+                        timeout=_timeout(),
+                        limits=_limits(),
+                        transport=self._transport,
+                        follow_redirects=True,
+                    )
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        # Bound to the event loop that first uses it (the app's loop)
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                http2=settings.HTTP_HTTP2,
+                timeout=_timeout(),
+                limits=_limits(),
+                transport=self._async_transport,
+                follow_redirects=True,
+            )
+        return self._async_client
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        self.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    # -----------------
+    # Requests with retries
+    # -----------------
+
+    def request(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Send a request, retrying transport errors and retryable statuses.
+
+        Returns:
+            httpx.Response: The last response received.
+
+        Raises:
+            httpx.TransportError: If every attempt failed to get a response.
+        """
+        attempts = settings.HTTP_RETRIES + 1
+        for attempt in range(attempts):
+            try:
+                response = self.client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"{method} {url} failed ({e!r}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    return response
+                delay = _retry_after(response) or backoff_delay(attempt)
+                logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                response.close()
+            time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    async def arequest(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        """
+        Async counterpart of `request`, sharing the same retry policy.
+        """
+        attempts = settings.HTTP_RETRIES + 1
+        for attempt in range(attempts):
+            try:
+                response = await self.async_client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if attempt == attempts - 1:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"{method} {url} failed ({e!r}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    return response
+                delay = _retry_after(response) or backoff_delay(attempt)
+                logger.warning(f"{method} {url} returned {response.status_code}, retrying in {delay:.2f}s")
+                await response.aclose()
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    # -----------------
+    # Conditional JSON fetches
+    # -----------------
+
+    def _conditional_headers(self, url: str, headers: dict[str, str] | None) -> dict[str, str]:
+        merged = dict(headers or {})
+        cached = self._validators.get(url)
+        if cached is not None:
+            if cached.etag:
+                merged["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                merged["If-Modified-Since"] = cached.last_modified
+        return merged
+
+    def _handle_conditional(self, url: str, response: httpx.Response, commit: bool) -> FetchResult:
+        cached = self._validators.get(url)
+        if response.status_code == 304 and cached is not None:
+            return FetchResult(data=cached.data, modified=False, status_code=304)
+        response.raise_for_status()
+        digest = hashlib.sha256(response.content).hexdigest()
+        # Servers without validators still send identical bytes for identical data
+        modified = cached is None or cached.digest != digest
+        data = cached.data if cached is not None and not modified else response.json()
+        validators = _Validators(
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            digest=digest,
+            data=data,
+        )
+        # An unmodified payload matches one already confirmed stored
+        if commit or not modified:
+            self._validators[url] = validators
+            self._pending.pop(url, None)
+        else:
+            self._pending[url] = validators
+        return FetchResult(data=data, modified=modified, status_code=response.status_code)
+
+    def commit_validators(self, url: str) -> None:
+        """
+        Confirm the payload last fetched from `url` with `commit=False` was
+        stored; later fetches revalidate against it.
+        """
+        validators = self._pending.pop(url, None)
+        if validators is not None:
+            self._validators[url] = validators
+
+    def fetch_json(
+        self, url: str, headers: dict[str, str] | None = None, commit: bool = True, **kwargs: Any
+    ) -> FetchResult:
+        """
+        GET a JSON document, revalidating against the previous fetch of the same URL.
+
+        Args:
+            url (str): URL to fetch.
+            headers (dict[str, str] | None): Extra request headers.
+            commit (bool): Revalidate against this payload from now on. With
+                False, it is only used once `commit_validators(url)` is called.
+
+        Returns:
+            FetchResult: The payload and whether it changed since the last fetch.
+
+        Raises:
+            httpx.HTTPError: On transport failure or a non-2xx/304 response.
+        """
+        response = self.request("GET", url, headers=self._conditional_headers(url, headers), **kwargs)
+        return self._handle_conditional(url, response, commit)
+
+    async def afetch_json(
+        self, url: str, headers: dict[str, str] | None = None, commit: bool = True, **kwargs: Any
+    ) -> FetchResult:
+        """
+        Async counterpart of `fetch_json`.
+        """
+        response = await self.arequest("GET", url, headers=self._conditional_headers(url, headers), **kwargs)
+        return self._handle_conditional(url, response, commit)
+
+
+http_client = HttpClient()
@@ -1,6 +1,7 @@
 from typing import TypeVar, Type, Callable
 from aioredis import Redis
 from injector import Injector, singleton
+from app.core.graphDB import AsyncGraphDatabase, graph_db
 from app.core.redis import RedisManager
 
 from .config import settings
@@ -27,4 +28,4 @@ async def configure():
     await pubsub.start()
     injector.binder.bind(Cache, to=cache.redis, scope=singleton)
     injector.binder.bind(PubSubStore, to=cache.redis, scope=singleton)
-    injector.binder.bind(AsyncGraphDatabase, to=AsyncGraphDatabase(settings.Neo4J_URI, settings.Neo4J_User, settings.Neo4J_password), scope=singleton)
\ No newline at end of file
+    injector.binder.bind(AsyncGraphDatabase, to=graph_db, scope=singleton)
\ No newline at end of file
@@ -0,0 +1,276 @@
+import logging
+import smtplib
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Any
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# smtplib.SMTPException subclasses OSError, so this also covers protocol
+# errors other than the per-message refusals handled in send_batch
+CONNECTION_ERRORS = (OSError,)
+
+
+@dataclass(frozen=True)
+class MailMessage:
+    """
+    One email. Every address in `to` is a recipient of the same SMTP
+    transaction, so the content is transferred once however many there are.
+    """
+
+    to: tuple[str, ...]
+    subject: str
+    html: str = ""
+    text: str = ""
+    # Recipients stay in the envelope only and don't see each other
+    undisclosed_recipients: bool = False
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "MailMessage":
+        return cls(**{**data, "to": tuple(data["to"])})
+
+    def to_mime(self, sender: str) -> EmailMessage:
+        mime = EmailMessage()
+        mime["From"] = sender
+        mime["To"] = "undisclosed-recipients:;" if self.undisclosed_recipients else ", ".join(self.to)
+        mime["Subject"] = self.subject
+        if self.text:
+            mime.set_content(self.text)
+            if self.html:
+                mime.add_alternative(self.html, subtype="html")
+        else:
+            mime.set_content(self.html, subtype="html")
+        return mime
+
+
+@dataclass
+class BatchResult:
+    sent: int = 0
+    # Refused by the server (bad recipients, content); retrying won't help
+    rejected: list[MailMessage] = field(default_factory=list)
+    # Not delivered because of connection or temporary failures; safe to retry
+    unsent: list[MailMessage] = field(default_factory=list)
+
+
+@dataclass
+class _PooledConnection:
+    smtp: smtplib.SMTP
+    last_used: float = field(default_factory=time.monotonic)
+    messages: int = 0
+
+
+class SMTPConnectionPool:
+    """
+    Thread-safe pool of logged-in SMTP connections.
+
+    A fresh connection costs a TCP handshake, EHLO, STARTTLS and AUTH before
+    the first message; pooled ones pay that once. Connections idle for more
+    than `max_idle_seconds` are checked with NOOP before reuse, since servers
+    drop idle clients, and each is retired after `max_messages` messages.
+    """
+
+    def __init__(
+        self,
+        host: str | None = None,
+        port: int | None = None,
+        user: str | None = None,
+        password: str | None = None,
+        tls: bool | None = None,
+        ssl: bool | None = None,
+        size: int | None = None,
+        max_idle_seconds: float | None = None,
+        max_messages: int | None = None,
+        timeout: float | None = None,
+    ) -> None:
+        self.host = host or settings.SMTP_HOST or ""
+        self.port = port or settings.SMTP_PORT
+        self.user = settings.SMTP_USER if user is None else user
+        self.password = settings.SMTP_PASSWORD if password is None else password
+        self.tls = settings.SMTP_TLS if tls is None else tls
+        self.ssl = settings.SMTP_SSL if ssl is None else ssl
+        self.size = size or settings.SMTP_POOL_SIZE
+        self.max_idle_seconds = settings.SMTP_POOL_MAX_IDLE_SECONDS if max_idle_seconds is None else max_idle_seconds
+        self.max_messages = max_messages or settings.SMTP_MAX_MESSAGES_PER_CONNECTION
+        self.timeout = timeout or settings.SMTP_TIMEOUT_SECONDS
+        self._idle: list[_PooledConnection] = []
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _open(self) -> _PooledConnection:
+        smtp: smtplib.SMTP
+        if self.ssl:
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.tls:
+                smtp.starttls()
+        if self.user:
+            smtp.login(self.user, self.password or "")
+        with self._lock:
+            self.opened += 1
+        return _PooledConnection(smtp)
+
+    def _alive(self, connection: _PooledConnection) -> bool:
+        if time.monotonic() - connection.last_used < self.max_idle_seconds:
+            return True
+        try:
+            return connection.smtp.noop()[0] == 250
+        except CONNECTION_ERRORS:
+            return False
+
+    def _discard(self, connection: _PooledConnection) -> None:
+        with self._lock:
+            self.discarded += 1
+        try:
+            connection.smtp.quit()
+        except CONNECTION_ERRORS:
+            connection.smtp.close()
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return self._open()
+            if self._alive(connection):
+                with self._lock:
+                    self.reused += 1
+                return connection
+            self._discard(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[_PooledConnection]:
+        """
+        Borrow a connection, waiting while all `size` are in use. It is
+        discarded instead of returned if the block raises.
+        """
+        self._slots.acquire()
+        try:
+            connection = self._checkout()
+            try:
+                yield connection
+            except BaseException:
+                self._discard(connection)
+                raise
+            connection.last_used = time.monotonic()
+            if connection.messages >= self.max_messages:
+                self._discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append(connection)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._discard(connection)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "opened": self.opened,
+                "reused": self.reused,
+                "discarded": self.discarded,
+            }
+
+
+class MailTransport:
+    """Sends MailMessages over a SMTPConnectionPool."""
+
+    def __init__(self, pool: SMTPConnectionPool | None = None, sender: str | None = None) -> None:
+        self.pool = pool or SMTPConnectionPool()
+        self.sender = sender or formataddr((settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL or ""))
+
+    def _deliver(self, connection: _PooledConnection, message: MailMessage) -> None:
+        refused = connection.smtp.send_message(message.to_mime(self.sender), to_addrs=list(message.to))
+        connection.messages += 1
+        if refused:
+            logger.warning(f"Mail server refused {len(refused)} of {len(message.to)} recipients: {sorted(refused)}")
+
+    def send_batch(self, messages: Iterable[MailMessage]) -> BatchResult:
+        """
+        Send `messages` back to back over one pooled connection, moving to
+        another only when it is retired or drops. A message interrupted by a
+        dropped connection is retried once on a new one.
+
+        Returns:
+            BatchResult: Sent count, and the messages rejected or left unsent.
+        """
+        result = BatchResult()
+        pending = list(messages)
+        retried = False
+        while pending:
+            try:
+                with self.pool.connection() as connection:
+                    while pending and connection.messages < self.pool.max_messages:
+                        message = pending[0]
+                        try:
+                            self._deliver(connection, message)
+                            result.sent += 1
+                        except smtplib.SMTPResponseException as e:
+                            if not 400 <= e.smtp_code < 500:
+                                logger.error(f"Mail to {', '.join(message.to)} rejected: {e.smtp_code} {e.smtp_error!r}")
+                                result.rejected.append(message)
+                            else:
+                                result.unsent.append(message)
+                        except smtplib.SMTPRecipientsRefused as e:
+                            logger.error(f"Mail to {', '.join(message.to)} rejected: {e.recipients}")
+                            result.rejected.append(message)
+                        pending.pop(0)
+                        retried = False
+            except CONNECTION_ERRORS as e:
+                if retried:
+                    logger.error(f"Mail connection to {self.pool.host} failed, {len(pending)} messages unsent: {e}")
+                    result.unsent.extend(pending)
+                    break
+                logger.warning(f"Mail connection to {self.pool.host} dropped, retrying on a new one: {e}")
+                retried = True
+        return result
+
+    def send(self, message: MailMessage) -> None:
+        """Send one message, raising if it could not be delivered."""
+        result = self.send_batch([message])
+        if not result.sent:
+            raise smtplib.SMTPException(f"Mail to {', '.join(message.to)} was not delivered")
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+_transport: MailTransport | None = None
+_transport_lock = threading.Lock()
+
+
+def get_mail_transport() -> MailTransport:
+    """Return the process-wide transport, created on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = MailTransport()
+        return _transport
+
+
+def close_mail_transport() -> None:
+    """Log out of and close the pooled connections."""
+    global _transport
+    with _transport_lock:
+        transport, _transport = _transport, None
+    if transport is not None:
+        transport.close()
@@ -0,0 +1,62 @@
+import bisect
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Upper bounds of the buckets, in seconds; the last bucket is unbounded
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram for one worker process, cheap enough to
+    record on every request. Quantiles are estimated as the upper bound of
+    the bucket they fall in.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._total = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += seconds
+            self._max = max(self._max, seconds)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(time.perf_counter() - started)
+
+    def _quantile(self, counts: list[int], count: int, q: float) -> float:
+        rank = q * count
+        seen = 0
+        for bound, bucket_count in zip((*self.buckets, self._max), counts, strict=True):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return self._max
+
+    def snapshot(self) -> dict[str, float | int | dict[str, int]]:
+        with self._lock:
+            counts, total, longest = list(self._counts), self._total, self._max
+        count = sum(counts)
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "count": count,
+            "avg_seconds": round(total / count, 6) if count else 0.0,
+            "p50_seconds": self._quantile(counts, count, 0.5) if count else 0.0,
+            "p95_seconds": self._quantile(counts, count, 0.95) if count else 0.0,
+            "p99_seconds": self._quantile(counts, count, 0.99) if count else 0.0,
+            "max_seconds": round(longest, 6),
+            "buckets": dict(zip(labels, counts, strict=True)),
+        }
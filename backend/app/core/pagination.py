@@ -0,0 +1,230 @@
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import ColumnElement, Select
+
+# Upper bound for a single page, whatever the client asks for
+MAX_PAGE_SIZE = 1000
+
+
+class CountMode(StrEnum):
+    """
+    How (and whether) a page reports the total number of matching rows.
+
+    `exact` runs a COUNT(*) over the filtered query, which is a full scan on
+    large tables; `estimated` reads the planner's `pg_class.reltuples` for
+    unfiltered listings, which is free but only as fresh as the last
+    ANALYZE/autovacuum.
+    """
+
+    none = "none"
+    exact = "exact"
+    estimated = "estimated"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a `cursor` token cannot be decoded for this listing."""
+
+
+@dataclass(frozen=True)
+class Page[T]:
+    data: list[T]
+    next_cursor: str | None
+    count: int | None = None
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _decode_value(column: ColumnElement[Any], value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+class KeysetPaginator:
+    """
+    Seek-method pagination over an ordered, unique key.
+
+    Instead of OFFSET/LIMIT, which makes Postgres read and discard every
+    skipped row, each page continues with `WHERE (k1, k2) > (:last1, :last2)`
+    so deep pages cost the same as the first one when the key is indexed.
+    The last key of a page is returned as an opaque `next_cursor` token.
+
+    The final column must be unique (normally the primary key), e.g.
+    `KeysetPaginator(Service.created_at, Service.id)` or `KeysetPaginator(Item.id)`.
+    """
+
+    def __init__(self, *columns: Any, descending: bool = False):
+        if not columns:
+            raise ValueError("KeysetPaginator needs at least one key column")
+        self.columns: list[ColumnElement[Any]] = [getattr(c, "expression", c) for c in columns]
+        # Cursors read the key back off each row by attribute name
+        self.keys: list[str] = []
+        for column in self.columns:
+            if column.key is None:
+                raise ValueError("KeysetPaginator key columns must be named")
+            self.keys.append(column.key)
+        self.descending = descending
+
+    # -----------------
+    # Cursors
+    # -----------------
+
+    def encode_cursor(self, row: Any) -> str:
+        values = [_encode_value(getattr(row, key)) for key in self.keys]
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor: str) -> tuple[Any, ...]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+            if not isinstance(values, list) or len(values) != len(self.columns):
+                raise ValueError("cursor does not match the listing key")
+            return tuple(_decode_value(c, v) for c, v in zip(self.columns, values, strict=True))
+        except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+            raise InvalidCursorError("Invalid pagination cursor") from e
+
+    # -----------------
+    # Statements
+    # -----------------
+
+    def page_statement(
+        self, statement: Select[Any], limit: int, cursor: str | None = None, offset: int | None = None
+    ) -> Select[Any]:
+        """
+        Apply the keyset predicate, ordering and a `limit + 1` fetch to `statement`.
+
+        `offset` supports clients still paging with `skip`; it is ignored when a
+        `cursor` is given, and costs a scan of every skipped row.
+
+        Raises:
+            InvalidCursorError: If `cursor` was not produced by this paginator.
+        """
+        if not cursor and offset:
+            statement = statement.offset(offset)
+        if cursor:
+            values = self.decode_cursor(cursor)
+            # Row-value comparison matches a composite index on the key columns
+            key = tuple_(*self.columns) if len(self.columns) > 1 else self.columns[0]
+            bound = tuple_(*values) if len(values) > 1 else values[0]
+            statement = statement.where(key < bound if self.descending else key > bound)
+        order_by = [c.desc() if self.descending else c.asc() for c in self.columns]
+        # One extra row tells us whether another page exists
+        return statement.order_by(None).order_by(*order_by).limit(limit + 1)
+
+    def build_page(self, rows: list[Any], limit: int, count: int | None = None) -> Page[Any]:
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = self.encode_cursor(rows[-1]) if has_more else None
+        return Page(data=rows, next_cursor=next_cursor, count=count)
+
+    def _count_statement(self, statement: Select[Any]) -> Select[Any]:
+        return select(func.count()).select_from(statement.order_by(None).limit(None).subquery())
+
+    def _estimate_statement(self, statement: Select[Any]) -> Select[Any] | None:
+        # reltuples describes the whole table, so it only answers unfiltered listings
+        if statement.whereclause is not None:
+            return None
+        table = self.columns[-1].table
+        return select(text("reltuples::bigint")).select_from(text("pg_class")).where(
+            text("oid = to_regclass(:table)").bindparams(table=table.fullname)
+        )
+
+    # -----------------
+    # Execution
+    # -----------------
+
+    def count(self, session: Session, statement: Select[Any], mode: CountMode) -> int | None:
+        if mode == CountMode.none:
+            return None
+        if mode == CountMode.estimated:
+            estimate_statement = self._estimate_statement(statement)
+            if estimate_statement is not None:
+                estimate = session.scalar(estimate_statement)
+                # -1 (or 0 on older servers) until the table is first analyzed
+                if estimate is not None and estimate > 0:
+                    return int(estimate)
+        total: int | None = session.scalar(self._count_statement(statement))
+        return total
+
+    async def acount(self, session: AsyncSession, statement: Select[Any], mode: CountMode) -> int | None:
+        if mode == CountMode.none:
+            return None
+        if mode == CountMode.estimated:
+            estimate_statement = self._estimate_statement(statement)
+            if estimate_statement is not None:
+                estimate = await session.scalar(estimate_statement)
+                if estimate is not None and estimate > 0:
+                    return int(estimate)
+        total: int | None = await session.scalar(self._count_statement(statement))
+        return total
+
+    def paginate(
+        self,
+        session: Session,
+        statement: Select[Any],
+        limit: int,
+        cursor: str | None = None,
+        count: CountMode = CountMode.none,
+        offset: int | None = None,
+    ) -> Page[Any]:
+        """
+        Fetch one page of `statement`.
+
+        Args:
+            session (Session): The database session.
+            statement (Select): An unordered select of ORM entities, with any filters applied.
+            limit (int): Page size, capped at MAX_PAGE_SIZE.
+            cursor (str | None): `next_cursor` from the previous page, or None for the first.
+            count (CountMode): Whether to report the total number of matching rows.
+            offset (int | None): Rows to skip instead of a cursor, for legacy `skip` clients.
+
+        Returns:
+            Page: The rows, the cursor for the next page (None on the last page) and the count.
+
+        Raises:
+            InvalidCursorError: If `cursor` was not produced by this paginator.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        rows = session.scalars(self.page_statement(statement, limit, cursor, offset)).all()
+        return self.build_page(list(rows), limit, self.count(session, statement, count))
+
+    async def apaginate(
+        self,
+        session: AsyncSession,
+        statement: Select[Any],
+        limit: int,
+        cursor: str | None = None,
+        count: CountMode = CountMode.none,
+        offset: int | None = None,
+    ) -> Page[Any]:
+        """
+        Async counterpart of `paginate`.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        rows = (await session.scalars(self.page_statement(statement, limit, cursor, offset))).all()
+        return self.build_page(list(rows), limit, await self.acount(session, statement, count))
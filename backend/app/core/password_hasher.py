@@ -0,0 +1,151 @@
+import logging
+import multiprocessing
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from app.core import security
+from app.core.concurrency import cpu_bound_task
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many hashes are already queued; callers should retry later."""
+
+
+@dataclass
+class PasswordHasherStats:
+    submitted: int = 0
+    completed: int = 0
+    rejected: int = 0
+    rehashed: int = 0
+    max_pending: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class PasswordHasher:
+    """
+    Async bcrypt hashing and verification on a dedicated, size-limited process pool.
+
+    Each bcrypt call burns ~250ms of CPU; run inline it stalls the event loop,
+    and run on the shared thread pool it still competes for the GIL. Here the
+    work goes to `workers` separate processes, and at most `max_pending` calls
+    may be queued or running: beyond that `PasswordHasherBusyError` is raised
+    immediately (surfaced as a 503), so a login burst sheds load instead of
+    building an unbounded backlog.
+
+    With `kind="thread"` the work runs on threads of this process instead,
+    where patches of `security.pwd_context` apply; the test suite uses that.
+    """
+
+    def __init__(self, workers: int | None = None, max_pending: int | None = None,
+                 executor: Executor | None = None, kind: Literal["process", "thread"] = "process") -> None:
+        self.workers = workers or settings.PASSWORD_HASH_WORKERS
+        self.max_pending = max_pending or settings.PASSWORD_HASH_MAX_PENDING
+        self.kind = kind
+        self._executor = executor
+        self._pending = 0
+        self._stats = PasswordHasherStats()
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None and self.kind == "thread":
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="password-hasher"
+                    )
+                elif self._executor is None:
+                    # spawn: forking a process that runs threads and an event loop is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def _run[T](self, func: Callable[..., T], *args: Any) -> T:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._stats.rejected += 1
+                raise PasswordHasherBusyError("Password hashing queue is full")
+            self._pending += 1
+            self._stats.submitted += 1
+            self._stats.max_pending = max(self._stats.max_pending, self._pending)
+        start = time.perf_counter()
+        try:
+            return await cpu_bound_task(func, *args, executor=self.executor)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._pending -= 1
+                self._stats.completed += 1
+                self._stats.total_seconds += elapsed
+                self._stats.max_seconds = max(self._stats.max_seconds, elapsed)
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured bcrypt cost.
+
+        Raises:
+            PasswordHasherBusyError: If the hashing queue is full.
+        """
+        return await self._run(security.get_password_hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Check a password against its stored hash.
+
+        Raises:
+            PasswordHasherBusyError: If the hashing queue is full.
+        """
+        return await self._run(security.verify_password, password, hashed_password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        Check a password and, when its hash was made with another cost or scheme,
+        compute a replacement in the same worker call.
+
+        Returns:
+            tuple[bool, str | None]: Whether the password matched, and the new hash to store, if any.
+
+        Raises:
+            PasswordHasherBusyError: If the hashing queue is full.
+        """
+        valid, new_hash = await self._run(security.verify_and_update_password, password, hashed_password)
+        if new_hash is not None:
+            with self._lock:
+                self._stats.rehashed += 1
+        return valid, new_hash
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            stats, pending = self._stats, self._pending
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": pending,
+                # Calls waiting for a free worker, beyond those being hashed
+                "queued": max(0, pending - self.workers),
+                "peak_pending": stats.max_pending,
+                "submitted": stats.submitted,
+                "completed": stats.completed,
+                "rejected": stats.rejected,
+                "rehashed": stats.rehashed,
+                "avg_seconds": stats.total_seconds / stats.completed if stats.completed else 0.0,
+                "max_seconds": stats.max_seconds,
+            }
+
+
+password_hasher = PasswordHasher()
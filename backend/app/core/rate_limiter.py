@@ -1,14 +1,353 @@
-import sys
+import ipaddress
+import logging
+import math
+import secrets
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Literal
 
-from fastapi_limiter.depends import RateLimiter
+import jwt
+import redis
+from fastapi import HTTPException, status
 from starlette.requests import Request
 from starlette.responses import Response
 
-class RateLimiterTo(RateLimiter):
-    """Wrapper over RateLimiter to bypass rate limiting during pytest runs."""
-    
-    async def __call__(self, request: Request, response: Response):
-        if "pytest" in sys.modules:
+from app.core import security
+from app.core.config import settings
+from app.core.redis import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "rate-limit"
+
+Algorithm = Literal["sliding_window", "token_bucket"]
+KeyScope = Literal["ip", "user", "route"]
+
+# Both scripts take KEYS[1] and ARGV: limit, window (ms), pending, extra; and
+# return {allowed, remaining, reset (ms), retry after (ms)}. `pending` are
+# requests already admitted by a process's local tier, charged here before
+# the current one is decided. Time comes from the Redis server, so API
+# hosts with skewed clocks share one timeline.
+
+# Sliding window log: a sorted set of request timestamps within the window.
+# ARGV[4] is a nonce that keeps the members unique.
+_SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local pending = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+for i = 1, pending do redis.call('ZADD', key, now, ARGV[4] .. ':' .. i) end
+local count = redis.call('ZCARD', key)
+local allowed = 0
+if count < limit then
+  redis.call('ZADD', key, now, ARGV[4])
+  count = count + 1
+  allowed = 1
+end
+redis.call('PEXPIRE', key, window)
+-- The entry whose expiry frees the next slot
+local index = math.max(count - limit, 0)
+local entry = redis.call('ZRANGE', key, index, index, 'WITHSCORES')
+local reset = window
+if entry[2] then reset = tonumber(entry[2]) + window - now end
+local retry = 0
+if allowed == 0 then retry = reset end
+return {allowed, math.max(limit - count, 0), reset, retry}
+"""
+
+# Token bucket: a hash of the token count and when it was last refilled.
+# Refills `limit` tokens per window up to a capacity of ARGV[4] (the burst).
+_TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1]) / tonumber(ARGV[2])
+local pending = tonumber(ARGV[3])
+local capacity = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local last = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(now - last, 0) * rate) - pending
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+-- Until the bucket is full again, after which the key carries no state
+local reset = math.ceil((capacity - tokens) / rate)
+redis.call('PEXPIRE', key, math.max(reset, 1))
+local retry = 0
+if allowed == 0 then retry = math.ceil((1 - tokens) / rate) end
+return {allowed, math.max(math.floor(tokens), 0), reset, retry}
+"""
+
+_SCRIPTS = {"sliding_window": _SLIDING_WINDOW_SCRIPT, "token_bucket": _TOKEN_BUCKET_SCRIPT}
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_networks(tuple(settings.RATE_LIMIT_TRUSTED_PROXIES)))
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    # Seconds until the quota frees up again
+    reset: float
+    retry_after: float = 0.0
+
+
+@dataclass
+class _LocalEntry:
+    remaining: int
+    reset_at: float
+    # Requests this process may still admit without asking Redis, until lease_until
+    allowance: int = 0
+    lease_until: float = 0.0
+    # Admitted locally, charged to Redis on the next check
+    pending: int = 0
+    blocked_until: float = 0.0
+
+
+class RateLimitStore:
+    """
+    Counts requests in Redis with one Lua script call per check, in front of
+    a small in-process tier.
+
+    The local tier skips Redis in two cases:
+
+    - Callers far under their limit: after each Redis check the process may
+      admit up to RATE_LIMIT_LOCAL_SHARE of the remaining quota on its own,
+      for RATE_LIMIT_LOCAL_TTL_SECONDS. Those requests are charged to Redis
+      with the next check. With more processes than 1 / share admitting
+      for the same key at once, a key can overshoot its limit by at most
+      that share of the quota per process.
+    - Callers over their limit: denials are cached until Redis said the
+      quota frees up.
+
+    Limits small enough that the share rounds down to zero always go to Redis.
+    If Redis is unreachable, requests are allowed.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any] = get_async_redis,
+        local_share: float | None = None,
+        local_ttl_seconds: float | None = None,
+        local_max_keys: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._client_factory = client_factory
+        self.local_share = settings.RATE_LIMIT_LOCAL_SHARE if local_share is None else local_share
+        self.local_ttl_seconds = local_ttl_seconds or settings.RATE_LIMIT_LOCAL_TTL_SECONDS
+        self.local_max_keys = local_max_keys or settings.RATE_LIMIT_LOCAL_MAX_KEYS
+        self._clock = clock
+        self._local: OrderedDict[str, _LocalEntry] = OrderedDict()
+        self.redis_checks = 0
+        self.local_allowed = 0
+        self.local_denied = 0
+        self.denied = 0
+        self.errors = 0
+
+    @property
+    def redis(self) -> Any:
+        return self._client_factory()
+
+    def _check_local(self, key: str, limit: int, now: float) -> RateLimitResult | None:
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        if entry.blocked_until > now:
+            self.local_denied += 1
+            wait = entry.blocked_until - now
+            return RateLimitResult(False, limit, 0, wait, wait)
+        if entry.lease_until > now and entry.allowance > 0:
+            entry.allowance -= 1
+            entry.pending += 1
+            self.local_allowed += 1
+            return RateLimitResult(True, limit, max(entry.remaining - entry.pending, 0), max(entry.reset_at - now, 0))
+        return None
+
+    def _remember(self, key: str, result: RateLimitResult, window: float, now: float) -> None:
+        entry = _LocalEntry(remaining=result.remaining, reset_at=now + result.reset)
+        if not result.allowed:
+            entry.blocked_until = now + result.retry_after
+        else:
+            entry.allowance = math.floor(result.remaining * self.local_share)
+            entry.lease_until = now + min(self.local_ttl_seconds, window)
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.local_max_keys:
+            self._local.popitem(last=False)
+
+    async def hit(self, key: str, limit: int, window: float, algorithm: Algorithm, burst: int | None = None) -> RateLimitResult:
+        """
+        Count one request against `key`.
+
+        Args:
+            key (str): Redis key of the caller's counter.
+            limit (int): Requests allowed per `window`.
+            window (float): Window length in seconds.
+            algorithm (Algorithm): "sliding_window" or "token_bucket".
+            burst (int | None): Token bucket capacity, `limit` by default.
+
+        Returns:
+            RateLimitResult: Whether the request may proceed, and the header values.
+        """
+        now = self._clock()
+        local = self._check_local(key, limit, now)
+        if local is not None:
+            return local
+        entry = self._local.get(key)
+        pending = entry.pending if entry else 0
+        extra = secrets.token_hex(8) if algorithm == "sliding_window" else (burst or limit)
+        try:
+            script = self.redis.register_script(_SCRIPTS[algorithm])
+            allowed, remaining, reset_ms, retry_ms = await script(
+                keys=[key], args=[limit, int(window * 1000), pending, extra]
+            )
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return RateLimitResult(True, limit, limit, window)
+        self.redis_checks += 1
+        result = RateLimitResult(bool(allowed), limit, int(remaining), int(reset_ms) / 1000, int(retry_ms) / 1000)
+        if not result.allowed:
+            self.denied += 1
+        self._remember(key, result, window, now)
+        return result
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "redis_checks": self.redis_checks,
+            "local_allowed": self.local_allowed,
+            "local_denied": self.local_denied,
+            "denied": self.denied,
+            "errors": self.errors,
+            "local_keys": len(self._local),
+        }
+
+
+rate_limit_store = RateLimitStore()
+
+
+class RateLimiter:
+    """
+    Route dependency limiting callers to `times` requests per window.
+
+        @router.post("/", dependencies=[Depends(RateLimiter(times=3, seconds=60))])
+
+    Args:
+        times (int): Requests allowed per window.
+        seconds, minutes, hours (int): Window length.
+        algorithm (Algorithm): "sliding_window" counts the requests of the
+            last window exactly; "token_bucket" refills `times` tokens per
+            window and allows bursts of up to `burst`.
+        by (KeyScope): Whose requests are counted together: each client
+            "ip", each authenticated "user" (by IP for anonymous callers),
+            or every caller of the "route".
+        burst (int | None): Token bucket capacity, `times` by default.
+
+    Sets the RateLimit-Limit, RateLimit-Remaining, RateLimit-Reset and
+    RateLimit-Policy headers, and answers 429 with Retry-After when the
+    limit is reached.
+    """
+
+    def __init__(
+        self,
+        times: int,
+        seconds: int = 0,
+        minutes: int = 0,
+        hours: int = 0,
+        algorithm: Algorithm = "sliding_window",
+        by: KeyScope = "ip",
+        burst: int | None = None,
+        store: RateLimitStore | None = None,
+    ):
+        self.times = times
+        self.window = seconds + 60 * minutes + 3600 * hours
+        if times < 1 or self.window <= 0:
+            raise ValueError("A rate limit needs at least one request per a positive window")
+        self.algorithm = algorithm
+        self.by = by
+        self.burst = burst
+        self._store = store
+
+    @property
+    def store(self) -> RateLimitStore:
+        return self._store or rate_limit_store
+
+    @staticmethod
+    def _client_ip(request: Request) -> str:
+        """
+        The caller's address. Behind a proxy in RATE_LIMIT_TRUSTED_PROXIES it
+        is the nearest X-Forwarded-For hop that is not itself a trusted proxy:
+        hops further left were supplied by the client and can be forged.
+        """
+        peer = request.client.host if request.client else "unknown"
+        if not _is_trusted_proxy(peer):
+            return peer
+        hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+        for hop in reversed(hops):
+            if not _is_trusted_proxy(hop):
+                return hop
+        return hops[0] if hops else peer
+
+    def identity(self, request: Request) -> str:
+        if self.by == "route":
+            return "all"
+        if self.by == "user":
+            scheme, _, token = request.headers.get("authorization", "").partition(" ")
+            if scheme.lower() == "bearer" and token:
+                try:
+                    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+                    return f"user:{payload['sub']}"
+                except (jwt.InvalidTokenError, KeyError):
+                    pass
+        return f"ip:{self._client_ip(request)}"
+
+    def key(self, request: Request) -> str:
+        route = request.scope.get("route")
+        path = getattr(route, "path", request.url.path)
+        return f"{KEY_PREFIX}:{self.algorithm}:{request.method}:{path}:{self.identity(request)}"
+
+    def headers(self, result: RateLimitResult) -> dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(result.limit),
+            "RateLimit-Remaining": str(result.remaining),
+            "RateLimit-Reset": str(math.ceil(result.reset)),
+            "RateLimit-Policy": f"{self.times};w={self.window}",
+        }
+        if not result.allowed:
+            headers["Retry-After"] = str(max(math.ceil(result.retry_after), 1))
+        return headers
+
+    async def __call__(self, request: Request, response: Response) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
             return
-        await super().__call__(request, response)
-        
\ No newline at end of file
+        result = await self.store.hit(self.key(request), self.times, self.window, self.algorithm, self.burst)
+        headers = self.headers(result)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers=headers,
+            )
+        response.headers.update(headers)
@@ -0,0 +1,65 @@
+import logging
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_sync_client: redis.Redis | None = None
+_async_client: aioredis.Redis | None = None
+
+
+class RedisManager:
+    """Owns an asyncio Redis connection pool for the lifetime of the application."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.redis: aioredis.Redis | None = None
+
+    async def start(self) -> aioredis.Redis:
+        """Create the connection pool and check the server is reachable."""
+        self.redis = aioredis.Redis.from_url(self.url, decode_responses=True)
+        await self.redis.ping()
+        return self.redis
+
+    async def stop(self) -> None:
+        """Close the connection pool."""
+        if self.redis is not None:
+            await self.redis.aclose()
+            self.redis = None
+
+
+def get_sync_redis() -> redis.Redis:
+    """
+    Return a process-wide synchronous Redis client.
+
+    Used from sync code paths (CRUD helpers, Celery tasks) that cannot await
+    the asyncio client. The underlying connection pool is thread-safe.
+    """
+    global _sync_client
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _sync_client
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    Return a process-wide asyncio Redis client for the API's event loop.
+
+    Connections are opened lazily on first use, so an unreachable server
+    fails the requests that need it rather than application startup.
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = aioredis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _async_client
+
+
+async def close_async_redis() -> None:
+    """Close the asyncio client's connection pool."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
@@ -0,0 +1,385 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Callable, Coroutine, Iterable
+from contextlib import AsyncExitStack
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import redis
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Message
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "route-cache"
+CACHE_POLICY_ATTR = "__route_cache_policy__"
+INVALIDATES_ATTR = "__route_cache_invalidates__"
+# Set on the copied scope of a background revalidation request
+REFRESH_SCOPE_KEY = "route_cache.refresh"
+
+# Resolve the current version of every tag and read the entry for that
+# combination in one round trip. Bumping a tag's version orphans every
+# entry built under the old one; those expire on their own TTL.
+_LOOKUP_SCRIPT = """
+local versions = {}
+for i, key in ipairs(KEYS) do versions[i] = redis.call('GET', key) or '0' end
+local entry_key = ARGV[1] .. '@' .. table.concat(versions, '.')
+return {entry_key, redis.call('GET', entry_key)}
+"""
+
+Handler = Callable[[Request], Coroutine[Any, Any, Response]]
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: int
+    tags: tuple[str, ...]
+    stale_ttl: int
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: str
+    etag: str
+    media_type: str
+    fresh_until: float
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CachedResponse":
+        return cls(**json.loads(raw))
+
+
+def cached[F: Callable[..., Any]](
+    *, ttl: int, tags: Iterable[str], stale_ttl: int | None = None
+) -> Callable[[F], F]:
+    """
+    Cache a GET endpoint's response in Redis for `ttl` seconds.
+
+    After the TTL the stale copy is still served for up to `stale_ttl` seconds
+    while one background request reloads it. Entries are dropped when a
+    handler decorated with `invalidates` for one of `tags` succeeds.
+
+    Only takes effect on routers created with `route_class=CachedRoute`, and
+    must sit below the `@router.get(...)` decorator.
+    """
+    policy = CachePolicy(
+        ttl=ttl,
+        tags=tuple(tags),
+        stale_ttl=settings.ROUTE_CACHE_STALE_SECONDS if stale_ttl is None else stale_ttl,
+    )
+
+    def decorator(func: F) -> F:
+        setattr(func, CACHE_POLICY_ATTR, policy)
+        return func
+
+    return decorator
+
+
+def invalidates[F: Callable[..., Any]](*tags: str) -> Callable[[F], F]:
+    """
+    Invalidate every cached response tagged with `tags` once this (write)
+    endpoint returns a 2xx response.
+    """
+
+    def decorator(func: F) -> F:
+        setattr(func, INVALIDATES_ATTR, tags)
+        return func
+
+    return decorator
+
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    return etag in (candidate.strip().removeprefix("W/") for candidate in if_none_match.split(","))
+
+
+async def _empty_receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def _discard_send(_message: Message) -> None:
+    return None
+
+
+class RouteCache:
+    """
+    Redis-backed cache of whole JSON responses for read-heavy reference endpoints.
+
+    - Responses carry an ETag; a matching If-None-Match gets a bodyless 304.
+    - Stale entries are served while a single background request revalidates.
+    - Concurrent misses for one key coalesce: one load per process (shared
+      future) and, via a short Redis lock, one load across processes.
+    - Invalidation is by tag version, so it costs one INCR per tag.
+    - Redis errors fail open: the request is served from the database.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any] = get_async_redis) -> None:
+        self._client_factory = client_factory
+        self._inflight: dict[str, asyncio.Future[CachedResponse | None]] = {}
+        self._refreshing: set[str] = set()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.errors = 0
+
+    @property
+    def redis(self) -> Any:
+        return self._client_factory()
+
+    @staticmethod
+    def _tag_keys(tags: Iterable[str]) -> list[str]:
+        return [f"{KEY_PREFIX}:tag:{tag}" for tag in tags]
+
+    @staticmethod
+    def _base_key(request: Request) -> str:
+        query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+        return f"{KEY_PREFIX}:{request.url.path}?{query}"
+
+    async def _lookup(self, request: Request, policy: CachePolicy) -> tuple[str, CachedResponse | None]:
+        lookup = self.redis.register_script(_LOOKUP_SCRIPT)
+        entry_key, raw = await lookup(keys=self._tag_keys(policy.tags), args=[self._base_key(request)])
+        return entry_key, CachedResponse.from_json(raw) if raw else None
+
+    # -----------------
+    # Serving
+    # -----------------
+
+    async def serve(self, request: Request, policy: CachePolicy, handler: Handler, route: APIRoute) -> Response:
+        if request.method != "GET":
+            return await handler(request)
+        try:
+            entry_key, entry = await self._lookup(request, policy)
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning(f"Route cache lookup failed, serving uncached: {e}")
+            return await handler(request)
+
+        if request.scope.get(REFRESH_SCOPE_KEY):
+            # Background revalidation: always reload and store
+            _, refreshed = await self._load(request, handler, entry_key, policy)
+            return refreshed
+
+        now = time.time()
+        if entry is not None:
+            if entry.fresh_until > now:
+                self.hits += 1
+                return self._respond(request, entry, "HIT", now)
+            self.stale_hits += 1
+            self._schedule_refresh(route, request, entry_key)
+            return self._respond(request, entry, "STALE", now)
+
+        self.misses += 1
+        entry, response = await self._load_coalesced(request, handler, entry_key, policy)
+        if entry is None:
+            return response if response is not None else await handler(request)
+        return self._respond(request, entry, "MISS", time.time())
+
+    def _respond(self, request: Request, entry: CachedResponse, state: str, now: float) -> Response:
+        headers = {
+            "ETag": entry.etag,
+            "Cache-Control": f"max-age={max(0, int(entry.fresh_until - now))}",
+            "X-Cache": state,
+        }
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+    async def _load(
+        self, request: Request, handler: Handler, entry_key: str, policy: CachePolicy
+    ) -> tuple[CachedResponse | None, Response]:
+        response = await handler(request)
+        body = getattr(response, "body", None)
+        # Only complete 200 bodies are cached; errors and streams pass through
+        if response.status_code != 200 or not isinstance(body, bytes):
+            return None, response
+        try:
+            text = body.decode()
+        except UnicodeDecodeError:
+            return None, response
+        entry = CachedResponse(
+            body=text,
+            etag=make_etag(body),
+            media_type=response.media_type or response.headers.get("content-type", "application/json"),
+            fresh_until=time.time() + policy.ttl,
+        )
+        try:
+            await self.redis.set(entry_key, entry.to_json(), ex=policy.ttl + policy.stale_ttl)
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning(f"Route cache store failed for {entry_key}: {e}")
+        return entry, response
+
+    async def _load_coalesced(
+        self, request: Request, handler: Handler, entry_key: str, policy: CachePolicy
+    ) -> tuple[CachedResponse | None, Response | None]:
+        waiting = self._inflight.get(entry_key)
+        if waiting is not None:
+            # Another request in this process is already loading this key
+            entry = await asyncio.shield(waiting)
+            if entry is not None:
+                return entry, None
+            return await self._load(request, handler, entry_key, policy)
+
+        future: asyncio.Future[CachedResponse | None] = asyncio.get_running_loop().create_future()
+        self._inflight[entry_key] = future
+        entry = None
+        try:
+            entry, response = await self._load_locked(request, handler, entry_key, policy)
+            return entry, response
+        finally:
+            # Waiters reload themselves if this load failed or was not cacheable
+            future.set_result(entry)
+            del self._inflight[entry_key]
+
+    async def _load_locked(
+        self, request: Request, handler: Handler, entry_key: str, policy: CachePolicy
+    ) -> tuple[CachedResponse | None, Response | None]:
+        lock_key = f"{entry_key}:lock"
+        timeout = settings.ROUTE_CACHE_LOCK_TIMEOUT_SECONDS
+        try:
+            acquired = await self.redis.set(lock_key, "1", nx=True, px=int(timeout * 1000))
+        except redis.RedisError:
+            acquired = False
+        if not acquired:
+            # Another process holds the lock: wait for its entry rather than
+            # adding one more identical query, up to the lock timeout
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                try:
+                    raw = await self.redis.get(entry_key)
+                except redis.RedisError:
+                    break
+                if raw:
+                    return CachedResponse.from_json(raw), None
+            return await self._load(request, handler, entry_key, policy)
+        try:
+            return await self._load(request, handler, entry_key, policy)
+        finally:
+            try:
+                await self.redis.delete(lock_key)
+            except redis.RedisError:
+                pass
+
+    def _schedule_refresh(self, route: APIRoute, request: Request, entry_key: str) -> None:
+        if entry_key in self._refreshing:
+            return
+        self._refreshing.add(entry_key)
+        scope = dict(request.scope)
+        scope[REFRESH_SCOPE_KEY] = True
+        task = asyncio.create_task(self._refresh(route, scope, entry_key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, route: APIRoute, scope: dict[str, Any], entry_key: str) -> None:
+        lock_key = f"{entry_key}:lock"
+        try:
+            # One revalidation across all processes
+            if not await self.redis.set(
+                lock_key, "1", nx=True, px=int(settings.ROUTE_CACHE_LOCK_TIMEOUT_SECONDS * 1000)
+            ):
+                return
+            try:
+                # Re-enter the route's ASGI app, so dependencies get a fresh exit stack
+                async with AsyncExitStack() as stack:
+                    scope["fastapi_middleware_astack"] = stack
+                    await route.app(scope, _empty_receive, _discard_send)
+            finally:
+                await self.redis.delete(lock_key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Route cache revalidation failed for {entry_key}: {e}")
+        finally:
+            self._refreshing.discard(entry_key)
+
+    # -----------------
+    # Invalidation
+    # -----------------
+
+    async def invalidate(self, *tags: str) -> None:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in self._tag_keys(tags):
+                    pipe.incr(key)
+                await pipe.execute()
+        except redis.RedisError as e:
+            self.errors += 1
+            logger.warning(f"Route cache invalidation failed for {tags}: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "refreshing": len(self._refreshing),
+        }
+
+
+def invalidate_sync(*tags: str) -> None:
+    """
+    Invalidate cached responses from sync code (Celery tasks, sync services).
+    """
+    try:
+        pipe = get_sync_redis().pipeline(transaction=False)
+        for key in RouteCache._tag_keys(tags):
+            pipe.incr(key)
+        pipe.execute()  # type: ignore[no-untyped-call]
+    except redis.RedisError as e:
+        logger.warning(f"Route cache invalidation failed for {tags}: {e}")
+
+
+route_cache = RouteCache()
+
+
+class CachedRoute(APIRoute):
+    """
+    Route class that applies the `cached` and `invalidates` markers of its endpoint.
+    """
+
+    def get_route_handler(self) -> Handler:
+        handler = super().get_route_handler()
+        if not settings.ROUTE_CACHE_ENABLED:
+            return handler
+        policy: CachePolicy | None = getattr(self.endpoint, CACHE_POLICY_ATTR, None)
+        tags: tuple[str, ...] | None = getattr(self.endpoint, INVALIDATES_ATTR, None)
+
+        if policy is not None:
+            async def cached_handler(request: Request) -> Response:
+                return await route_cache.serve(request, policy, handler, self)
+
+            return cached_handler
+
+        if tags:
+            async def invalidating_handler(request: Request) -> Response:
+                response = await handler(request)
+                if 200 <= response.status_code < 300:
+                    await route_cache.invalidate(*tags)
+                return response
+
+            return invalidating_handler
+
+        return handler
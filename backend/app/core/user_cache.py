@@ -0,0 +1,156 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from redis.client import PubSubWorkerThread
+
+from app.core.config import settings
+from app.core.redis import get_async_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+# Redis pub/sub channel used to broadcast evictions to every worker process
+USER_CACHE_CHANNEL = "user-cache:evict"
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Slim view of a user, enough to authorize a request without loading the row."""
+
+    id: uuid.UUID
+    is_active: bool
+    is_superuser: bool
+
+
+class UserCache:
+    """
+    In-process TTL + LRU cache of authenticated users, keyed on the token subject.
+
+    Entries are evicted locally on write and the eviction is published on Redis,
+    so every worker drops its copy as well. Sync routes run in a threadpool, so
+    all access goes through a lock.
+
+    A user loaded from the database is only cached if nothing was evicted
+    while it was loading: read `generation()` before the query and pass it to
+    `put`, so a concurrent invalidation is not undone by a stale row.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, CachedUser]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every explicit eviction, see `put`
+        self._generation = 0
+        self._pubsub_thread: PubSubWorkerThread | None = None
+
+    def get(self, key: str) -> CachedUser | None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self) -> int:
+        """Eviction counter to read before loading a user for `put`."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: str, user: CachedUser, generation: int | None = None) -> None:
+        """
+        Cache `user`, unless an entry was evicted since `generation` was read:
+        the row may have been loaded before the write that evicted it.
+        """
+        if self.max_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (expires_at, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, key: str) -> None:
+        """Drop a single entry from this process only."""
+        with self._lock:
+            self._generation += 1
+            if self._entries.pop(key, None) is not None:
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def invalidate(self, user_id: uuid.UUID | str) -> None:
+        """Evict a user locally and broadcast the eviction to the other workers."""
+        key = str(user_id)
+        self.evict(key)
+        try:
+            get_sync_redis().publish(USER_CACHE_CHANNEL, key)
+        except Exception as e:
+            # Other workers fall back to the TTL if the broadcast is lost
+            logger.warning(f"Failed to publish user cache eviction for {key}: {e}")
+
+    async def ainvalidate(self, user_id: uuid.UUID | str) -> None:
+        """`invalidate` for async routes, publishing without blocking the event loop."""
+        key = str(user_id)
+        self.evict(key)
+        try:
+            await get_async_redis().publish(USER_CACHE_CHANNEL, key)
+        except Exception as e:
+            logger.warning(f"Failed to publish user cache eviction for {key}: {e}")
+
+    def stats(self) -> dict[str, int | float]:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def start_listener(self) -> None:
+        """Subscribe to eviction broadcasts in a background thread."""
+        if self._pubsub_thread is not None:
+            return
+        try:
+            pubsub = get_sync_redis().pubsub(ignore_subscribe_messages=True)  # type: ignore[no-untyped-call]
+            pubsub.subscribe(**{USER_CACHE_CHANNEL: self._on_message})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            logger.warning(f"User cache eviction listener not started: {e}")
+
+    def stop_listener(self) -> None:
+        if self._pubsub_thread is not None:
+            self._pubsub_thread.stop()
+            self._pubsub_thread = None
+
+    def _on_message(self, message: dict[str, Any]) -> None:
+        self.evict(str(message["data"]))
+
+
+user_cache = UserCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
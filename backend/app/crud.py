@@ -2,8 +2,12 @@ import uuid
 from typing import Any
 
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.core.pagination import CountMode, KeysetPaginator, Page
+from app.core.password_hasher import password_hasher
 from app.core.security import get_password_hash, verify_password
+from app.core.user_cache import user_cache
 from app.models import (
     IPAddress,
     IPAddressUpdate,
@@ -25,6 +29,15 @@ def create_user(*, session: Session, user_create: UserCreate) -> User:
     session.refresh(db_obj)
     return db_obj
 
+async def acreate_user(*, session: AsyncSession, user_create: UserCreate) -> User:
+    db_obj = User.model_validate(
+        user_create, update={"hashed_password": await password_hasher.hash(user_create.password)}
+    )
+    session.add(db_obj)
+    await session.commit()
+    await session.refresh(db_obj)
+    return db_obj
+
 def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     user_data = user_in.model_dump(exclude_unset=True)
     extra_data = {}
@@ -36,6 +49,7 @@ def update_user(*, session: Session, db_user: User, user_in: UserUpdate) -> Any:
     session.add(db_user)
     session.commit()
     session.refresh(db_user)
+    user_cache.invalidate(db_user.id)
     return db_user
 
 def get_user_by_email(*, session: Session, email: str) -> User | None:
@@ -51,6 +65,24 @@ def authenticate(*, session: Session, email: str, password: str) -> User | None:
         return None
     return db_user
 
+async def aget_user_by_email(*, session: AsyncSession, email: str) -> User | None:
+    statement = select(User).where(User.email == email)
+    return (await session.exec(statement)).first()
+
+async def aauthenticate(*, session: AsyncSession, email: str, password: str) -> User | None:
+    db_user = await aget_user_by_email(session=session, email=email)
+    if not db_user:
+        return None
+    valid, new_hash = await password_hasher.verify_and_update(password, db_user.hashed_password)
+    if not valid:
+        return None
+    if new_hash is not None:
+        # Upgrade the stored hash to the configured cost while we have the plaintext
+        db_user.hashed_password = new_hash
+        session.add(db_user)
+        await session.commit()
+    return db_user
+
 def create_item(*, session: Session, item_in: ItemCreate, owner_id: uuid.UUID) -> Item:
     db_item = Item.model_validate(item_in, update={"owner_id": owner_id})
     session.add(db_item)
@@ -74,9 +106,23 @@ def get_ip_address_by_id(session: Session, ip_id: int) -> IPAddress | None:
 def get_ip_address_by_ip(session: Session, ip: str) -> IPAddress | None:
     return session.exec(select(IPAddress).where(IPAddress.ip == ip)).first()
 
-# Get all IP Addresses
-def get_all_ip_addresses(session: Session, skip: int = 0, limit: int = 100) -> list[IPAddress]:
-    return session.exec(select(IPAddress).offset(skip).limit(limit)).all()
+# Get all IP Addresses, one keyset page at a time
+ip_address_paginator = KeysetPaginator(IPAddress.id)
+
+def get_all_ip_addresses(
+    session: Session,
+    limit: int = 100,
+    cursor: str | None = None,
+    city_id: int | None = None,
+    country_id: int | None = None,
+    count: CountMode = CountMode.none,
+) -> Page[IPAddress]:
+    statement = select(IPAddress)
+    if city_id:
+        statement = statement.where(IPAddress.city_id == city_id)
+    if country_id:
+        statement = statement.where(IPAddress.country_id == country_id)
+    return ip_address_paginator.paginate(session, statement, limit, cursor, count)
 
 # Update IP Address
 def update_ip_address(session: Session, ip_id: int, ip_address_update: IPAddressUpdate) -> IPAddress:
@@ -1,9 +1,16 @@
 import logging
+from datetime import datetime
+from typing import Any
 
-import requests
+import httpx
+from sqlalchemy import text
+from sqlmodel import col
 
-from app.api.deps import get_db
-from app.models import Record, User
+from app.core.db import SessionLocal
+from app.core.http_client import http_client
+from app.models import User
+from app.services.report_service import Report, ReportEngine
+from app.services.retention_service import RetentionEngine
 
 logger = logging.getLogger(__name__)
 
@@ -13,48 +20,38 @@ def get_users_to_notify():
     You can modify the criteria based on your application needs.
     """
     try:
-        with get_db() as session:  # Use context manager for the session
-            users = session.query(User).filter(User.notify is True).all()  # Adjust your filter as needed
+        with SessionLocal() as session:
+            users = session.query(User).filter(col(User.is_active).is_(True)).all()  # Adjust your filter as needed
             logger.info(f"Fetched {len(users)} users to notify.")
             return users
     except Exception as e:
         logger.error(f"Error fetching users to notify: {e}")
         return []  # Return an empty list in case of an error
 
-def cleanup_old_records_db(cutoff_date):
+def cleanup_old_records_db() -> list[dict[str, Any]]:
     """
-    Deletes records older than the cutoff date from the database.
-    Returns the number of records deleted.
+    Applies every retention policy (Record, PageView, OTP, AuditInfo),
+    deleting expired rows in small committed batches.
+    Returns one summary per table, including rows per second.
     """
-    try:
-        with get_db() as session:
-            old_records = session.query(Record).filter(Record.created_at < cutoff_date).delete()
-            session.commit()  # Commit the transaction
-            logger.info(f"Deleted {old_records} records older than {cutoff_date}.")
-            return old_records
-    except Exception as e:
-        logger.error(f"Error cleaning up old records: {e}")
-        return 0  # Return 0 in case of an error
+    with SessionLocal() as session:
+        return [result.as_dict() for result in RetentionEngine(session).apply_all()]
 
-def generate_report_db():
+def generate_report_db(name: str = "daily", since: datetime | None = None) -> Report:
     """
-    Generates a daily report.
-    Returns the report content as a string.
+    Builds report `name` for the data added since its last delivered run.
+    The watermark is left untouched; call advance_report_watermark once the
+    report has been sent.
     """
-    try:
-        with get_db() as session:
-            report_data = session.query(Record).all()  # Replace with your query for report data
-
-            # Example report content generation
-            report_content = "Daily Report\n\n"
-            for record in report_data:
-                report_content += f"{record.id}: {record.details}\n"  # Adjust as necessary
+    with SessionLocal() as session:
+        return ReportEngine(session).build(name, since)
 
-            logger.info("Report generated successfully.")
-            return report_content
-    except Exception as e:
-        logger.error(f"Error generating report: {e}")
-        return "Error generating report"  # Return a default message in case of an error
+def advance_report_watermark(report: Report) -> None:
+    """
+    Marks `report` as delivered, so the next run starts where it ended.
+    """
+    with SessionLocal() as session:
+        ReportEngine(session).commit_watermark(report)
 
 def check_system_health():
     """
@@ -64,8 +61,8 @@ def check_system_health():
     """
     try:
         # Check database connectivity
-        with get_db() as session:
-            session.execute("SELECT 1")  # Simple query to check connectivity
+        with SessionLocal() as session:
+            session.execute(text("SELECT 1"))  # Simple query to check connectivity
         logger.info("Database is reachable.")
         return True
     except Exception as e:
@@ -82,14 +79,14 @@ def fetch_api_data(api_url):
         dict | None: Parsed JSON data if the request is successful, otherwise None.
     """
     try:
-        response = requests.get(api_url)
+        response = http_client.request("GET", api_url)
         if response.status_code == 200:
             logger.info(f"Successfully fetched data from {api_url}.")
             return response.json()
         else:
             logger.error(f"Failed to fetch data from {api_url}. Status Code: {response.status_code}")
             return None
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Error fetching data from {api_url}: {e}")
         return None
 
@@ -101,7 +98,7 @@ def process_data(data):
     # Implement your data processing logic here
     logger.info("Processing data from external API.")
     # Example: Save data to the database, update records, etc.
-    with get_db() as session:
+    with SessionLocal() as _session:
         # Assume you have a model named ExternalData
         # external_data = ExternalData(**data)
         # session.add(external_data)
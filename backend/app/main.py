@@ -1,4 +1,4 @@
-import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 import sentry_sdk
@@ -12,10 +12,32 @@ from starlette.responses import JSONResponse
 
 # from starlette.staticfiles import StaticFiles
 from app.api.main import api_router
+from app.core.concurrency import executors
 from app.core.config import settings
-from app.core.db import close_mongo_connection, init_db, init_mongo
+from app.core.db import (
+    close_async_engine,
+    close_mongo_connection,
+    engine,
+    get_mongodb,
+    init_db,
+    init_mongo,
+)
+from app.core.email_templates import email_templates
 from app.core.exceptions import HTTPExceptionJSON
+from app.core.graphDB import graph_db
+from app.core.http_client import http_client
+from app.core.mail import close_mail_transport
+from app.core.pagination import InvalidCursorError
+from app.core.password_hasher import PasswordHasherBusyError, password_hasher
+from app.core.redis import close_async_redis
+from app.core.user_cache import user_cache
 from app.profiles.exceptions import UnexpectedRelationshipState
+from app.services.exchange_rate_service import exchange_rate_matrix
+from app.services.message_queue import rabbit_publisher
+from app.services.notification_service import NotificationService
+from app.services.pageview_service import page_view_buffer
+
+logger = logging.getLogger(__name__)
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -24,10 +46,55 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize MongoDB on startup
+    await init_mongo()
+    try:
+        await NotificationService(db=get_mongodb()).ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not ensure notification indexes: {e}")
+    # Create superuser for SQLAlchemy-based DB if needed
+    with Session(engine) as session:
+        init_db(session)
+    # Spawn the CPU worker processes before the first request needs them
+    await executors.start()
+    # Drop cached users when another worker broadcasts a change
+    user_cache.start_listener()
+    # Rebuild the conversion matrix whenever the rates task commits new rates
+    exchange_rate_matrix.start_listener()
+    # Flush buffered page views on a timer as well as by size
+    page_view_buffer.start()
+    # Compile every email template before the first email is sent
+    email_templates.preload()
+    yield
+    # Hand the remaining page views to the broker before it is disconnected
+    await page_view_buffer.stop()
+    exchange_rate_matrix.stop_listener()
+    user_cache.stop_listener()
+    # Release pooled async database connections
+    await close_async_engine()
+    # Close keep-alive connections held by the outbound HTTP client
+    await http_client.aclose()
+    # Close the asyncio Redis pool used by the route cache
+    await close_async_redis()
+    # Close the Neo4J driver and its connection pool
+    await graph_db.close()
+    # Close the RabbitMQ publisher connection and its channel pool
+    await rabbit_publisher.close()
+    # Log out of the pooled SMTP connections
+    close_mail_transport()
+    # Stop the password hashing workers and the io/cpu executors
+    password_hasher.shutdown(wait=False)
+    executors.shutdown(wait=False)
+    # Close MongoDB connection on shutdown
+    await close_mongo_connection()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -59,27 +126,21 @@ async def unicorn_exception_handler(
         status_code=400,
         content={"message": "UnexpectedRelationshipState"})
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    asyncio.run(init_mongo())
-    # Initialize MongoDB on startup
-    await init_mongo()
-    # Create superuser for SQLAlchemy-based DB if needed
-    with Session(init_db) as session:
-        init_db(session)
-    yield
-    # Close MongoDB connection on shutdown
-    await close_mongo_connection()
-
-@app.on_event("startup")
-async def startup():
-    await init_mongo()
-    pass
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_exception_handler(
+        _request: Request,
+        exc: InvalidCursorError):
+    return JSONResponse(
+        status_code=400,
+        content={"detail": str(exc)})
 
-@app.on_event("shutdown")
-async def shutdown():
-    await close_mongo_connection()
-    pass
+@app.exception_handler(PasswordHasherBusyError)
+async def password_hasher_busy_exception_handler(
+        _request: Request,
+        _exc: PasswordHasherBusyError):
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": "1"},
+        content={"detail": "Too many concurrent sign-ins, please retry shortly"})
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
-app.router.lifespan = lifespan
@@ -24,6 +24,8 @@ ItemUpdate = dynamic_import("items").ItemUpdate
 ItemPublic = dynamic_import("items").ItemPublic
 ItemsPublic = dynamic_import("items").ItemsPublic
 PageView = dynamic_import("engagementmetrics").PageView
+PageViewUrlRollup = dynamic_import("engagementmetrics").PageViewUrlRollup
+PageViewUserRollup = dynamic_import("engagementmetrics").PageViewUserRollup
 Post = dynamic_import("engagementmetrics").Post
 Comment = dynamic_import("engagementmetrics").Comment
 SocialConnection = dynamic_import("engagementmetrics").SocialConnection
@@ -34,6 +36,7 @@ PaymentProvider = dynamic_import("payments").PaymentProvider
 PaymentCreate = dynamic_import("payments").PaymentCreate
 PaymentUpdate = dynamic_import("payments").PaymentUpdate
 Professional = dynamic_import("professional").Professional
+ReportWatermark = dynamic_import("report").ReportWatermark
 Profile = dynamic_import("profile").Profile
 Role = dynamic_import("role").Role
 Service = dynamic_import("service").Service
@@ -4,7 +4,7 @@ from enum import Enum
 from typing import Any, Optional, Union
 
 from pydantic import IPvAnyAddress
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index
 from sqlmodel import Column, DateTime, Field, Relationship, SQLModel
 
 # Social Media account connections
@@ -20,15 +20,36 @@ class SocialConnection(SQLModel, table=True):
 
 # Page View Model
 class PageView(SQLModel, table=True):
+    # Range-partitioned by month on timestamp (see app.services.pageview_service);
+    # Postgres requires the partition key to be part of the primary key
+    __table_args__ = (
+        Index("ix_pageview_timestamp", "timestamp"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     user_id: uuid.UUID = Field(foreign_key="user.id")
     url: str = Field(max_length=255)
     # ip_address: "IPvAnyAddress" = Relationship(back_populates="ip_addresses")
     user_agent: str | None = None
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=datetime.utcnow, primary_key=True)
     # Relationships
     user: "User" = Relationship(back_populates="page_views") # Assuming there's a User model
 
+# Page views per URL per hour or day, maintained from PageView
+class PageViewUrlRollup(SQLModel, table=True):
+    grain: str = Field(primary_key=True, max_length=8)  # "hour" or "day"
+    bucket: datetime = Field(primary_key=True)
+    url: str = Field(primary_key=True, max_length=255)
+    views: int = 0
+
+# Page views per user per hour or day, maintained from PageView
+class PageViewUserRollup(SQLModel, table=True):
+    grain: str = Field(primary_key=True, max_length=8)  # "hour" or "day"
+    bucket: datetime = Field(primary_key=True)
+    user_id: uuid.UUID = Field(primary_key=True)
+    views: int = 0
+
 # Post Model
 class Post(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
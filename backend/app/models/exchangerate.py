@@ -2,15 +2,21 @@ import uuid
 from datetime import datetime
 from decimal import Decimal
 
-from sqlalchemy import Numeric
+from sqlalchemy import Numeric, UniqueConstraint
 from sqlmodel import Column, Field, Relationship, SQLModel
 
 
 class ExchangeRate(SQLModel, table=True):
+    # One row per currency pair; the bulk refresh upserts on this key
+    __table_args__ = (
+        UniqueConstraint("base_currency_id", "target_currency_id", name="uq_exchangerate_base_target"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     base_currency_id: uuid.UUID = Field(foreign_key="currency.id")
     target_currency_id: uuid.UUID = Field(foreign_key="currency.id")
-    rate: Decimal = Field(..., sa_column=Column(Numeric(10, 7)))
+    # Wide enough for high-denomination currencies (e.g. IRR, VND against EUR)
+    rate: Decimal = Field(..., sa_column=Column(Numeric(20, 10)))
     last_updated: datetime = Field(default_factory=datetime.utcnow)
 
     # Relationships
@@ -34,4 +34,6 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
\ No newline at end of file
+    # Only filled in when requested with ?count=exact|estimated
+    count: int | None = None
+    next_cursor: str | None = None
\ No newline at end of file
@@ -0,0 +1,10 @@
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+# Where the last successful run of each incremental report stopped
+class ReportWatermark(SQLModel, table=True):
+    name: str = Field(primary_key=True, max_length=64)
+    watermark: datetime
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -3,7 +3,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Optional
 
-from sqlalchemy import JSON, Numeric
+from sqlalchemy import JSON, Index, Numeric
 from sqlmodel import Column, Field, Relationship, SQLModel
 
 from .professional import Professional
@@ -11,6 +11,9 @@ from .professional import Professional
 
 # Professional & Service Models
 class Service(SQLModel, table=True):
+    # Newest-first keyset pagination seeks on (created_at, id)
+    __table_args__ = (Index("ix_service_created_at_id", "created_at", "id"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     name: str = Field(max_length=255)
     description: str | None = Field(default=None, max_length=255)
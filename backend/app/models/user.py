@@ -4,7 +4,7 @@ from enum import Enum
 from typing import Optional
 
 from pydantic import EmailStr
-from sqlalchemy import JSON
+from sqlalchemy import JSON, Index
 from sqlmodel import Column, Field, Relationship, SQLModel
 
 from .customizationinfo import (
@@ -58,7 +58,9 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    # Only filled in when requested with ?count=exact|estimated
+    count: int | None = None
+    next_cursor: str | None = None
 
 # Database model, database table inferred from class name
 class User(UserBase, table=True):
@@ -131,6 +133,9 @@ class RecordType(str, Enum):
 
 # Define the Record model
 class Record(SQLModel, table=True):
+    # Reports aggregate records by creation window
+    __table_args__ = (Index("ix_record_created_at", "created_at"),)
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     record_type: RecordType
     created_at: datetime = Field(default_factory=datetime.utcnow)
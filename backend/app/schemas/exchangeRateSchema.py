@@ -1,7 +1,7 @@
 from decimal import Decimal
 from typing import Optional
 import uuid
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class ExchangeRateBase(BaseModel):
     rate: Decimal
@@ -20,4 +20,22 @@ class ExchangeRateReadSchema(ExchangeRateBase):
     id: uuid.UUID
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ConversionReadSchema(BaseModel):
+    from_currency: str
+    to_currency: str
+    rate: float
+    amount: float
+    converted_amount: float
+
+class BatchConversionCreateSchema(BaseModel):
+    from_currency: str = Field(..., min_length=3, max_length=3)
+    to_currency: str = Field(..., min_length=3, max_length=3)
+    amounts: list[float] = Field(..., max_length=100_000)
+
+class BatchConversionReadSchema(BaseModel):
+    from_currency: str
+    to_currency: str
+    rate: float
+    converted_amounts: list[float]
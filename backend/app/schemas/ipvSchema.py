@@ -105,6 +105,11 @@ class IPAddressReadSchema(IPAddressBase):
     class Config:
         from_attributes = True
 
+class IPAddressPageSchema(BaseModel):
+    data: list[IPAddressReadSchema]
+    count: int | None = None
+    next_cursor: str | None = None
+
 class IPAddressDetailSchema(IPAddressReadSchema):
     geo_location: GeoLocationReadSchema | None = None  # Nested GeoLocation details
 
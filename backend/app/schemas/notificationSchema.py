@@ -1,6 +1,8 @@
 from datetime import datetime
+from typing import Any
 
 from bson import ObjectId
+from pydantic import BaseModel
 
 
 class Notification:
@@ -16,3 +18,25 @@ class Notification:
         self.metadata = metadata or {}  # Additional data (e.g., links, actions)
         self.created_at = datetime.utcnow()
         self.updated_at = datetime.utcnow()
+
+class NotificationReadSchema(BaseModel):
+    id: str
+    user_id: str
+    type: str
+    content: str
+    is_read: bool
+    metadata: dict[str, Any] = {}
+    created_at: datetime
+
+    @classmethod
+    def from_document(cls, document: dict[str, Any]) -> "NotificationReadSchema":
+        return cls(id=str(document["_id"]), **{k: v for k, v in document.items() if k != "_id"})
+
+class NotificationPageSchema(BaseModel):
+    data: list[NotificationReadSchema]
+    # Pass as `before` for the next (older) page, or as `after` for newer items
+    before: str | None = None
+    after: str | None = None
+
+class UnreadCountSchema(BaseModel):
+    unread: int
@@ -15,4 +15,7 @@ class OTPResponseSchema(BaseModel):
     user_id: int
 
     class Config:
-        from_attributes = True  # Enables SQLModel compatibility with Pydantic v2
\ No newline at end of file
+        from_attributes = True  # Enables SQLModel compatibility with Pydantic v2
+
+class OTPVerifySchema(BaseModel):
+    otp_code: str
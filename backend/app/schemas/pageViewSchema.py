@@ -0,0 +1,17 @@
+import uuid
+from enum import StrEnum
+
+from pydantic import BaseModel
+
+
+class RollupGrain(StrEnum):
+    hour = "hour"
+    day = "day"
+
+class UrlViewsSchema(BaseModel):
+    url: str
+    views: int
+
+class UserViewsSchema(BaseModel):
+    user_id: uuid.UUID
+    views: int
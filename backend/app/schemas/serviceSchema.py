@@ -19,4 +19,9 @@ class ServiceRead(ServiceBase):
     professional_id: Optional[uuid.UUID]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ServicePageSchema(BaseModel):
+    data: list[ServiceRead]
+    count: int | None = None
+    next_cursor: str | None = None
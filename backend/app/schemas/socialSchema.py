@@ -0,0 +1,29 @@
+import uuid
+
+from pydantic import BaseModel
+
+
+class ConnectionSchema(BaseModel):
+    id: uuid.UUID
+    full_name: str | None = None
+    # Number of hops from the requesting user
+    distance: int
+
+class MutualContactSchema(BaseModel):
+    id: uuid.UUID
+    full_name: str | None = None
+
+class PersonSuggestionSchema(BaseModel):
+    id: uuid.UUID
+    full_name: str | None = None
+    mutual: int
+
+class ProfessionalSuggestionSchema(BaseModel):
+    id: uuid.UUID
+    name: str
+    profession: str
+    # Connections within two hops who own this professional profile
+    connections: int
+
+class GraphSyncSchema(BaseModel):
+    task_id: str
@@ -1,21 +1,180 @@
+import logging
+import threading
 import uuid
+from collections.abc import Sequence
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from decimal import Decimal
+from typing import Any, Optional
 
-import requests
+import httpx
+import numpy as np
 from celery import Celery
-from fastapi import logger
-from sqlmodel import Session
+from fastapi.concurrency import run_in_threadpool
+from redis.client import PubSubWorkerThread
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, col, select
 
 from app.core.config import settings
 from app.core.db import SessionLocal, get_database_session
-from app.models import ExchangeRate  # Adjust based on your project
+from app.core.http_client import FetchResult, http_client
+from app.core.redis import get_sync_redis
+from app.models import Currency, ExchangeRate
 from app.schemas.exchangeRateSchema import (
     ExchangeRateCreateSchema,
     ExchangeRateUpdateSchema,
 )
 from app.workers.celery_worker import celery_worker
 
+logger = logging.getLogger(__name__)
+
+# Redis pub/sub channel telling every API worker to reload the rate matrix
+EXCHANGE_RATES_CHANNEL = "exchange-rates:updated"
+
+
+@dataclass(frozen=True)
+class ExchangeRateMatrix:
+    """
+    Immutable snapshot of every cross rate, indexed by ISO code.
+
+    `matrix[i, j]` is the amount of currency `j` bought by one unit of
+    currency `i`, derived through the base currency the rates are quoted in.
+    """
+
+    base: str
+    codes: tuple[str, ...]
+    index: dict[str, int]
+    matrix: np.ndarray
+    built_at: datetime
+
+    @classmethod
+    def build(cls, base: str, rates: dict[str, float]) -> "ExchangeRateMatrix":
+        """
+        Build the cross-rate matrix from rates quoted against a single base.
+
+        Args:
+            base (str): ISO code the rates are quoted against.
+            rates (dict[str, float]): Units of each currency per one unit of base.
+
+        Returns:
+            ExchangeRateMatrix: The new snapshot.
+        """
+        per_base = {code.upper(): float(rate) for code, rate in rates.items() if rate and rate > 0}
+        per_base[base.upper()] = 1.0
+        codes = tuple(sorted(per_base))
+        vector = np.array([per_base[code] for code in codes], dtype=np.float64)
+        matrix = vector[np.newaxis, :] / vector[:, np.newaxis]
+        matrix.setflags(write=False)
+        return cls(
+            base=base.upper(),
+            codes=codes,
+            index={code: i for i, code in enumerate(codes)},
+            matrix=matrix,
+            built_at=datetime.utcnow(),
+        )
+
+    def _position(self, code: str) -> int:
+        try:
+            return self.index[code.upper()]
+        except KeyError:
+            raise KeyError(f"Unsupported currency: {code}") from None
+
+    def rate(self, from_code: str, to_code: str) -> float:
+        return float(self.matrix[self._position(from_code), self._position(to_code)])
+
+    def convert(self, from_code: str, to_code: str, amount: float) -> float:
+        return amount * self.rate(from_code, to_code)
+
+    def convert_many(
+        self, from_codes: Sequence[str], to_codes: Sequence[str], amounts: Sequence[float] | np.ndarray
+    ) -> np.ndarray:
+        """
+        Convert many amounts in one vectorized lookup.
+
+        Args:
+            from_codes (Sequence[str]): Source ISO code per amount.
+            to_codes (Sequence[str]): Target ISO code per amount.
+            amounts (Sequence[float] | np.ndarray): Amounts to convert.
+
+        Returns:
+            np.ndarray: Converted amounts, in input order.
+        """
+        rows = np.fromiter((self._position(c) for c in from_codes), dtype=np.intp, count=len(from_codes))
+        cols = np.fromiter((self._position(c) for c in to_codes), dtype=np.intp, count=len(to_codes))
+        converted: np.ndarray = np.asarray(amounts, dtype=np.float64) * self.matrix[rows, cols]
+        return converted
+
+
+class ExchangeRateMatrixStore:
+    """
+    Holds the current ExchangeRateMatrix for this process.
+
+    Readers take the reference once and work on that snapshot; a rebuild
+    swaps in a fully built matrix, so a conversion never sees half-updated
+    rates. Rebuilds are triggered by `update_exchange_rates_task` through a
+    Redis broadcast so every worker process picks up the new rates.
+    """
+
+    def __init__(self) -> None:
+        self._matrix: ExchangeRateMatrix | None = None
+        self._lock = threading.Lock()
+        self._pubsub_thread: PubSubWorkerThread | None = None
+
+    def current(self) -> ExchangeRateMatrix:
+        """Return the live matrix, loading it from the database on first use."""
+        matrix = self._matrix
+        if matrix is None:
+            with self._lock:
+                if self._matrix is None:
+                    with SessionLocal() as session:
+                        self._matrix = ExchangeRateService(db_session=session).load_rate_matrix()
+                matrix = self._matrix
+        return matrix
+
+    def swap(self, matrix: ExchangeRateMatrix) -> None:
+        self._matrix = matrix
+
+    def rebuild(self) -> ExchangeRateMatrix:
+        with SessionLocal() as session:
+            matrix = ExchangeRateService(db_session=session).load_rate_matrix()
+        self.swap(matrix)
+        logger.info(f"Exchange rate matrix rebuilt with {len(matrix.codes)} currencies")
+        return matrix
+
+    def publish_update(self) -> None:
+        """Tell every worker process to rebuild its matrix."""
+        try:
+            get_sync_redis().publish(EXCHANGE_RATES_CHANNEL, datetime.utcnow().isoformat())
+        except Exception as e:
+            logger.warning(f"Failed to broadcast exchange rate update: {e}")
+
+    def start_listener(self) -> None:
+        """Subscribe to rate update broadcasts in a background thread."""
+        if self._pubsub_thread is not None:
+            return
+        try:
+            pubsub = get_sync_redis().pubsub(ignore_subscribe_messages=True)  # type: ignore[no-untyped-call]
+            pubsub.subscribe(**{EXCHANGE_RATES_CHANNEL: self._on_message})
+            self._pubsub_thread = pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        except Exception as e:
+            logger.warning(f"Exchange rate update listener not started: {e}")
+
+    def stop_listener(self) -> None:
+        if self._pubsub_thread is not None:
+            self._pubsub_thread.stop()
+            self._pubsub_thread = None
+
+    def _on_message(self, _message: dict[str, Any]) -> None:
+        try:
+            self.rebuild()
+        except Exception as e:
+            # Keep serving the previous snapshot rather than failing conversions
+            logger.error(f"Exchange rate matrix rebuild failed: {e}")
+
+
+exchange_rate_matrix = ExchangeRateMatrixStore()
+
 
 class ExchangeRateService:
     """
@@ -59,32 +218,216 @@ class ExchangeRateService:
         Returns:
             dict[str, float]: Dictionary of currency codes and their rates.
         """
+        # Nothing is stored here, so a later update still sees these rates as new
+        _, rates, _ = self.fetch_latest_rates(url, commit=False)
+        return rates
+
+    def fetch_latest_rates(self, url: str, commit: bool = True) -> tuple[str, dict[str, float], bool]:
+        """
+        Fetch the latest rates together with the base currency they are quoted against.
+
+        The request is conditional on the previous fetch (ETag / If-Modified-Since),
+        so an unchanged upstream payload costs a 304 and is reported as not modified.
+
+        Args:
+            url (str): URL of the exchange rate API.
+            commit (bool): False when the rates are about to be stored; the caller
+                then calls `http_client.commit_validators(url)` once they are.
+
+        Returns:
+            tuple[str, dict[str, float], bool]: Base ISO code, currency codes to rates,
+            and whether the payload changed since the last fetch.
+        """
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("rates", {})
-        except requests.RequestException as e:
+            result = http_client.fetch_json(url, commit=commit)
+        except httpx.HTTPError as e:
             raise RuntimeError(f"Failed to fetch exchange rates: {e}")
+        return self._parse_rates(result)
 
-    def update_exchange_rates(self):
+    async def afetch_latest_rates(self, url: str, commit: bool = True) -> tuple[str, dict[str, float], bool]:
+        """
+        Async counterpart of `fetch_latest_rates`, for use from `async def` routes.
+        """
+        try:
+            result = await http_client.afetch_json(url, commit=commit)
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Failed to fetch exchange rates: {e}")
+        return self._parse_rates(result)
+
+    def update_exchange_rates(self) -> int:
         """
         Fetch and update exchange rates in the database.
+
+        Returns:
+            int: Number of exchange rate rows inserted or updated; 0 when the
+            upstream payload is unchanged and the write was skipped.
+        """
+        base, rates, modified = self.fetch_latest_rates(settings.EXCHANGE_RATE_URI, commit=False)
+        if not modified:
+            logger.info("Exchange rates unchanged upstream; skipping database write")
+            return 0
+        written = self.upsert_exchange_rates(base, rates)
+        # Only now may an identical payload skip the write
+        http_client.commit_validators(settings.EXCHANGE_RATE_URI)
+        return written
+
+    async def update_exchange_rates_async(self) -> int:
+        """
+        Same as `update_exchange_rates`, but fetches without blocking the event loop.
+        The database write runs in the threadpool on this service's sync session.
+
+        Returns:
+            int: Number of exchange rate rows inserted or updated.
         """
-        rates = self.get_exchange_rate(settings.EXCHANGE_RATE_URI)
-        for currency, rate in rates.items():
-            existing_rate = (
-                self.db_session.query(ExchangeRate)
-                .filter_by(currency=currency)
-                .first()
+        base, rates, modified = await self.afetch_latest_rates(settings.EXCHANGE_RATE_URI, commit=False)
+        if not modified:
+            logger.info("Exchange rates unchanged upstream; skipping database write")
+            return 0
+        written = await run_in_threadpool(self.upsert_exchange_rates, base, rates)
+        http_client.commit_validators(settings.EXCHANGE_RATE_URI)
+        return written
+
+    def upsert_exchange_rates(self, base_code: str, rates: dict[str, float]) -> int:
+        """
+        Write a full set of rates with one lookup and one `INSERT ... ON CONFLICT DO UPDATE`.
+
+        ISO codes are resolved to currency ids in a single query; codes with no
+        matching `Currency` row are skipped. Existing (base, target) pairs get
+        their rate and `last_updated` overwritten, new pairs are inserted.
+
+        Args:
+            base_code (str): ISO code of the currency the rates are quoted against.
+            rates (dict[str, float]): Target ISO code to rate.
+
+        Returns:
+            int: Number of exchange rate rows written.
+        """
+        base_code = base_code.upper()
+        # One row per normalized code: "usd" and "USD" in the same statement
+        # would make ON CONFLICT update a row twice, which Postgres rejects
+        rates = {code.upper(): rate for code, rate in rates.items()}
+        codes = set(rates) | {base_code}
+        currency_ids = dict(
+            self.db_session.exec(
+                select(Currency.iso_code, Currency.id).where(col(Currency.iso_code).in_(codes))
+            ).all()
+        )
+        base_id = currency_ids.get(base_code)
+        if base_id is None:
+            logger.warning(f"Base currency {base_code} is not configured; skipping exchange rate update")
+            return 0
+
+        now = datetime.utcnow()
+        rows = []
+        for code, rate in rates.items():
+            target_id = currency_ids.get(code)
+            if target_id is None:
+                continue
+            rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "base_currency_id": base_id,
+                    "target_currency_id": target_id,
+                    "rate": Decimal(str(rate)),
+                    "last_updated": now,
+                }
             )
-            if existing_rate:
-                existing_rate.rate = rate
-                existing_rate.last_updated = datetime.utcnow()
-            else:
-                new_rate = ExchangeRate(currency=currency, rate=rate)
-                self.db_session.add(new_rate)
-        self.db_session.commit()  # Commit after the changes
+        skipped = len(rates) - len(rows)
+        if skipped:
+            logger.info(f"Skipped {skipped} exchange rates with no matching currency")
+        if not rows:
+            return 0
+
+        stmt = insert(ExchangeRate).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ExchangeRate.base_currency_id, ExchangeRate.target_currency_id],
+            set_={
+                "rate": stmt.excluded.rate,
+                "last_updated": stmt.excluded.last_updated,
+            },
+        )
+        self.db_session.execute(stmt)
+        self.db_session.commit()
+        logger.info(f"Upserted {len(rows)} exchange rates against {base_code}")
+        return len(rows)
+
+    def stored_base_code(self) -> str | None:
+        """
+        ISO code of the base the latest rates were stored under, which is the
+        provider's `base` and can differ from EXCHANGE_RATE_BASE_CURRENCY.
+        """
+        return self.db_session.exec(
+            select(Currency.iso_code)
+            .join(ExchangeRate, ExchangeRate.base_currency_id == Currency.id)
+            .order_by(col(ExchangeRate.last_updated).desc())
+            .limit(1)
+        ).first()
+
+    def load_rate_matrix(self, base_code: str | None = None) -> ExchangeRateMatrix:
+        """
+        Load every rate quoted against the base currency into a cross-rate matrix.
+
+        Args:
+            base_code (str | None): Base ISO code; defaults to the base of the latest
+                stored rates, or EXCHANGE_RATE_BASE_CURRENCY when there are none.
+
+        Returns:
+            ExchangeRateMatrix: A new matrix snapshot (not installed as the live one).
+        """
+        base_code = (base_code or self.stored_base_code() or settings.EXCHANGE_RATE_BASE_CURRENCY).upper()
+        base = aliased(Currency)
+        target = aliased(Currency)
+        rows = self.db_session.exec(
+            select(target.iso_code, ExchangeRate.rate)
+            .join(base, ExchangeRate.base_currency_id == base.id)
+            .join(target, ExchangeRate.target_currency_id == target.id)
+            .where(base.iso_code == base_code)
+        ).all()
+        return ExchangeRateMatrix.build(base_code, {code: float(rate) for code, rate in rows})
+
+    def convert(self, from_code: str, to_code: str, amount: float) -> tuple[float, float]:
+        """
+        Convert an amount using the live rate matrix.
+
+        Args:
+            from_code (str): Source ISO code.
+            to_code (str): Target ISO code.
+            amount (float): Amount in the source currency.
+
+        Returns:
+            tuple[float, float]: The applied rate and the converted amount.
+
+        Raises:
+            KeyError: If either currency has no rate.
+        """
+        matrix = exchange_rate_matrix.current()
+        return matrix.rate(from_code, to_code), matrix.convert(from_code, to_code, amount)
+
+    def convert_many(self, from_code: str, to_code: str, amounts: Sequence[float]) -> tuple[float, list[float]]:
+        """
+        Convert many amounts between one currency pair in a single vectorized call.
+
+        Args:
+            from_code (str): Source ISO code.
+            to_code (str): Target ISO code.
+            amounts (Sequence[float]): Amounts in the source currency.
+
+        Returns:
+            tuple[float, list[float]]: The applied rate and the converted amounts.
+
+        Raises:
+            KeyError: If either currency has no rate.
+        """
+        matrix = exchange_rate_matrix.current()
+        count = len(amounts)
+        converted = matrix.convert_many([from_code] * count, [to_code] * count, amounts)
+        return matrix.rate(from_code, to_code), converted.tolist()
+
+    @staticmethod
+    def _parse_rates(result: FetchResult) -> tuple[str, dict[str, float], bool]:
+        data = result.data or {}
+        base = data.get("base") or settings.EXCHANGE_RATE_BASE_CURRENCY
+        return base.upper(), data.get("rates", {}), result.modified
 
     def schedule_update_exchange_rates(self):
         """
@@ -1,8 +1,14 @@
 import asyncio
 import logging
+import os
+import threading
+from collections.abc import AsyncIterator, Coroutine, Iterable
+from contextlib import asynccontextmanager
+from typing import Any
 
 import aio_pika
 
+from app.core.concurrency import worker_loop
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
@@ -14,25 +20,199 @@ async def get_connection():
         logger.error(f"Error connecting to RabbitMQ: {e}")
         return None
 
-async def send_message_async(queue_name: str, message_body: str):
-    connection = await get_connection()
-    if connection is None:
-        logger.error("Connection to RabbitMQ failed, message not sent.")
-        return
 
-    async with connection:
+class RabbitPublisher:
+    """
+    Long-lived RabbitMQ publisher bound to one event loop.
+
+    Holds a single robust connection (aio_pika reconnects and restores it)
+    and a fixed pool of confirm-mode channels, so publishing costs one frame
+    round-trip instead of a connect/declare/close cycle per message. Queue and
+    exchange declarations are made once per publisher and remembered.
+    """
+
+    def __init__(self, url: str, pool_size: int, confirm_batch_size: int):
+        self.url = url
+        self.pool_size = pool_size
+        self.confirm_batch_size = confirm_batch_size
+        self._connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self._channels: asyncio.Queue[aio_pika.abc.AbstractChannel] | None = None
+        self._declared_queues: set[str] = set()
+        self._declared_exchanges: set[str] = set()
+        self._connect_lock: asyncio.Lock | None = None
+
+    async def connect(self) -> aio_pika.abc.AbstractRobustConnection:
+        if self._connection is not None and not self._connection.is_closed:
+            return self._connection
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._connection is not None and not self._connection.is_closed:
+                return self._connection
+            connection = await aio_pika.connect_robust(self.url)
+            channels: asyncio.Queue[aio_pika.abc.AbstractChannel] = asyncio.Queue(maxsize=self.pool_size)
+            for _ in range(self.pool_size):
+                channels.put_nowait(await connection.channel(publisher_confirms=True))
+            self._connection, self._channels = connection, channels
+            self._declared_queues.clear()
+            self._declared_exchanges.clear()
+            logger.info(f"RabbitMQ publisher connected with {self.pool_size} channels")
+            return connection
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            await self._connection.close()
+        self._connection = None
+        self._channels = None
+
+    @asynccontextmanager
+    async def channel(self) -> AsyncIterator[aio_pika.abc.AbstractChannel]:
+        """Borrow a channel from the pool, replacing it if it was closed while in use."""
+        connection = await self.connect()
+        channels = self._channels
+        if channels is None:
+            raise RuntimeError("RabbitMQ publisher closed while connecting")
+        channel = await channels.get()
         try:
-            channel = await connection.channel()
-            queue = await channel.declare_queue(queue_name, durable=True)
-            await channel.default_exchange.publish(
-                aio_pika.Message(body=message_body.encode()), routing_key=queue.name
+            if channel.is_closed:
+                channel = await connection.channel(publisher_confirms=True)
+            yield channel
+        finally:
+            channels.put_nowait(channel)
+
+    async def _target(
+        self, channel: aio_pika.abc.AbstractChannel, routing_key: str, exchange: str
+    ) -> aio_pika.abc.AbstractExchange:
+        """Resolve the exchange to publish on, declaring the queue/exchange on first use."""
+        if exchange:
+            if exchange not in self._declared_exchanges:
+                await channel.declare_exchange(exchange, aio_pika.ExchangeType.DIRECT, durable=True)
+                self._declared_exchanges.add(exchange)
+            # Bind the cached declaration to this channel without another round-trip
+            return await channel.get_exchange(exchange, ensure=False)
+        if routing_key not in self._declared_queues:
+            await channel.declare_queue(routing_key, durable=True)
+            self._declared_queues.add(routing_key)
+        return channel.default_exchange
+
+    @staticmethod
+    def _message(body: str | bytes, headers: dict[str, Any] | None = None,
+                 message_id: str | None = None) -> aio_pika.Message:
+        return aio_pika.Message(
+            body=body.encode() if isinstance(body, str) else body,
+            headers=headers,
+            message_id=message_id,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
+
+    async def publish(self, routing_key: str, body: str | bytes, exchange: str = "",
+                      headers: dict[str, Any] | None = None, message_id: str | None = None) -> None:
+        """
+        Publish one message and wait for the broker's confirm.
+
+        Args:
+            routing_key (str): Queue name (default exchange) or routing key.
+            body (str | bytes): Message payload.
+            exchange (str): Named direct exchange; empty for the default exchange.
+            headers (dict[str, Any] | None): Optional message headers.
+            message_id (str | None): Stable id consumers deduplicate on when
+                a retried producer publishes the same message again.
+        """
+        async with self.channel() as channel:
+            target = await self._target(channel, routing_key, exchange)
+            await target.publish(
+                self._message(body, headers, message_id),
+                routing_key=routing_key,
+                timeout=settings.RABBITMQ_PUBLISH_TIMEOUT_SECONDS,
             )
-            logger.info(f"Message sent to queue '{queue_name}' with body: {message_body}")
-        except Exception as e:
-            logger.error(f"Error sending message to queue '{queue_name}': {e}")
 
-def send_message(queue_name: str, message_body: str):
-    asyncio.run(send_message_async(queue_name, message_body))
+    async def publish_batch(self, routing_key: str, bodies: Iterable[str | bytes], exchange: str = "",
+                            headers: dict[str, Any] | None = None) -> int:
+        """
+        Publish many messages, awaiting confirms a batch at a time.
+
+        Up to `confirm_batch_size` publishes are in flight on one channel before
+        their confirms are awaited together, instead of one round-trip each.
+
+        Returns:
+            int: Number of messages confirmed by the broker.
+        """
+        confirmed = 0
+        async with self.channel() as channel:
+            target = await self._target(channel, routing_key, exchange)
+            batch: list[Coroutine[Any, Any, Any]] = []
+            for body in bodies:
+                batch.append(target.publish(
+                    self._message(body, headers),
+                    routing_key=routing_key,
+                    timeout=settings.RABBITMQ_PUBLISH_TIMEOUT_SECONDS,
+                ))
+                if len(batch) >= self.confirm_batch_size:
+                    await asyncio.gather(*batch)
+                    confirmed += len(batch)
+                    batch = []
+            if batch:
+                await asyncio.gather(*batch)
+                confirmed += len(batch)
+        return confirmed
+
+
+def _new_publisher() -> RabbitPublisher:
+    return RabbitPublisher(
+        settings.RABBITMQ_URL,
+        pool_size=settings.RABBITMQ_CHANNEL_POOL_SIZE,
+        confirm_batch_size=settings.RABBITMQ_CONFIRM_BATCH_SIZE,
+    )
+
+
+# Publisher for code running on the application's event loop (routes, lifespan)
+rabbit_publisher = _new_publisher()
+
+# Publisher bound to this process's worker loop, for sync callers (Celery tasks)
+_worker_publisher: tuple[int, RabbitPublisher] | None = None
+_worker_publisher_lock = threading.Lock()
+
+
+def worker_publisher() -> RabbitPublisher:
+    """
+    Return this process's publisher for use on `worker_loop`, re-created after a fork.
+    """
+    global _worker_publisher
+    with _worker_publisher_lock:
+        if _worker_publisher is None or _worker_publisher[0] != os.getpid():
+            _worker_publisher = (os.getpid(), _new_publisher())
+        return _worker_publisher[1]
+
+
+async def send_message_async(queue_name: str, message_body: str) -> None:
+    try:
+        await rabbit_publisher.publish(queue_name, message_body)
+        logger.info(f"Message sent to queue '{queue_name}'")
+    except Exception as e:
+        logger.error(f"Error sending message to queue '{queue_name}': {e}")
+
+def send_message(queue_name: str, message_body: str) -> None:
+    """
+    Publish from sync code, reusing this process's publisher loop and connection.
+    """
+    try:
+        worker_loop.run(
+            worker_publisher().publish(queue_name, message_body),
+            timeout=settings.RABBITMQ_PUBLISH_TIMEOUT_SECONDS,
+        )
+        logger.info(f"Message sent to queue '{queue_name}'")
+    except Exception as e:
+        logger.error(f"Error sending message to queue '{queue_name}': {e}")
+
+def send_messages(queue_name: str, message_bodies: Iterable[str | bytes]) -> int:
+    """
+    Publish many messages from sync code with batched publisher confirms.
+
+    Returns:
+        int: Number of messages confirmed by the broker.
+    """
+    # Each publish carries its own confirm timeout, so no overall deadline here
+    return worker_loop.run(worker_publisher().publish_batch(queue_name, message_bodies))
 
 async def setup_rabbitmq():
     """Initialize RabbitMQ connection, channel, and queue."""
@@ -1,6 +1,108 @@
+import json
+import logging
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
+from typing import Any
 
 from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from sqlmodel import Session, select
+from sqlmodel.sql.expression import SelectOfScalar
+
+from app.core.config import settings
+from app.models import User
+from app.services.message_queue import RabbitPublisher
+
+logger = logging.getLogger(__name__)
+
+# MongoDB's duplicate key error, raised when a retried fan-out re-inserts a notification
+DUPLICATE_KEY_ERROR = 11000
+
+
+@dataclass(frozen=True)
+class FanOutChunkReport:
+    index: int
+    size: int
+    inserted: int
+    seconds: float
+    # Already written by an earlier attempt of the same fan-out
+    duplicates: int = 0
+
+    @property
+    def per_second(self) -> float:
+        return self.inserted / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class FanOutReport:
+    """
+    Totals and per-chunk throughput for one notification fan-out.
+    """
+
+    chunks: list[FanOutChunkReport] = field(default_factory=list)
+
+    @property
+    def recipients(self) -> int:
+        return sum(chunk.size for chunk in self.chunks)
+
+    @property
+    def inserted(self) -> int:
+        return sum(chunk.inserted for chunk in self.chunks)
+
+    @property
+    def duplicates(self) -> int:
+        return sum(chunk.duplicates for chunk in self.chunks)
+
+    @property
+    def seconds(self) -> float:
+        return sum(chunk.seconds for chunk in self.chunks)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "recipients": self.recipients,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "seconds": round(self.seconds, 4),
+            "per_second": round(self.inserted / self.seconds, 1) if self.seconds else 0.0,
+            "chunks": [
+                {"index": c.index, "size": c.size, "inserted": c.inserted,
+                 "seconds": round(c.seconds, 4), "per_second": round(c.per_second, 1)}
+                for c in self.chunks
+            ],
+        }
+
+
+def stream_user_ids(session: Session, statement: SelectOfScalar[Any] | None = None,
+                    batch_size: int | None = None) -> Iterator[Any]:
+    """
+    Stream user ids from Postgres through a server-side cursor.
+
+    Args:
+        session (Session): Sync database session.
+        statement: A `select(...)` returning user ids; defaults to all active
+            users in id order, so a retried fan-out cuts the same chunks.
+        batch_size (int | None): Rows fetched per round-trip.
+
+    Yields:
+        The id of each matching user.
+    """
+    if statement is None:
+        statement = select(User.id).where(User.is_active).order_by(User.id)
+    rows = session.exec(
+        statement.execution_options(yield_per=batch_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE)
+    )
+    yield from rows
+
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[list[Any]]:
+    """Yield lists of up to `size` items without materializing the whole iterable."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
 class NotificationService:
@@ -8,17 +110,48 @@ class NotificationService:
     Service layer for managing notifications stored in MongoDB.
     """
 
-    def __init__(self, db):
+    def __init__(self, db: Any, publisher: RabbitPublisher | None = None) -> None:
         """
         Initialize the NotificationService with a MongoDB database connection.
 
         Args:
             db: MongoDB database connection.
+            publisher (RabbitPublisher | None): Broker publisher used by fan-outs,
+                bound to the same event loop as `db`.
         """
         self.db = db
         self.collection = self.db["notifications"]  # MongoDB collection name
+        # One document per user: {_id: user_id, unread: n}, kept in step with inserts/reads
+        self.counters = self.db["notification_counters"]
+        self.publisher = publisher
 
-    async def create_notification(self, user_id: ObjectId, type: str, content: str, metadata: dict | None = None) -> str:
+    async def ensure_indexes(self) -> None:
+        """
+        Create the indexes inbox queries rely on. Safe to call on every startup;
+        existing indexes with the same spec are left alone.
+        """
+        # Inbox pages: keyset on _id within a user
+        await self.collection.create_index([("user_id", ASCENDING), ("_id", DESCENDING)], name="user_id_id")
+        # get_notifications_for_user sorts by created_at
+        await self.collection.create_index(
+            [("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_created_at"
+        )
+        # Unread-only listings; only unread documents are indexed, so it stays small
+        await self.collection.create_index(
+            [("user_id", ASCENDING), ("_id", DESCENDING)],
+            name="user_id_id_unread",
+            partialFilterExpression={"is_read": False},
+        )
+        # A retried fan-out cannot notify the same user twice
+        await self.collection.create_index(
+            [("fan_out_id", ASCENDING), ("user_id", ASCENDING)],
+            name="fan_out_id_user_id",
+            unique=True,
+            partialFilterExpression={"fan_out_id": {"$exists": True}},
+        )
+
+    async def create_notification(self, user_id: ObjectId | str, type: str, content: str,
+                                  metadata: dict[str, Any] | None = None) -> str:
         """
         Create a new notification.
 
@@ -41,9 +174,105 @@ class NotificationService:
             "updated_at": datetime.utcnow(),
         }
         result = await self.collection.insert_one(notification)
+        await self._adjust_unread(user_id, 1)
         return str(result.inserted_id)
 
-    async def get_notifications_for_user(self, user_id: ObjectId, limit: int = 100) -> list[dict]:
+    async def fan_out_chunk(self, index: int, user_ids: list[str], type: str, content: str,
+                            metadata: dict[str, Any] | None = None,
+                            fan_out_id: str | None = None) -> FanOutChunkReport:
+        """
+        Insert one chunk of notifications and publish a single broker message for it.
+
+        With a `fan_out_id`, running the chunk again is safe: notifications
+        already written are rejected by a unique index, and the broker message
+        keeps the same message id for consumers to deduplicate on.
+
+        Args:
+            index (int): Position of the chunk within the fan-out.
+            user_ids (list[str]): Recipients in this chunk.
+            type (str): Type of notification (e.g., email, push).
+            content (str): Notification message.
+            metadata (Optional[dict]): Additional information or actions.
+            fan_out_id (str | None): Id shared by every attempt of one fan-out.
+
+        Returns:
+            FanOutChunkReport: Size, inserted count and elapsed time for the chunk.
+        """
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        documents = [
+            {
+                "user_id": user_id,
+                "type": type,
+                "content": content,
+                "is_read": False,
+                "metadata": metadata or {},
+                "created_at": now,
+                "updated_at": now,
+                **({"fan_out_id": fan_out_id} if fan_out_id is not None else {}),
+            }
+            for user_id in user_ids
+        ]
+        duplicates = 0
+        try:
+            # Unordered: one bad document doesn't stop the rest of the chunk
+            result = await self.collection.insert_many(documents, ordered=False)
+            inserted = len(result.inserted_ids)
+        except BulkWriteError as e:
+            inserted = e.details.get("nInserted", 0)
+            duplicates = sum(1 for error in e.details.get("writeErrors", []) if error.get("code") == DUPLICATE_KEY_ERROR)
+            failed = len(documents) - inserted - duplicates
+            if failed:
+                logger.warning(f"Notification chunk {index}: {failed} inserts failed")
+        if inserted == len(documents):
+            await self.counters.bulk_write(
+                [UpdateOne({"_id": user_id}, {"$inc": {"unread": 1}}, upsert=True) for user_id in user_ids],
+                ordered=False,
+            )
+        elif inserted or duplicates:
+            # Some inserts failed, or an earlier attempt stopped before counting;
+            # we can't tell which users are affected, so recount them
+            await self.recount_unread_many(user_ids)
+        if self.publisher is not None:
+            await self.publisher.publish(
+                settings.NOTIFICATIONS_QUEUE,
+                json.dumps({"type": type, "content": content, "user_ids": user_ids}),
+                message_id=f"notification-fan-out:{fan_out_id}:{index}" if fan_out_id is not None else None,
+            )
+        report = FanOutChunkReport(index=index, size=len(user_ids), inserted=inserted, duplicates=duplicates,
+                                   seconds=time.perf_counter() - start)
+        logger.info(
+            f"Notification chunk {index}: {report.inserted}/{report.size} in "
+            f"{report.seconds:.3f}s ({report.per_second:.0f}/s)"
+        )
+        return report
+
+    async def fan_out(self, user_ids: Iterable[Any], type: str, content: str,
+                      metadata: dict[str, Any] | None = None, chunk_size: int | None = None,
+                      fan_out_id: str | None = None) -> FanOutReport:
+        """
+        Notify many users: ids are streamed in chunks, each written with one
+        `insert_many` and announced with one broker message.
+
+        Args:
+            user_ids (Iterable): Recipient ids; consumed lazily, so a generator
+                streaming from the database works for very large audiences.
+            type (str): Type of notification (e.g., email, push).
+            content (str): Notification message.
+            metadata (Optional[dict]): Additional information or actions.
+            chunk_size (int | None): Users per chunk; defaults to NOTIFICATION_FANOUT_CHUNK_SIZE.
+            fan_out_id (str | None): Id shared by every attempt, see `fan_out_chunk`.
+
+        Returns:
+            FanOutReport: Totals and per-chunk throughput.
+        """
+        report = FanOutReport()
+        size = chunk_size or settings.NOTIFICATION_FANOUT_CHUNK_SIZE
+        for index, chunk in enumerate(chunked((str(user_id) for user_id in user_ids), size)):
+            report.chunks.append(await self.fan_out_chunk(index, chunk, type, content, metadata, fan_out_id))
+        return report
+
+    async def get_notifications_for_user(self, user_id: ObjectId, limit: int = 100) -> list[dict[str, Any]]:
         """
         Retrieve all notifications for a specific user.
 
@@ -54,24 +283,129 @@ class NotificationService:
         Returns:
             List[dict]: List of notifications for the user.
         """
-        notifications = await self.collection.find({"user_id": user_id}).sort("created_at", -1).limit(limit).to_list(length=limit)
+        notifications: list[dict[str, Any]] = await self.collection.find({"user_id": user_id}).sort("created_at", -1).limit(limit).to_list(length=limit)
         return notifications
 
-    async def mark_notification_as_read(self, notification_id: str) -> bool:
+    async def list_notifications(self, user_id: str, limit: int = 20, before: ObjectId | None = None,
+                                 after: ObjectId | None = None, unread_only: bool = False) -> dict[str, Any]:
         """
-        Mark a notification as read.
+        Page through a user's notifications, newest first, using `_id` as the cursor.
+
+        Each page is one indexed range scan regardless of how deep the user pages,
+        unlike skip/limit which rescans everything before the offset.
+
+        Args:
+            user_id (str): The user whose notifications to fetch.
+            limit (int): Page size.
+            before (ObjectId | None): Return items older than this id.
+            after (ObjectId | None): Return items newer than this id.
+            unread_only (bool): Only return unread notifications.
+
+        Returns:
+            dict: `data` (documents, newest first) plus `before`/`after` cursors for
+            the adjacent pages (None when there is nothing further that way).
+        """
+        query: dict[str, Any] = {"user_id": user_id}
+        if unread_only:
+            query["is_read"] = False
+        if before is not None:
+            query["_id"] = {"$lt": before}
+        elif after is not None:
+            query["_id"] = {"$gt": after}
+        # Walk towards `after` in ascending order so the page is the items adjacent to it
+        direction = ASCENDING if after is not None and before is None else DESCENDING
+        # Fetch one extra row to know whether another page exists
+        documents = await self.collection.find(query).sort("_id", direction).limit(limit + 1).to_list(length=limit + 1)
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+        if direction == ASCENDING:
+            documents.reverse()
+
+        older = has_more if direction == DESCENDING else after is not None
+        newer = before is not None if direction == DESCENDING else has_more
+        return {
+            "data": documents,
+            "before": str(documents[-1]["_id"]) if documents and older else None,
+            "after": str(documents[0]["_id"]) if documents and newer else None,
+        }
+
+    async def get_unread_count(self, user_id: str) -> int:
+        """
+        Read the user's unread counter; a single point lookup.
+        """
+        counter = await self.counters.find_one({"_id": user_id})
+        return max(int(counter["unread"]), 0) if counter else 0
+
+    async def recount_unread(self, user_id: str) -> int:
+        """
+        Rebuild the user's unread counter from the notifications themselves.
+        """
+        return (await self.recount_unread_many([user_id]))[user_id]
+
+    async def recount_unread_many(self, user_ids: list[str]) -> dict[str, int]:
+        """
+        Rebuild the unread counters of many users with one grouped count and
+        one bulk write, instead of a count and an update per user.
+
+        Returns:
+            dict[str, int]: Unread count per user.
+        """
+        pipeline = [
+            {"$match": {"user_id": {"$in": user_ids}, "is_read": False}},
+            {"$group": {"_id": "$user_id", "unread": {"$sum": 1}}},
+        ]
+        grouped = await self.collection.aggregate(pipeline).to_list(length=None)
+        counts = dict.fromkeys(user_ids, 0)
+        counts.update({doc["_id"]: int(doc["unread"]) for doc in grouped})
+        await self.counters.bulk_write(
+            [UpdateOne({"_id": user_id}, {"$set": {"unread": unread}}, upsert=True) for user_id, unread in counts.items()],
+            ordered=False,
+        )
+        return counts
+
+    async def _adjust_unread(self, user_id: Any, delta: int) -> None:
+        await self.counters.update_one({"_id": user_id}, {"$inc": {"unread": delta}}, upsert=True)
+
+    async def mark_notification_as_read(self, notification_id: str, user_id: str | None = None) -> bool:
+        """
+        Mark a notification as read. Marking an already read notification
+        again succeeds without changing anything.
 
         Args:
             notification_id (str): The ID of the notification to mark as read.
+            user_id (str | None): When given, only that user's notification is updated.
+
+        Returns:
+            bool: True if the notification exists (and is now read), False otherwise.
+        """
+        query: dict[str, Any] = {"_id": ObjectId(notification_id)}
+        if user_id is not None:
+            query["user_id"] = user_id
+        notification = await self.collection.find_one_and_update(
+            {**query, "is_read": False},
+            {"$set": {"is_read": True, "updated_at": datetime.utcnow()}},
+            projection={"user_id": True},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if notification is None:
+            # Already read, or not this user's notification at all
+            return await self.collection.find_one(query, projection={"_id": True}) is not None
+        await self._adjust_unread(notification["user_id"], -1)
+        return True
+
+    async def mark_all_as_read(self, user_id: str) -> int:
+        """
+        Mark every unread notification of a user as read.
 
         Returns:
-            bool: True if the update was successful, False otherwise.
+            int: Number of notifications updated.
         """
-        result = await self.collection.update_one(
-            {"_id": ObjectId(notification_id)},
-            {"$set": {"is_read": True, "updated_at": datetime.utcnow()}}
+        result = await self.collection.update_many(
+            {"user_id": user_id, "is_read": False},
+            {"$set": {"is_read": True, "updated_at": datetime.utcnow()}},
         )
-        return result.modified_count > 0
+        await self.counters.update_one({"_id": user_id}, {"$set": {"unread": 0}}, upsert=True)
+        return int(result.modified_count)
 
     async def delete_notification(self, notification_id: str) -> bool:
         """
@@ -83,5 +417,11 @@ class NotificationService:
         Returns:
             bool: True if the deletion was successful, False otherwise.
         """
-        result = await self.collection.delete_one({"_id": ObjectId(notification_id)})
-        return result.deleted_count > 0
+        notification = await self.collection.find_one_and_delete(
+            {"_id": ObjectId(notification_id)}, projection={"user_id": True, "is_read": True}
+        )
+        if notification is None:
+            return False
+        if not notification["is_read"]:
+            await self._adjust_unread(notification["user_id"], -1)
+        return True
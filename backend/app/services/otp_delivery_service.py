@@ -0,0 +1,158 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+
+from app.core.concurrency import executors
+from app.core.config import settings
+from app.core.metrics import LatencyHistogram
+from app.models import User
+from app.workers.celery_worker import celery_worker
+
+logger = logging.getLogger(__name__)
+
+OTP_QUEUE = "otp_queue"
+OTP_DEAD_LETTER_QUEUE = "otp_dead_letter"
+OTP_DEAD_LETTER_EXCHANGE = "otp_dead_letter_exchange"
+
+# Time spent in the OTP generate/resend handlers, per delivery mode, so
+# inline and queued delivery can be compared on the same worker
+otp_request_latency = {"inline": LatencyHistogram(), "queued": LatencyHistogram()}
+
+
+class OTPProvider(ABC):
+    """Sends a one-time password over SMS or email."""
+
+    name: str
+
+    @abstractmethod
+    def send_sms(self, to: str, body: str) -> None: ...
+
+    @abstractmethod
+    def send_email(self, to: str, subject: str, html_content: str) -> None: ...
+
+
+class TwilioOTPProvider(OTPProvider):
+    name = "twilio"
+
+    def send_sms(self, to: str, body: str) -> None:
+        from app.services.twilio_service import send_sms
+
+        send_sms(to, body)
+
+    def send_email(self, to: str, subject: str, html_content: str) -> None:
+        from app.utils import send_email
+
+        send_email(email_to=to, subject=subject, html_content=html_content)
+
+
+class StubOTPProvider(OTPProvider):
+    """Keeps messages in memory instead of sending them; for local use and tests."""
+
+    name = "stub"
+
+    def __init__(self) -> None:
+        self.outbox: list[dict[str, str]] = []
+
+    def send_sms(self, to: str, body: str) -> None:
+        self.outbox.append({"channel": "sms", "to": to, "body": body})
+        logger.info(f"Stub SMS to {to}")
+
+    def send_email(self, to: str, subject: str, html_content: str) -> None:
+        self.outbox.append({"channel": "email", "to": to, "body": html_content})
+        logger.info(f"Stub email to {to}")
+
+
+_provider: OTPProvider | None = None
+
+
+def get_otp_provider() -> OTPProvider:
+    """Return the process-wide provider selected by OTP_PROVIDER."""
+    global _provider
+    if _provider is None:
+        _provider = StubOTPProvider() if settings.OTP_PROVIDER == "stub" else TwilioOTPProvider()
+    return _provider
+
+
+def otp_destination(user: User) -> tuple[str, str]:
+    """
+    Where to send `user`'s codes: their phone when set, else their email.
+
+    Returns:
+        tuple[str, str]: Channel ("sms" or "email") and address.
+    """
+    # Only some user models carry a phone number
+    phone = getattr(user, "phone", None)
+    if phone:
+        return "sms", phone
+    if user.email:
+        return "email", user.email
+    raise ValueError("User must have either a phone number or email to receive an OTP.")
+
+
+def deliver_otp(channel: str, destination: str, code: str, provider: OTPProvider | None = None) -> None:
+    """Send `code` now, blocking on the provider's API."""
+    provider = provider or get_otp_provider()
+    body = f"Your {settings.PROJECT_NAME} code is {code}"
+    if channel == "sms":
+        provider.send_sms(destination, body)
+    else:
+        provider.send_email(destination, f"{settings.PROJECT_NAME} - Your one-time code", f"<p>{body}</p>")
+
+
+def enqueue_otp_delivery(channel: str, destination: str, code: str, expires_at: float) -> None:
+    """Hand delivery to the OTP queue's workers; routed there by `task_routes`."""
+    celery_worker.send_task("tasks.send_otp_task", args=[channel, destination, code, expires_at])
+
+
+def mask_destination(channel: str, destination: str) -> str:
+    """Hide all but the last digits of a phone number, or the local part of an email."""
+    if channel == "sms":
+        return "*" * max(len(destination) - 4, 0) + destination[-4:]
+    local, _, domain = destination.partition("@")
+    return f"{local[:1]}***@{domain}"
+
+
+def dead_letter_otp(channel: str, destination: str, error: str, attempts: int) -> None:
+    """
+    Record an undeliverable OTP on the dead-letter queue.
+
+    The record keeps the masked destination and the failure, not the code:
+    the queue is read by operators, and the code is useless once it expires.
+    """
+    record = {
+        "channel": channel,
+        "destination": mask_destination(channel, destination),
+        "error": error,
+        "attempts": attempts,
+        "failed_at": time.time(),
+    }
+    with celery_worker.producer_or_acquire() as producer:
+        producer.publish(
+            record,
+            exchange=OTP_DEAD_LETTER_EXCHANGE,
+            routing_key="otp.dead",
+            serializer="json",
+            declare=[celery_worker.amqp.queues[OTP_DEAD_LETTER_QUEUE]],
+            retry=True,
+        )
+
+
+async def dispatch_otp(user: User, code: str, expires_in: int) -> None:
+    """
+    Deliver `code` to `user` as OTP_DELIVERY_MODE says: queued, returning
+    once the task is published, or inline, returning once it is sent.
+    """
+    channel, destination = otp_destination(user)
+    if settings.OTP_DELIVERY_MODE == "inline":
+        await executors.io.run(deliver_otp, channel, destination, code)
+    else:
+        await executors.io.run(enqueue_otp_delivery, channel, destination, code, time.time() + expires_in)
+
+
+def otp_delivery_stats() -> dict[str, Any]:
+    return {
+        "mode": settings.OTP_DELIVERY_MODE,
+        "provider": settings.OTP_PROVIDER,
+        "request_latency": {mode: histogram.snapshot() for mode, histogram in otp_request_latency.items()},
+    }
@@ -0,0 +1,266 @@
+import hmac
+import logging
+import secrets
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from enum import StrEnum
+from typing import Any
+
+from sqlalchemy import delete, insert, update
+from sqlmodel import Session, select
+
+from app.core.concurrency import executors
+from app.core.config import settings
+from app.core.redis import get_async_redis
+from app.models import OTP, User
+from app.services.pageview_service import utc_timestamp
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "otp"
+
+# KEYS: code hash, cooldown key. ARGV: new code, ttl, cooldown, reuse flag.
+# Refuses while the cooldown key lives; otherwise stores a fresh code (or, on
+# resend, keeps the live one) and restarts the cooldown, all in one step so
+# concurrent requests cannot both send.
+_ISSUE_SCRIPT = """
+local cooldown = redis.call('PTTL', KEYS[2])
+if cooldown > 0 then return {0, cooldown} end
+local code = redis.call('HGET', KEYS[1], 'code')
+local reused = 1
+if ARGV[4] ~= '1' or not code then
+  code = ARGV[1]
+  reused = 0
+  redis.call('DEL', KEYS[1])
+  redis.call('HSET', KEYS[1], 'code', code, 'attempts', 0)
+  redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+redis.call('SET', KEYS[2], '1', 'EX', ARGV[3])
+return {1, code, redis.call('TTL', KEYS[1]), reused}
+"""
+
+# KEYS: code hash. ARGV: submitted code, max attempts.
+# A correct code or the last allowed wrong one deletes the hash; expiry is
+# the hash's own TTL.
+_VERIFY_SCRIPT = """
+local code = redis.call('HGET', KEYS[1], 'code')
+if not code then return 'expired' end
+if code == ARGV[1] then
+  redis.call('DEL', KEYS[1])
+  return 'verified'
+end
+local attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+if attempts >= tonumber(ARGV[2]) then
+  redis.call('DEL', KEYS[1])
+  return 'locked'
+end
+return 'invalid'
+"""
+
+
+class OTPStatus(StrEnum):
+    VERIFIED = "verified"
+    INVALID = "invalid"
+    # No live code: never issued, expired, or already used
+    EXPIRED = "expired"
+    # Too many wrong attempts; the code was discarded
+    LOCKED = "locked"
+
+
+@dataclass(frozen=True)
+class IssuedOTP:
+    code: str
+    expires_in: int
+    # A resend that kept the code still live instead of issuing a new one
+    reused: bool = False
+
+
+class OTPCooldownError(Exception):
+    """A code was sent to this user less than OTP_RESEND_COOLDOWN_SECONDS ago."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"OTP requested too soon, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+def generate_otp_code(length: int | None = None) -> str:
+    length = length or settings.OTP_LENGTH
+    return f"{secrets.randbelow(10 ** length):0{length}d}"
+
+
+class OTPBackend(ABC):
+    """
+    Stores one-time passwords with their expiry, resend cooldown and
+    attempt counter. Each operation is atomic per user.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int | None = None,
+        cooldown_seconds: int | None = None,
+        max_attempts: int | None = None,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds or settings.OTP_TTL_SECONDS
+        self.cooldown_seconds = cooldown_seconds or settings.OTP_RESEND_COOLDOWN_SECONDS
+        self.max_attempts = max_attempts or settings.OTP_MAX_ATTEMPTS
+
+    @abstractmethod
+    async def issue(self, user_id: uuid.UUID, reuse: bool = False) -> IssuedOTP:
+        """
+        Issue a code for `user_id`.
+
+        Args:
+            user_id (uuid.UUID): Owner of the code.
+            reuse (bool): Return the user's live code, if any, instead of a new one.
+
+        Returns:
+            IssuedOTP: The code to send and its remaining lifetime.
+
+        Raises:
+            OTPCooldownError: A code was issued within the resend cooldown.
+        """
+
+    @abstractmethod
+    async def verify(self, user_id: uuid.UUID, code: str) -> OTPStatus:
+        """Check `code`, consuming it on success and counting the attempt otherwise."""
+
+
+class RedisOTPBackend(OTPBackend):
+    """
+    Keeps each user's code in a Redis hash whose TTL is the code's expiry,
+    next to a cooldown key whose TTL is the resend cooldown. Issuing and
+    verifying are Lua scripts, so the checks and updates of one request
+    happen in a single round trip and cannot interleave with another's.
+    Nothing needs cleaning up; Redis expires both keys.
+    """
+
+    def __init__(self, client_factory: Callable[[], Any] = get_async_redis, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self._client_factory = client_factory
+
+    @property
+    def redis(self) -> Any:
+        return self._client_factory()
+
+    @staticmethod
+    def _keys(user_id: uuid.UUID) -> tuple[str, str]:
+        return f"{KEY_PREFIX}:{user_id}", f"{KEY_PREFIX}:{user_id}:cooldown"
+
+    async def issue(self, user_id: uuid.UUID, reuse: bool = False) -> IssuedOTP:
+        script = self.redis.register_script(_ISSUE_SCRIPT)
+        result = await script(
+            keys=list(self._keys(user_id)),
+            args=[generate_otp_code(), self.ttl_seconds, self.cooldown_seconds, "1" if reuse else "0"],
+        )
+        if not int(result[0]):
+            # Round the remaining milliseconds up to whole seconds
+            raise OTPCooldownError(-(-int(result[1]) // 1000))
+        return IssuedOTP(code=str(result[1]), expires_in=int(result[2]), reused=bool(int(result[3])))
+
+    async def verify(self, user_id: uuid.UUID, code: str) -> OTPStatus:
+        script = self.redis.register_script(_VERIFY_SCRIPT)
+        key, _ = self._keys(user_id)
+        return OTPStatus(await script(keys=[key], args=[code, self.max_attempts]))
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(UTC).replace(tzinfo=None)
+    return moment
+
+
+class PostgresOTPBackend(OTPBackend):
+    """
+    Keeps codes as OTP rows. Each operation is one transaction that first
+    locks the user's row, so concurrent requests for a user are serialized.
+
+    Used by tests and deployments without Redis; expired rows are left for
+    the retention task to delete.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] | None = None, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        if session_factory is None:
+            from app.core.db import SessionLocal
+
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+
+    @staticmethod
+    def _lock_user(session: Session, user_id: uuid.UUID) -> None:
+        session.exec(select(User.id).where(User.id == user_id).with_for_update())
+
+    @staticmethod
+    def _latest(session: Session, user_id: uuid.UUID) -> OTP | None:
+        return session.exec(
+            select(OTP)
+            .where(OTP.user_id == user_id)
+            .order_by(OTP.created_at.desc(), OTP.id.desc())
+            .limit(1)
+        ).first()
+
+    def _issue(self, user_id: uuid.UUID, reuse: bool) -> IssuedOTP:
+        now = datetime.utcnow()
+        with self._session_factory() as session:
+            self._lock_user(session, user_id)
+            latest = self._latest(session, user_id)
+            if latest is not None:
+                # created_at is when the code was last sent
+                waited = (now - _naive_utc(latest.created_at)).total_seconds()
+                if waited < self.cooldown_seconds:
+                    raise OTPCooldownError(int(self.cooldown_seconds - waited) + 1)
+                expires_at = _naive_utc(latest.expires_at)
+                if reuse and expires_at > now:
+                    session.execute(update(OTP).where(OTP.id == latest.id).values(created_at=utc_timestamp(now)))
+                    session.commit()
+                    return IssuedOTP(code=latest.otp_code, expires_in=int((expires_at - now).total_seconds()), reused=True)
+            code = generate_otp_code()
+            session.execute(delete(OTP).where(OTP.user_id == user_id))
+            session.execute(insert(OTP).values(
+                otp_code=code,
+                created_at=utc_timestamp(now),
+                expires_at=utc_timestamp(now + timedelta(seconds=self.ttl_seconds)),
+                attempts=0,
+                user_id=user_id,
+            ))
+            session.commit()
+            return IssuedOTP(code=code, expires_in=self.ttl_seconds)
+
+    def _verify(self, user_id: uuid.UUID, code: str) -> OTPStatus:
+        now = datetime.utcnow()
+        with self._session_factory() as session:
+            self._lock_user(session, user_id)
+            latest = self._latest(session, user_id)
+            if latest is None or _naive_utc(latest.expires_at) <= now:
+                return OTPStatus.EXPIRED
+            if hmac.compare_digest(latest.otp_code, code):
+                status = OTPStatus.VERIFIED
+            elif latest.attempts + 1 >= self.max_attempts:
+                status = OTPStatus.LOCKED
+            else:
+                session.execute(update(OTP).where(OTP.id == latest.id).values(attempts=OTP.attempts + 1))
+                session.commit()
+                return OTPStatus.INVALID
+            session.execute(delete(OTP).where(OTP.user_id == user_id))
+            session.commit()
+            return status
+
+    async def issue(self, user_id: uuid.UUID, reuse: bool = False) -> IssuedOTP:
+        return await executors.io.run(self._issue, user_id, reuse)
+
+    async def verify(self, user_id: uuid.UUID, code: str) -> OTPStatus:
+        return await executors.io.run(self._verify, user_id, code)
+
+
+_backend: OTPBackend | None = None
+
+
+def get_otp_backend() -> OTPBackend:
+    """Return the process-wide backend selected by OTP_BACKEND."""
+    global _backend
+    if _backend is None:
+        _backend = PostgresOTPBackend() if settings.OTP_BACKEND == "postgres" else RedisOTPBackend()
+    return _backend
@@ -0,0 +1,403 @@
+import asyncio
+import logging
+import re
+import time
+import uuid
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    BindParameter,
+    DateTime,
+    func,
+    insert,
+    literal,
+    literal_column,
+    text,
+)
+from sqlalchemy.dialects.postgresql import Insert as PgInsert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, select
+from sqlmodel.sql.expression import Select
+
+from app.core.concurrency import executors
+from app.core.config import settings
+from app.models import PageView, PageViewUrlRollup, PageViewUserRollup
+from app.workers.celery_worker import celery_worker
+
+logger = logging.getLogger(__name__)
+
+# Column order shared by the buffer, the Celery payload and the COPY statement
+PAGE_VIEW_COLUMNS = ("id", "user_id", "url", "user_agent", "timestamp")
+
+
+def page_view_row(user_id: uuid.UUID, url: str, user_agent: str | None) -> list[Any]:
+    """
+    One buffered page view, as JSON-serializable values in PAGE_VIEW_COLUMNS order.
+    """
+    return [str(uuid.uuid4()), str(user_id), url[:255], user_agent, datetime.now(UTC).isoformat()]
+
+
+def write_page_views(session: Session, rows: Iterable[list[Any]]) -> int:
+    """
+    Bulk insert buffered page views in a single transaction.
+
+    On Postgres the rows are streamed with COPY; other databases fall back to
+    one executemany INSERT.
+
+    Returns:
+        int: Number of rows written.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        columns = ", ".join(PAGE_VIEW_COLUMNS)
+        driver_connection = connection.connection.driver_connection
+        if driver_connection is None:
+            raise RuntimeError("The session's database connection is closed")
+        # COPY parses the text values itself: no per-row bind or round trip
+        with driver_connection.cursor() as cursor:
+            with cursor.copy(f"COPY {PageView.__tablename__} ({columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+    else:
+        session.execute(
+            insert(PageView),
+            [
+                {
+                    "id": uuid.UUID(row[0]),
+                    "user_id": uuid.UUID(row[1]),
+                    "url": row[2],
+                    "user_agent": row[3],
+                    "timestamp": datetime.fromisoformat(row[4]),
+                }
+                for row in rows
+            ],
+        )
+    session.commit()
+    return len(rows)
+
+
+def send_page_view_batch(rows: list[list[Any]]) -> None:
+    """Hand one batch to a Celery worker, which writes it with `write_page_views`."""
+    celery_worker.send_task("tasks.ingest_page_views_task", args=[rows])
+
+
+class PageViewBuffer:
+    """
+    In-process buffer in front of page-view inserts.
+
+    Requests only append a row; the buffer is flushed as one Celery task per
+    batch when it reaches `flush_size` rows or every `flush_interval` seconds,
+    and the worker writes the whole batch with COPY.
+
+    Loss is bounded rather than zero:
+    - Rows still buffered when a process is killed are lost: at most
+      `flush_size` rows or `flush_interval` seconds of traffic per process.
+      A graceful shutdown flushes them.
+    - Once `max_rows` are waiting (the broker is down or slow), new page views
+      are dropped and counted instead of growing memory without limit.
+    - A batch the broker refuses is put back while there is room for it.
+
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        flush_size: int,
+        flush_interval: float,
+        max_rows: int,
+        sender: Callable[[list[list[Any]]], None] = send_page_view_batch,
+    ) -> None:
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self._sender = sender
+        self._rows: list[list[Any]] = []
+        self._flush_lock: asyncio.Lock | None = None
+        self._timer: asyncio.Task[None] | None = None
+        self._pending_flush: asyncio.Task[int] | None = None
+        self.accepted = 0
+        self.dropped = 0
+        self.flushed_rows = 0
+        self.flushed_batches = 0
+        self.failed_batches = 0
+        self.last_flush_seconds = 0.0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, row: list[Any]) -> bool:
+        """
+        Buffer one page view.
+
+        Returns:
+            bool: False if the buffer was full and the page view was dropped.
+        """
+        if len(self._rows) >= self.max_rows:
+            self.dropped += 1
+            return False
+        self._rows.append(row)
+        self.accepted += 1
+        if len(self._rows) >= self.flush_size and (self._pending_flush is None or self._pending_flush.done()):
+            self._pending_flush = asyncio.get_running_loop().create_task(self.flush())
+        return True
+
+    async def flush(self) -> int:
+        """
+        Send everything buffered so far, `flush_size` rows per batch.
+
+        Returns:
+            int: Number of rows handed to the broker.
+        """
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        sent = 0
+        async with self._flush_lock:
+            while self._rows:
+                batch = self._rows[: self.flush_size]
+                del self._rows[: self.flush_size]
+                started = time.perf_counter()
+                try:
+                    # Publishing blocks on the broker, so keep it off the event loop
+                    await executors.io.run(self._sender, batch)
+                except Exception as e:
+                    self.failed_batches += 1
+                    room = self.max_rows - len(self._rows)
+                    if room > 0:
+                        self._rows[:0] = batch[:room]
+                    self.dropped += max(0, len(batch) - room)
+                    logger.error(f"Failed to send {len(batch)} page views: {e}")
+                    break
+                self.last_flush_seconds = time.perf_counter() - started
+                self.flushed_batches += 1
+                self.flushed_rows += len(batch)
+                sent += len(batch)
+        return sent
+
+    async def _run_timer(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._rows:
+                await self.flush()
+
+    def start(self) -> None:
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.get_running_loop().create_task(self._run_timer())
+
+    async def stop(self) -> None:
+        """Stop the timer and flush whatever is still buffered."""
+        if self._timer is not None:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        await self.flush()
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "buffered": len(self._rows),
+            "accepted": self.accepted,
+            "dropped": self.dropped,
+            "flushed_rows": self.flushed_rows,
+            "flushed_batches": self.flushed_batches,
+            "failed_batches": self.failed_batches,
+            "last_flush_seconds": round(self.last_flush_seconds, 4),
+        }
+
+
+page_view_buffer = PageViewBuffer(
+    flush_size=settings.PAGE_VIEW_FLUSH_SIZE,
+    flush_interval=settings.PAGE_VIEW_FLUSH_INTERVAL_SECONDS,
+    max_rows=settings.PAGE_VIEW_BUFFER_MAX_ROWS,
+)
+
+
+# -----------------
+# Monthly partitions
+# -----------------
+
+_PARTITION_NAME = re.compile(r"^pageview_y(\d{4})m(\d{2})$")
+
+
+def month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PageView.__tablename__}_y{month:%Y}m{month:%m}"
+
+
+def partition_month(name: str) -> datetime | None:
+    match = _PARTITION_NAME.match(name)
+    return datetime(int(match[1]), int(match[2]), 1) if match else None
+
+
+def ensure_page_view_partitions(session: Session, now: datetime | None = None, ahead: int | None = None) -> list[str]:
+    """
+    Create the partitions for the current month and the next `ahead` months.
+
+    Returns:
+        list[str]: Names of the partitions checked or created.
+    """
+    current = month_start(now or datetime.utcnow())
+    ahead = settings.PAGE_VIEW_PARTITIONS_AHEAD if ahead is None else ahead
+    names = []
+    for offset in range(ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        session.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PageView.__tablename__} "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+        ))
+        names.append(name)
+    session.commit()
+    return names
+
+
+def drop_expired_page_view_partitions(
+    session: Session, now: datetime | None = None, retention_months: int | None = None
+) -> list[str]:
+    """
+    Drop whole partitions older than the retention window.
+
+    Dropping a partition is a catalog change, so retention costs neither a
+    bulk DELETE nor the vacuum that would follow it. Rollups are kept.
+
+    Returns:
+        list[str]: Names of the dropped partitions.
+    """
+    retention_months = settings.PAGE_VIEW_RETENTION_MONTHS if retention_months is None else retention_months
+    cutoff = add_months(month_start(now or datetime.utcnow()), -retention_months)
+    partitions = session.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = :parent"
+    ), {"parent": PageView.__tablename__}).scalars().all()
+    dropped = []
+    for name in sorted(partitions):
+        month = partition_month(name)
+        if month is not None and month < cutoff:
+            session.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+    session.commit()
+    if dropped:
+        logger.info(f"Dropped page view partitions past retention: {', '.join(dropped)}")
+    return dropped
+
+
+# -----------------
+# Hourly and daily rollups
+# -----------------
+
+GRAINS = ("hour", "day")
+
+RollupModel = type[PageViewUrlRollup] | type[PageViewUserRollup]
+
+
+def utc_timestamp(moment: datetime) -> BindParameter[datetime]:
+    """
+    Bind a moment as a plain UTC timestamp, matching the naive timestamp
+    columns, so comparisons stay index- and partition-friendly.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(UTC).replace(tzinfo=None)
+    return literal(moment, DateTime())
+
+
+def _rollup_statement(model: RollupModel, dimension: str, grain: str, start: datetime, end: datetime) -> PgInsert:
+    """
+    Upsert one grain of rollups for [start, end), replacing the stored counts.
+
+    Hours are counted from raw page views and days are summed from hours, so
+    re-running a window is idempotent and never rescans a whole day of rows.
+    """
+    if grain == "hour":
+        bucket = func.date_trunc(literal_column("'hour'"), PageView.timestamp)
+        column = getattr(PageView, dimension)
+        source: Select[Any, Any, Any, int] = (
+            select(literal_column("'hour'"), bucket, column, func.count())
+            .where(PageView.timestamp >= utc_timestamp(start), PageView.timestamp < utc_timestamp(end))
+        )
+    else:
+        bucket = func.date_trunc(literal_column("'day'"), model.bucket)
+        column = getattr(model, dimension)
+        source = (
+            select(literal_column("'day'"), bucket, column, func.sum(model.views))
+            .where(model.grain == "hour", model.bucket >= utc_timestamp(start), model.bucket < utc_timestamp(end))
+        )
+    source = source.group_by(bucket, column)
+    statement = pg_insert(model).from_select(["grain", "bucket", dimension, "views"], source)
+    return statement.on_conflict_do_update(
+        index_elements=["grain", "bucket", dimension],
+        set_={"views": statement.excluded.views},
+    )
+
+
+def refresh_page_view_rollups(session: Session, since: datetime | None = None, now: datetime | None = None) -> dict[str, int]:
+    """
+    Recompute the rollups touched since `since`.
+
+    By default only the last PAGE_VIEW_ROLLUP_LOOKBACK_HOURS hours (and the
+    days containing them) are recomputed, which also picks up page views that
+    reached the table late through the ingestion buffer. Pass an older `since`
+    to backfill.
+
+    Returns:
+        dict[str, int]: Rows upserted per rollup table and grain.
+    """
+    now = now or datetime.utcnow()
+    end = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    since = since or now - timedelta(hours=settings.PAGE_VIEW_ROLLUP_LOOKBACK_HOURS)
+    hour_start = since.replace(minute=0, second=0, microsecond=0)
+    day_start = hour_start.replace(hour=0)
+    day_end = end.replace(hour=0) + timedelta(days=1)
+
+    counts: dict[str, int] = {}
+    # Core upserts: the connection's CursorResult reports the upserted rows
+    connection = session.connection()
+    for model, dimension in ((PageViewUrlRollup, "url"), (PageViewUserRollup, "user_id")):
+        hours = connection.execute(_rollup_statement(model, dimension, "hour", hour_start, end))
+        days = connection.execute(_rollup_statement(model, dimension, "day", day_start, day_end))
+        counts[f"{model.__tablename__}.hour"] = hours.rowcount
+        counts[f"{model.__tablename__}.day"] = days.rowcount
+    session.commit()
+    return counts
+
+
+def page_view_rollup_query(
+    model: RollupModel,
+    grain: str,
+    since: datetime,
+    until: datetime | None = None,
+    limit: int = 100,
+) -> Select[Any, int]:
+    """
+    Top entries of a rollup table over a period, most viewed first.
+
+    Args:
+        model: PageViewUrlRollup or PageViewUserRollup.
+        grain (str): "hour" or "day".
+        since (datetime): First bucket included.
+        until (datetime | None): First bucket excluded, open-ended by default.
+        limit (int): Maximum number of rows.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown rollup grain: {grain!r}")
+    dimension = model.url if model is PageViewUrlRollup else model.user_id
+    views = func.sum(model.views).label("views")
+    statement = select(dimension, views).where(model.grain == grain, model.bucket >= utc_timestamp(since))
+    if until is not None:
+        statement = statement.where(model.bucket < utc_timestamp(until))
+    return statement.group_by(dimension).order_by(views.desc(), dimension).limit(limit)
@@ -3,13 +3,16 @@ from datetime import datetime
 from typing import Optional, List
 
 from app.models import Payment, PaymentProvider, PaymentStatus
-from app.core.db import SessionLocal
+from sqlmodel import Session
+
 from app.schemas.paymentSchema import PaymentRequestSchema, PaymentResponseSchema, RefundRequestSchema, RefundResponseSchema
 
 
 class PaymentService:
-    def __init__(self):
-        self.db = SessionLocal
+    def __init__(self, db: Session):
+        # Callers own the session (the request's, or a task's `with SessionLocal()`),
+        # so instances never share one across threads or leak a private one
+        self.db = db
     
     def create_payment(self, payment_request: PaymentRequestSchema) -> PaymentResponseSchema:
         payment = Payment(
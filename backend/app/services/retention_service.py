@@ -0,0 +1,226 @@
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import Table, delete, inspect, text, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.models import OTP, AuditInfo, PageView, Record
+from app.services.pageview_service import utc_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """
+    Which rows of a table expire: those whose `age_column` is older than
+    RETENTION_DAYS[name] days.
+    """
+
+    name: str
+    # A mapped class: SQLModel table or declarative model
+    model: type[Any]
+    age_column: str
+
+    @property
+    def table(self) -> Table:
+        table: Table = self.model.__table__
+        return table
+
+    @property
+    def retention(self) -> timedelta:
+        return timedelta(days=settings.RETENTION_DAYS[self.name])
+
+    @property
+    def key_columns(self) -> list[Any]:
+        """Age column first, then the primary key: the keyset batches walk."""
+        age = self.table.c[self.age_column]
+        return [age, *(column for column in self.table.primary_key.columns if column is not age)]
+
+    @property
+    def index_name(self) -> str:
+        return f"ix_{self.table.name}_retention"
+
+
+@dataclass
+class RetentionResult:
+    table: str
+    cutoff: datetime
+    deleted: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    # The run stopped at RETENTION_MAX_SECONDS; the next run carries on
+    incomplete: bool = False
+    # Why the policy failed; the other policies still ran
+    error: str | None = None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "table": self.table,
+            "cutoff": self.cutoff.isoformat(),
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "incomplete": self.incomplete,
+            "error": self.error,
+        }
+
+
+POLICIES = [
+    RetentionPolicy("record", Record, "created_at"),
+    # Whole months are dropped as partitions; this trims the partial month
+    RetentionPolicy("pageview", PageView, "timestamp"),
+    RetentionPolicy("otp", OTP, "expires_at"),
+    RetentionPolicy("auditinfo", AuditInfo, "created_at"),
+]
+
+
+class RetentionEngine:
+    """
+    Deletes expired rows in small, separately committed batches.
+
+    A single `DELETE ... WHERE created_at < cutoff` holds its locks and
+    writes all of its WAL in one transaction. Here each batch is picked by
+    walking an (age, primary key) index with a keyset, deleted by primary
+    key and committed, followed by a pause so replicas and autovacuum keep
+    up. Batches never rescan rows already deleted or kept.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        batch_size: int | None = None,
+        pause_seconds: float | None = None,
+        max_seconds: float | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.session = session
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.pause_seconds = settings.RETENTION_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        self.max_seconds = max_seconds or settings.RETENTION_MAX_SECONDS
+        self._sleep = sleep
+
+    def ensure_index(self, policy: RetentionPolicy) -> None:
+        """
+        Create the (age, primary key) index the batches walk, if missing.
+
+        Built CONCURRENTLY on plain Postgres tables so writes are not
+        blocked. Partitioned tables do not support that, so the first run
+        against PageView blocks its inserts while the index builds.
+
+        A concurrent build that fails (or is cancelled) leaves an INVALID
+        index behind, which IF NOT EXISTS would then skip forever, so one is
+        dropped and rebuilt.
+        """
+        columns = ", ".join(column.name for column in policy.key_columns)
+        bind = self.session.get_bind()
+        if bind.dialect.name != "postgresql":
+            self.session.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {policy.index_name} ON {policy.table.name} ({columns})"
+            ))
+            self.session.commit()
+            return
+        partitioned = self.session.execute(
+            text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass(:table)"),
+            {"table": policy.table.name},
+        ).scalar()
+        valid = self.session.execute(
+            text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:index)"),
+            {"index": policy.index_name},
+        ).scalar()
+        self.session.commit()
+        concurrently = "" if partitioned else "CONCURRENTLY "
+        # CONCURRENTLY cannot run inside a transaction block
+        with bind.engine.connect() as connection:
+            connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+            if valid is False:
+                logger.warning(f"Rebuilding invalid retention index {policy.index_name}")
+                connection.execute(text(f"DROP INDEX {concurrently}IF EXISTS {policy.index_name}"))
+            connection.execute(text(
+                f'CREATE INDEX {concurrently}IF NOT EXISTS {policy.index_name} '
+                f'ON "{policy.table.name}" ({columns})'
+            ))
+
+    def _next_batch(self, policy: RetentionPolicy, cutoff: datetime, after: tuple[Any, ...] | None) -> list[tuple[Any, ...]]:
+        key = policy.key_columns
+        statement = select(*key).where(key[0] < utc_timestamp(cutoff))
+        if after is not None:
+            statement = statement.where(tuple_(*key) > tuple_(*after))
+        statement = statement.order_by(*key).limit(self.batch_size)
+        return [tuple(row) for row in self.session.exec(statement)]
+
+    def _delete_batch(self, policy: RetentionPolicy, batch: list[tuple[Any, ...]]) -> int:
+        primary_key = list(policy.table.primary_key.columns)
+        # Positions of the primary key columns within the keyset tuples
+        positions = [next(i for i, column in enumerate(policy.key_columns) if column is pk) for pk in primary_key]
+        if len(primary_key) == 1:
+            condition = primary_key[0].in_([row[positions[0]] for row in batch])
+        else:
+            condition = tuple_(*primary_key).in_([tuple(row[i] for i in positions) for row in batch])
+        # A core DELETE: the connection's CursorResult reports the deleted rows
+        result = self.session.connection().execute(delete(policy.table).where(condition))
+        self.session.commit()
+        return result.rowcount
+
+    def apply(self, policy: RetentionPolicy, now: datetime | None = None) -> RetentionResult:
+        """
+        Delete every row of `policy`'s table past its retention period.
+
+        Returns:
+            RetentionResult: Rows deleted, batches, elapsed time and rows per second.
+        """
+        cutoff = (now or datetime.utcnow()) - policy.retention
+        result = RetentionResult(table=policy.table.name, cutoff=cutoff)
+        self.ensure_index(policy)
+        started = time.perf_counter()
+        after = None
+        while batch := self._next_batch(policy, cutoff, after):
+            result.deleted += self._delete_batch(policy, batch)
+            result.batches += 1
+            after = batch[-1]
+            if len(batch) < self.batch_size:
+                break
+            if time.perf_counter() - started >= self.max_seconds:
+                result.incomplete = True
+                break
+            self._sleep(self.pause_seconds)
+        result.seconds = time.perf_counter() - started
+        logger.info(
+            f"Retention on {result.table}: deleted {result.deleted} rows older than {cutoff:%Y-%m-%d %H:%M} "
+            f"in {result.batches} batches, {result.rows_per_second:.0f} rows/s"
+        )
+        return result
+
+    def apply_all(self, policies: list[RetentionPolicy] | None = None, now: datetime | None = None) -> list[RetentionResult]:
+        """
+        Apply every policy with a RETENTION_DAYS entry. Tables that do not
+        exist (yet) are skipped, and a policy that fails is rolled back and
+        reported in its result without stopping the others.
+        """
+        results = []
+        existing = set(inspect(self.session.get_bind()).get_table_names())
+        for policy in policies or POLICIES:
+            if policy.name not in settings.RETENTION_DAYS:
+                continue
+            if policy.table.name not in existing:
+                logger.warning(f"Retention skipped {policy.table.name}: the table does not exist")
+                continue
+            try:
+                results.append(self.apply(policy, now))
+            except SQLAlchemyError as e:
+                self.session.rollback()
+                logger.exception(f"Retention on {policy.table.name} failed")
+                cutoff = (now or datetime.utcnow()) - policy.retention
+                results.append(RetentionResult(table=policy.table.name, cutoff=cutoff, error=str(e)))
+        return results
@@ -0,0 +1,346 @@
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from neo4j import AsyncManagedTransaction
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.graphDB import AsyncGraphDatabase, graph_db
+from app.models import Comment, Post, Professional, User
+
+logger = logging.getLogger(__name__)
+
+# Uniqueness constraints double as the indexes every MERGE and lookup seeks on
+CONSTRAINTS = [
+    "CREATE CONSTRAINT user_id IF NOT EXISTS FOR (n:User) REQUIRE n.id IS UNIQUE",
+    "CREATE CONSTRAINT professional_id IF NOT EXISTS FOR (n:Professional) REQUIRE n.id IS UNIQUE",
+    "CREATE CONSTRAINT post_id IF NOT EXISTS FOR (n:Post) REQUIRE n.id IS UNIQUE",
+    "CREATE CONSTRAINT comment_id IF NOT EXISTS FOR (n:Comment) REQUIRE n.id IS UNIQUE",
+]
+
+
+@dataclass(frozen=True)
+class Projection:
+    """
+    How one Postgres table is read and written into the graph.
+
+    The cypher stamps every node and relationship it writes with
+    `$sync_run`. Once a projection has been read in full, whatever of its
+    `label` and `relationships` still carries an older stamp no longer
+    exists in Postgres and is deleted (see `SocialGraphService.reconcile`).
+    """
+
+    name: str
+    label: str
+    columns: tuple[Any, ...]
+    cypher: str
+    # Column filtered on for incremental syncs, if the table has one
+    since_column: Any = None
+    # Relationship types derived from this table's rows
+    relationships: tuple[str, ...] = ()
+
+    def statement(self, since: datetime | None = None) -> Select[Any]:
+        statement: Select[Any] = select(*self.columns)
+        if since is not None and self.since_column is not None:
+            statement = statement.where(self.since_column >= since)
+        return statement
+
+
+# Applied in order: relationships MATCH nodes written by earlier projections
+PROJECTIONS = [
+    Projection(
+        name="users",
+        label="User",
+        columns=(User.id, User.full_name, User.is_active),
+        cypher=(
+            "UNWIND $rows AS row "
+            "MERGE (u:User {id: row.id}) "
+            "SET u.full_name = row.full_name, u.is_active = row.is_active, u.sync_run = $sync_run"
+        ),
+    ),
+    Projection(
+        name="professionals",
+        label="Professional",
+        columns=(Professional.id, Professional.user_id, Professional.name,
+                 Professional.profession, Professional.is_active),
+        cypher=(
+            "UNWIND $rows AS row "
+            "MERGE (p:Professional {id: row.id}) "
+            "SET p.name = row.name, p.profession = row.profession, p.is_active = row.is_active, "
+            "p.sync_run = $sync_run "
+            "WITH p, row MATCH (u:User {id: row.user_id}) "
+            "MERGE (u)-[r:OWNS]->(p) "
+            "SET r.sync_run = $sync_run"
+        ),
+        relationships=("OWNS",),
+    ),
+    Projection(
+        name="posts",
+        label="Post",
+        columns=(Post.id, Post.author_id, Post.title, Post.created_at),
+        cypher=(
+            "UNWIND $rows AS row "
+            "MERGE (p:Post {id: row.id}) "
+            "SET p.title = row.title, p.created_at = datetime(row.created_at), p.sync_run = $sync_run "
+            "WITH p, row MATCH (u:User {id: row.author_id}) "
+            "MERGE (u)-[r:AUTHORED]->(p) "
+            "SET r.sync_run = $sync_run"
+        ),
+        since_column=Post.created_at,
+        relationships=("AUTHORED",),
+    ),
+    Projection(
+        name="comments",
+        label="Comment",
+        columns=(Comment.id, Comment.user_id, Comment.post_id, Comment.created_at),
+        # Commenting on someone's post connects the two users; posts without
+        # a projected author still get their comments
+        cypher=(
+            "UNWIND $rows AS row "
+            "MATCH (u:User {id: row.user_id}) "
+            "MATCH (p:Post {id: row.post_id}) "
+            "MERGE (c:Comment {id: row.id}) "
+            "SET c.created_at = datetime(row.created_at), c.sync_run = $sync_run "
+            "MERGE (u)-[:WROTE]->(c) "
+            "MERGE (c)-[:ON]->(p) "
+            "WITH u, p OPTIONAL MATCH (p)<-[:AUTHORED]-(author:User) "
+            "WITH u, author WHERE author IS NOT NULL AND u <> author "
+            "MERGE (u)-[r:CONNECTED]-(author) "
+            "SET r.sync_run = $sync_run"
+        ),
+        since_column=Comment.created_at,
+        relationships=("CONNECTED",),
+    ),
+]
+
+
+def _graph_value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_projection_rows(session: Session, statement: Select[Any], batch_size: int | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Stream rows for a projection from Postgres through a server-side cursor,
+    as dicts of graph-friendly values.
+    """
+    result = session.execute(
+        statement.execution_options(yield_per=batch_size or settings.NEO4J_UNWIND_BATCH_SIZE)
+    )
+    for row in result:
+        yield {key: _graph_value(value) for key, value in row._mapping.items()}
+
+
+class SocialGraphCache:
+    """
+    Short-lived, per-user cache of graph query results.
+
+    Relationship queries fan out quickly, while the projection only changes
+    when the sync task runs, so answers stay cached for a few seconds per user.
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[Any, ...], tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: tuple[Any, ...]) -> Any | None:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: tuple[Any, ...], value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: uuid.UUID | str) -> None:
+        user_key = str(user_id)
+        for key in [key for key in self._entries if key[0] == user_key]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+social_graph_cache = SocialGraphCache(
+    max_size=settings.SOCIAL_GRAPH_CACHE_MAX_SIZE,
+    ttl_seconds=settings.SOCIAL_GRAPH_CACHE_TTL_SECONDS,
+)
+
+
+class SocialGraphService:
+    """
+    Projects users, professionals, posts and comments into Neo4J and answers
+    relationship queries (N-hop connections, mutual contacts, suggestions)
+    that would need recursive joins in Postgres.
+
+    Users are CONNECTED when one has commented on the other's post.
+    """
+
+    def __init__(self, graph: AsyncGraphDatabase | None = None, cache: SocialGraphCache | None = None) -> None:
+        self.graph = graph or graph_db
+        self.cache = cache or social_graph_cache
+
+    # -----------------
+    # Projection
+    # -----------------
+
+    async def ensure_constraints(self) -> None:
+        async def _create(tx: AsyncManagedTransaction, query: str) -> None:
+            await (await tx.run(query)).consume()
+
+        for constraint in CONSTRAINTS:
+            await self.graph.write_tx(_create, constraint)
+
+    async def project(self, projection: Projection, rows: list[dict[str, Any]], sync_run: str | None = None) -> int:
+        """
+        Write one batch of rows for `projection` into the graph.
+
+        Args:
+            sync_run (str | None): Stamp of the current sync, for `reconcile`.
+
+        Returns:
+            int: Number of rows written.
+        """
+        return await self.graph.write_batches(projection.cypher, rows, sync_run=sync_run)
+
+    async def _delete_unstamped(self, query: str, sync_run: str) -> int:
+        async def _delete(tx: AsyncManagedTransaction) -> int:
+            record = await (await tx.run(
+                query, {"sync_run": sync_run, "limit": settings.NEO4J_UNWIND_BATCH_SIZE}
+            )).single()
+            return int(record["deleted"]) if record is not None else 0
+
+        deleted = 0
+        # Bounded transactions, like the writes
+        while batch := await self.graph.write_tx(_delete):
+            deleted += batch
+        return deleted
+
+    async def reconcile(self, projection: Projection, sync_run: str) -> int:
+        """
+        Delete `projection`'s nodes and relationships that `sync_run` did not
+        write, i.e. rows deleted from Postgres since an earlier sync. Only
+        valid after the projection was read in full during `sync_run`.
+
+        Returns:
+            int: Nodes and relationships deleted.
+        """
+        # Labels and types cannot be parameters; both come from PROJECTIONS
+        deleted = await self._delete_unstamped(
+            f"MATCH (n:{projection.label}) WHERE n.sync_run IS NULL OR n.sync_run <> $sync_run "
+            "WITH n LIMIT $limit DETACH DELETE n RETURN count(*) AS deleted",
+            sync_run,
+        )
+        for relationship in projection.relationships:
+            deleted += await self._delete_unstamped(
+                f"MATCH ()-[r:{relationship}]->() WHERE r.sync_run IS NULL OR r.sync_run <> $sync_run "
+                "WITH r LIMIT $limit DELETE r RETURN count(*) AS deleted",
+                sync_run,
+            )
+        return deleted
+
+    # -----------------
+    # Queries
+    # -----------------
+
+    async def _cached(self, key: tuple[Any, ...], query: str, **params: Any) -> list[dict[str, Any]]:
+        records = self.cache.get(key)
+        if records is None:
+            records = await self.graph.read(query, **params)
+            self.cache.put(key, records)
+        return records
+
+    async def connections(self, user_id: uuid.UUID, hops: int = 2, limit: int = 50) -> list[dict[str, Any]]:
+        """
+        Users reachable from `user_id` within `hops` connections, nearest first.
+
+        Args:
+            user_id (uuid.UUID): The user to start from.
+            hops (int): Maximum path length, capped at SOCIAL_GRAPH_MAX_HOPS.
+            limit (int): Maximum number of users returned.
+
+        Returns:
+            list[dict]: `id`, `full_name` and `distance` of each connection.
+        """
+        hops = max(1, min(hops, settings.SOCIAL_GRAPH_MAX_HOPS))
+        # Variable-length bounds cannot be parameters; hops is a clamped int
+        query = (
+            f"MATCH path = (me:User {{id: $user_id}})-[:CONNECTED*1..{hops}]-(other:User) "
+            "WHERE other <> me "
+            "WITH other, min(length(path)) AS distance "
+            "RETURN other.id AS id, other.full_name AS full_name, distance "
+            "ORDER BY distance, id LIMIT $limit"
+        )
+        return await self._cached(
+            (str(user_id), "connections", hops, limit), query, user_id=str(user_id), limit=limit
+        )
+
+    async def mutual_contacts(self, user_id: uuid.UUID, other_id: uuid.UUID, limit: int = 50) -> list[dict[str, Any]]:
+        """
+        Users directly connected to both `user_id` and `other_id`.
+        """
+        query = (
+            "MATCH (me:User {id: $user_id})-[:CONNECTED]-(mutual:User)-[:CONNECTED]-(other:User {id: $other_id}) "
+            "WHERE mutual <> me AND mutual <> other "
+            "RETURN DISTINCT mutual.id AS id, mutual.full_name AS full_name "
+            "ORDER BY id LIMIT $limit"
+        )
+        return await self._cached(
+            (str(user_id), "mutual", str(other_id), limit), query,
+            user_id=str(user_id), other_id=str(other_id), limit=limit,
+        )
+
+    async def people_you_may_know(self, user_id: uuid.UUID, limit: int = 20) -> list[dict[str, Any]]:
+        """
+        Active friends-of-friends who are not yet connected, ranked by mutual contacts.
+        """
+        query = (
+            "MATCH (me:User {id: $user_id})-[:CONNECTED]-(mutual:User)-[:CONNECTED]-(candidate:User) "
+            "WHERE candidate <> me AND candidate.is_active AND NOT (me)-[:CONNECTED]-(candidate) "
+            "RETURN candidate.id AS id, candidate.full_name AS full_name, count(DISTINCT mutual) AS mutual "
+            "ORDER BY mutual DESC, id LIMIT $limit"
+        )
+        return await self._cached(
+            (str(user_id), "people", limit), query, user_id=str(user_id), limit=limit
+        )
+
+    async def professionals_you_may_know(self, user_id: uuid.UUID, limit: int = 20) -> list[dict[str, Any]]:
+        """
+        Active professionals owned by users within two hops, ranked by how many
+        of those users lead to them.
+        """
+        query = (
+            "MATCH (me:User {id: $user_id})-[:CONNECTED*1..2]-(owner:User)-[:OWNS]->(p:Professional) "
+            "WHERE owner <> me AND p.is_active AND NOT (me)-[:OWNS]->(p) "
+            "RETURN p.id AS id, p.name AS name, p.profession AS profession, "
+            "count(DISTINCT owner) AS connections "
+            "ORDER BY connections DESC, id LIMIT $limit"
+        )
+        return await self._cached(
+            (str(user_id), "professionals", limit), query, user_id=str(user_id), limit=limit
+        )
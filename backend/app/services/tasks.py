@@ -1,12 +1,20 @@
 import logging
 import time
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime
+from typing import Any
 
-from bson import ObjectId
-from celery import shared_task
+from celery import Task, shared_task
+from celery.signals import worker_process_init  # type: ignore[import-untyped]
 
-from app.core.db import SessionLocal, get_database_session, mongodb_db
+from app.core.concurrency import worker_loop
+from app.core.config import settings
+from app.core.db import SessionLocal, get_worker_mongodb
+from app.core.email_templates import email_templates
+from app.core.mail import MailMessage, get_mail_transport
+from app.core.route_cache import invalidate_sync
 from app.helpers.task_helpers import (
+    advance_report_watermark,
     check_system_health,
     cleanup_old_records_db,
     clear_cache,
@@ -16,15 +24,38 @@ from app.helpers.task_helpers import (
     update_cache,
 )
 from app.models import Record
-from app.services.exchange_rate_service import ExchangeRateService
-from app.services.notification_service import NotificationService
+from app.services.exchange_rate_service import ExchangeRateService, exchange_rate_matrix
+from app.services.notification_service import (
+    FanOutReport,
+    NotificationService,
+    chunked,
+    stream_user_ids,
+)
+from app.services.otp_delivery_service import dead_letter_otp, deliver_otp
+from app.services.pageview_service import (
+    drop_expired_page_view_partitions,
+    ensure_page_view_partitions,
+    refresh_page_view_rollups,
+    write_page_views,
+)
+from app.services.social_graph_service import (
+    PROJECTIONS,
+    SocialGraphService,
+    stream_projection_rows,
+)
+from app.utils import send_email as send_html_email
 from app.workers.celery_worker import celery_worker
 
 from .email_service import send_email  # Assumes you have an email service
-from .message_queue import send_message
+from .message_queue import send_message, worker_publisher
 
 logger = logging.getLogger(__name__)
 
+@worker_process_init.connect  # type: ignore[untyped-decorator]
+def preload_email_templates(**_kwargs: Any) -> None:
+    """Compile the email templates once per worker process, not per email."""
+    email_templates.preload()
+
 @celery_worker.task
 def process_payment(payment_id: int, amount: float, user_id: int):
     try:
@@ -68,19 +99,19 @@ def send_notification_task(user_id: str, message: str):
         dict: A result dictionary indicating the task status.
     """
     # Initialize the NotificationService
-    notification_service = NotificationService(db=mongodb_db)
+    notification_service = NotificationService(db=get_worker_mongodb())
 
     try:
         # Create a new notification for the user
-        notification_id = notification_service.create_notification(
-            user_id=ObjectId(user_id),  # Convert user_id to MongoDB ObjectId
+        notification_id = worker_loop.run(notification_service.create_notification(
+            user_id=user_id,
             type="system",  # Example notification type
             content=message,
-        )
+        ))
         logger.info(f"Notification created for user {user_id}: {message}")
 
         # Simulate sending the notification (e.g., via WebSocket, Email, etc.)
-        send_message("notifications", message)
+        send_message(settings.NOTIFICATIONS_QUEUE, message)
         logger.info(f"Notification sent to user {user_id}: {message}")
 
         return {"status": "notification_sent", "user_id": user_id, "message": message, "notification_id": notification_id}
@@ -89,6 +120,44 @@ def send_notification_task(user_id: str, message: str):
         logger.error(f"Error sending notification to user {user_id}: {e}")
         return {"status": "failed", "error": str(e)}
 
+@celery_worker.task  # type: ignore[untyped-decorator]
+def fan_out_notification_task(message: str, user_ids: list[str] | None = None, type: str = "system",
+                              metadata: dict[str, Any] | None = None,
+                              fan_out_id: str | None = None) -> dict[str, Any]:
+    """
+    Notify many users from a single task.
+
+    Args:
+        message (str): The message content for the notification.
+        user_ids (list[str] | None): Recipients; when omitted, every active user
+            is streamed from the database.
+        type (str): Notification type.
+        metadata (dict | None): Additional information or actions.
+        fan_out_id (str | None): Idempotency key; defaults to the task id, so a
+            redelivered or retried task neither notifies a user twice nor
+            publishes chunks under new message ids.
+
+    Returns:
+        dict: Totals and per-chunk throughput.
+    """
+    fan_out_id = fan_out_id or fan_out_notification_task.request.id or uuid.uuid4().hex
+    notification_service = NotificationService(db=get_worker_mongodb(), publisher=worker_publisher())
+    report = FanOutReport()
+    with SessionLocal() as session:
+        ids = user_ids if user_ids is not None else stream_user_ids(session)
+        # Chunks are cut here and each one is written on the worker loop, so the
+        # database cursor stays on this thread
+        for index, chunk in enumerate(chunked((str(i) for i in ids), settings.NOTIFICATION_FANOUT_CHUNK_SIZE)):
+            report.chunks.append(worker_loop.run(
+                notification_service.fan_out_chunk(index, chunk, type, message, metadata, fan_out_id)
+            ))
+    summary = report.as_dict()
+    logger.info(
+        f"Fan-out finished: {summary['inserted']}/{summary['recipients']} notifications "
+        f"in {summary['seconds']}s ({summary['per_second']}/s)"
+    )
+    return summary
+
 @celery_worker.task
 def generate_report(report_id: int):
     try:
@@ -103,12 +172,17 @@ def generate_report(report_id: int):
 def cleanup_old_records():
     logger.info("Starting cleanup of old records...")
     try:
-        cutoff_date = datetime.now() - timedelta(days=30)
-        records_deleted = cleanup_old_records_db(cutoff_date)
-        logger.info(f"Deleted {records_deleted} old records from the database.")
+        results = cleanup_old_records_db()
+        for result in results:
+            logger.info(
+                f"Deleted {result['deleted']} rows from {result['table']} "
+                f"at {result['rows_per_second']} rows/s"
+            )
+        return results
     except Exception as e:
         logger.error(f"Error during cleanup of old records: {e}")
-    logger.info("Finished cleanup of old records.")
+    finally:
+        logger.info("Finished cleanup of old records.")
 
 @celery_worker.task
 def backup_database():
@@ -127,13 +201,26 @@ def refresh_cache():
     except Exception as e:
         logger.error(f"Error refreshing cache: {e}")
 
-@celery_worker.task
-def generate_daily_report():
+@celery_worker.task  # type: ignore[untyped-decorator]
+def generate_daily_report(since: str | None = None) -> None:
+    """
+    Build the daily report for the data added since the last delivered one
+    and email it.
+
+    Args:
+        since (str | None): ISO timestamp to start from instead of the watermark.
+    """
     logger.info("Generating daily report...")
     try:
-        report = generate_report_db()
-        send_email("admin@example.com", "Daily Report", report)
-        logger.info("Daily report generated and sent to admin via email.")
+        started = time.perf_counter()
+        report = generate_report_db("daily", datetime.fromisoformat(since) if since else None)
+        send_html_email(
+            email_to=settings.REPORT_RECIPIENT or settings.FIRST_SUPERUSER,
+            subject=report.subject,
+            html_content=report.html,
+        )
+        advance_report_watermark(report)
+        logger.info(f"Daily report sent in {time.perf_counter() - started:.2f}s")
     except Exception as e:
         logger.error(f"Error generating daily report: {e}")
     logger.info("Finished generating daily report.")
@@ -176,9 +263,153 @@ def update_exchange_rates_task():
     """
     Celery task to update exchange rates in the database.
     """
-    db_session = next(get_database_session())
-    try:
+    with SessionLocal() as db_session:
         exchange_rate_service = ExchangeRateService(db_session=db_session, celery_app=celery_worker)
-        exchange_rate_service.update_exchange_rates()
-    finally:
-        db_session.close()
+        written = exchange_rate_service.update_exchange_rates()
+    # Rates are committed; have every API worker swap in a rebuilt conversion matrix
+    if written:
+        exchange_rate_matrix.publish_update()
+        invalidate_sync("exchange-rates")
+
+@shared_task(name="tasks.ingest_page_views_task")  # type: ignore[untyped-decorator]
+def ingest_page_views_task(rows: list[list[Any]]) -> int:
+    """
+    Write one buffered batch of page views from an API worker.
+
+    Args:
+        rows (list[list]): Rows in PAGE_VIEW_COLUMNS order.
+    """
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        written = write_page_views(db, rows)
+    logger.info(f"Wrote {written} page views in {time.perf_counter() - started:.3f}s")
+    return written
+
+@shared_task(name="tasks.maintain_page_view_partitions_task")  # type: ignore[untyped-decorator]
+def maintain_page_view_partitions_task() -> dict[str, list[str]]:
+    """
+    Create the upcoming monthly page view partitions and drop the expired ones.
+    """
+    with SessionLocal() as db:
+        created = ensure_page_view_partitions(db)
+        dropped = drop_expired_page_view_partitions(db)
+    return {"ensured": created, "dropped": dropped}
+
+@shared_task(name="tasks.refresh_page_view_rollups_task")  # type: ignore[untyped-decorator]
+def refresh_page_view_rollups_task(since: str | None = None) -> dict[str, int]:
+    """
+    Recompute the hourly and daily page view rollups for recent hours.
+
+    Args:
+        since (str | None): ISO timestamp to backfill from instead of the
+            default lookback window.
+    """
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        counts = refresh_page_view_rollups(db, datetime.fromisoformat(since) if since else None)
+    logger.info(f"Refreshed page view rollups {counts} in {time.perf_counter() - started:.2f}s")
+    return counts
+
+@shared_task(name="tasks.sync_social_graph_task")  # type: ignore[untyped-decorator]
+def sync_social_graph_task(since: str | None = None) -> dict[str, int]:
+    """
+    Project users, professionals, posts and comments from Postgres into Neo4J.
+
+    Args:
+        since (str | None): ISO timestamp; when set, only posts and comments
+            created after it are projected. Users and professionals are
+            always re-projected, MERGE makes that idempotent.
+
+    Every table read in full (all of them without `since`) is then
+    reconciled: graph nodes and relationships for rows deleted from
+    Postgres are removed.
+
+    Returns:
+        dict: Rows projected per table, and graph entries deleted per
+            reconciled table under "<table>_deleted".
+    """
+    service = SocialGraphService()
+    worker_loop.run(service.ensure_constraints())
+    since_at = datetime.fromisoformat(since) if since else None
+    sync_run = uuid.uuid4().hex
+    counts: dict[str, int] = {}
+    with SessionLocal() as session:
+        for projection in PROJECTIONS:
+            started = time.perf_counter()
+            counts[projection.name] = 0
+            # Batches are cut here and written on the worker loop, as in the notification fan-out
+            rows = stream_projection_rows(session, projection.statement(since_at))
+            for batch in chunked(rows, settings.NEO4J_UNWIND_BATCH_SIZE):
+                counts[projection.name] += worker_loop.run(service.project(projection, batch, sync_run))
+            logger.info(
+                f"Projected {counts[projection.name]} {projection.name} into the graph "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+    # Only once every projection is written, since relationships span tables
+    for projection in PROJECTIONS:
+        if since_at is None or projection.since_column is None:
+            counts[f"{projection.name}_deleted"] = worker_loop.run(service.reconcile(projection, sync_run))
+    return counts
+
+@shared_task(  # type: ignore[untyped-decorator]
+    name="tasks.send_otp_task",
+    bind=True,
+    acks_late=True,
+    max_retries=settings.OTP_DELIVERY_MAX_RETRIES,
+)
+def send_otp_task(self: Task, channel: str, destination: str, code: str, expires_at: float) -> dict[str, str]:
+    """
+    Deliver a one-time password, retrying with exponential backoff.
+
+    Args:
+        channel (str): "sms" or "email".
+        destination (str): Phone number or email address.
+        code (str): The code to send.
+        expires_at (float): Unix time the code expires; later it is not sent.
+    """
+    if time.time() >= expires_at:
+        logger.warning(f"Dropping OTP delivery to {channel} after the code expired")
+        return {"status": "expired"}
+    try:
+        deliver_otp(channel, destination, code)
+    except ValueError as e:
+        logger.error(f"OTP delivery over {channel} is not retryable: {e}")
+        return {"status": "failed", "error": str(e)}
+    except Exception as e:
+        if self.request.retries >= self.max_retries:
+            logger.error(f"OTP delivery over {channel} failed {self.request.retries + 1} times, dead-lettering: {e}")
+            # A masked record instead of rejecting the message, which would
+            # dead-letter the code and the phone number in plain text
+            dead_letter_otp(channel, destination, str(e), self.request.retries + 1)
+            return {"status": "dead_lettered"}
+        countdown = settings.OTP_DELIVERY_RETRY_BACKOFF_SECONDS * 2 ** self.request.retries
+        raise self.retry(exc=e, countdown=min(countdown, max(expires_at - time.time(), 0)))
+    return {"status": "sent"}
+
+@shared_task(  # type: ignore[untyped-decorator]
+    name="tasks.send_mail_batch_task", bind=True, max_retries=settings.EMAIL_SEND_MAX_RETRIES
+)
+def send_mail_batch_task(self: Task, messages: list[dict[str, Any]]) -> dict[str, int]:
+    """
+    Send queued emails back to back over one pooled SMTP connection.
+
+    Args:
+        messages (list[dict[str, Any]]): MailMessage.as_dict() payloads.
+
+    Returns:
+        dict: Sent and rejected counts. Messages left unsent by connection
+        or temporary failures are retried in a new task, alone.
+    """
+    started = time.perf_counter()
+    result = get_mail_transport().send_batch(MailMessage.from_dict(message) for message in messages)
+    logger.info(
+        f"Sent {result.sent} of {len(messages)} emails in {time.perf_counter() - started:.3f}s, "
+        f"{len(result.rejected)} rejected, {len(result.unsent)} unsent"
+    )
+    if result.unsent:
+        unsent = [message.as_dict() for message in result.unsent]
+        if self.request.retries >= self.max_retries:
+            logger.error(f"Giving up on {len(unsent)} emails after {self.request.retries} retries")
+        else:
+            raise self.retry(args=[unsent], countdown=2 ** self.request.retries * 5)
+    return {"sent": result.sent, "rejected": len(result.rejected), "unsent": len(result.unsent)}
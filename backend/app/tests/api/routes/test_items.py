@@ -80,6 +80,26 @@ def test_read_items(
     assert len(content["data"]) >= 2
 
 
+def test_read_items_with_legacy_skip(
+    client: TestClient, superuser_token_headers: dict[str, str], db: Session
+) -> None:
+    for _ in range(3):
+        create_random_item(db)
+    first = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"skip": 0, "limit": 2},
+    ).json()
+    second = client.get(
+        f"{settings.API_V1_STR}/items/",
+        headers=superuser_token_headers,
+        params={"skip": 2, "limit": 2},
+    ).json()
+    assert first["count"] >= 3
+    assert len(first["data"]) == 2
+    assert {item["id"] for item in first["data"]}.isdisjoint(item["id"] for item in second["data"])
+
+
 def test_update_item(
     client: TestClient, superuser_token_headers: dict[str, str], db: Session
 ) -> None:
@@ -49,6 +49,7 @@ def test_recovery_password(
     with (
         patch("app.core.config.settings.SMTP_HOST", "smtp.example.com"),
         patch("app.core.config.settings.SMTP_USER", "admin@example.com"),
+        patch("app.api.routes.login.queue_email", return_value=None),
     ):
         email = "test@example.com"
         r = client.post(
@@ -1,17 +1,72 @@
-from sqlmodel import Session
-from app.models import User
-from app.helpers.otp_helper import verify_otp, generate_otp
-
-def test_generate_otp(session: Session, test_user: User):
-    otp_code = generate_otp(test_user, session)
-    assert otp_code.isdigit() and len(otp_code) == 6
-
-def test_verify_otp(session: Session, test_user: User):
-    otp_code = generate_otp(test_user, session)
-    assert verify_otp(test_user, otp_code, session) is True
-    assert test_user.otp_code is None  # Ensure OTP is reset
-
-def test_invalid_otp(session: Session, test_user: User):
-    generate_otp(test_user, session)
-    assert not verify_otp(test_user, "123456", session)
-    
\ No newline at end of file
+import re
+from collections.abc import Generator
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, delete
+
+from app.core.config import settings
+from app.main import app
+from app.models import OTP
+from app.services.otp_delivery_service import StubOTPProvider
+from app.services.otp_service import PostgresOTPBackend, get_otp_backend
+from app.tests.utils.user import create_random_user
+
+
+def _codes(provider: StubOTPProvider) -> list[str]:
+    pattern = re.compile(rf"\d{{{settings.OTP_LENGTH}}}")
+    return [match.group() for message in provider.outbox if (match := pattern.search(message["body"]))]
+
+
+@pytest.fixture
+def stub_provider(db: Session) -> Generator[StubOTPProvider, None, None]:
+    provider = StubOTPProvider()
+    # An instance: FastAPI would read the class's **kwargs as a query parameter
+    backend = PostgresOTPBackend()
+    app.dependency_overrides[get_otp_backend] = lambda: backend
+    with patch.object(settings, "OTP_DELIVERY_MODE", "inline"), \
+            patch.object(settings, "RATE_LIMIT_ENABLED", False), \
+            patch("app.services.otp_delivery_service._provider", provider):
+        yield provider
+    app.dependency_overrides.pop(get_otp_backend)
+    # Codes reference their users, which the session teardown deletes
+    db.execute(delete(OTP))
+    db.commit()
+
+
+def test_generate_and_verify_otp(client: TestClient, db: Session, stub_provider: StubOTPProvider) -> None:
+    user = create_random_user(db)
+
+    r = client.post(f"{settings.API_V1_STR}/otp/generate/{user.id}")
+    assert r.status_code == 201
+    (code,) = _codes(stub_provider)
+
+    r = client.post(f"{settings.API_V1_STR}/otp/verify/{user.id}", json={"otp_code": code})
+    assert r.status_code == 200
+    # Codes are single use
+    r = client.post(f"{settings.API_V1_STR}/otp/verify/{user.id}", json={"otp_code": code})
+    assert r.status_code == 400
+
+
+def test_resend_within_cooldown_is_refused(client: TestClient, db: Session, stub_provider: StubOTPProvider) -> None:
+    user = create_random_user(db)
+
+    client.post(f"{settings.API_V1_STR}/otp/generate/{user.id}")
+    r = client.post(f"{settings.API_V1_STR}/otp/resend/{user.id}")
+
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) > 0
+    assert len(stub_provider.outbox) == 1
+
+
+def test_invalid_otp(client: TestClient, db: Session, stub_provider: StubOTPProvider) -> None:
+    user = create_random_user(db)
+    client.post(f"{settings.API_V1_STR}/otp/generate/{user.id}")
+    (code,) = _codes(stub_provider)
+
+    wrong = str((int(code) + 1) % 10 ** settings.OTP_LENGTH).zfill(settings.OTP_LENGTH)
+    r = client.post(f"{settings.API_V1_STR}/otp/verify/{user.id}", json={"otp_code": wrong})
+
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid OTP"
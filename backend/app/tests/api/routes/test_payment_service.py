@@ -1,11 +1,18 @@
 import uuid
-from datetime import datetime
+
+import pytest
+from sqlmodel import Session
+
+from app.models import PaymentProvider, PaymentRequest, PaymentStatus, RefundRequest
 from app.services.payment_service import PaymentService
-from app.models import PaymentRequest, PaymentProvider, RefundRequest, PaymentStatus
 
-payment_service = PaymentService()
 
-def test_create_payment():
+@pytest.fixture
+def payment_service(db: Session) -> PaymentService:
+    return PaymentService(db)
+
+
+def test_create_payment(payment_service: PaymentService) -> None:
     request = PaymentRequest(
         user_id=uuid.uuid4(),
         amount=100.0,
@@ -17,7 +24,7 @@ def test_create_payment():
     assert payment.amount == 100.0
     assert payment.status == PaymentStatus.PENDING
 
-def test_refund_payment():
+def test_refund_payment(payment_service: PaymentService) -> None:
     request = PaymentRequest(
         user_id=uuid.uuid4(),
         amount=50.0,
@@ -0,0 +1,96 @@
+import asyncio
+import csv
+import io
+import json
+import uuid
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from pydantic import BaseModel
+from sqlalchemy.sql import Select
+from sqlmodel import select
+
+from app.api.streaming import CsvEncoder, ExportFormat, encode_ndjson, stream_export
+from app.models import Currency
+
+
+class _Row(BaseModel):
+    id: uuid.UUID
+    name: str
+    extra: dict[str, Any] = {}
+
+
+def _rows(count: int) -> list[SimpleNamespace]:
+    return [SimpleNamespace(id=uuid.uuid4(), name=f"row {i}", extra={"i": i}) for i in range(count)]
+
+
+class _FakeStream:
+    def __init__(self, rows: list[Any]):
+        self.rows = rows
+        self.partition_sizes: list[int] = []
+
+    async def partitions(self, size: int) -> AsyncIterator[list[Any]]:
+        for start in range(0, len(self.rows), size):
+            batch = self.rows[start:start + size]
+            self.partition_sizes.append(len(batch))
+            yield batch
+
+
+class _FakeSession:
+    def __init__(self, stream: _FakeStream):
+        self.stream = stream
+        self.statement: Select[Any] | None = None
+
+    async def __aenter__(self) -> "_FakeSession":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def stream_scalars(self, statement: Select[Any]) -> _FakeStream:
+        self.statement = statement
+        return self.stream
+
+
+async def _collect(iterator: AsyncIterator[str]) -> list[str]:
+    return [chunk async for chunk in iterator]
+
+
+def test_encode_ndjson_one_object_per_line() -> None:
+    rows = _rows(3)
+    lines = encode_ndjson(_Row, rows).splitlines()
+    assert len(lines) == 3
+    assert json.loads(lines[1])["name"] == "row 1"
+
+
+def test_csv_encoder_writes_header_once_and_json_encodes_nested() -> None:
+    encoder = CsvEncoder(_Row)
+    text = encoder.encode(_rows(2)) + encoder.encode(_rows(1))
+    records = list(csv.DictReader(io.StringIO(text)))
+    assert len(records) == 3
+    assert json.loads(records[2]["extra"]) == {"i": 0}
+
+
+def test_stream_export_reads_in_server_side_batches() -> None:
+    stream = _FakeStream(_rows(2500))
+    session = _FakeSession(stream)
+
+    with patch("app.api.streaming.AsyncSessionLocal", MagicMock(return_value=session)):
+        chunks = asyncio.run(_collect(stream_export(select(Currency), _Row, ExportFormat.ndjson, batch_size=1000)))
+
+    assert stream.partition_sizes == [1000, 1000, 500]
+    assert len(chunks) == 3
+    assert sum(chunk.count("\n") for chunk in chunks) == 2500
+    assert session.statement is not None
+    assert session.statement.get_execution_options()["yield_per"] == 1000
+
+
+def test_stream_export_csv_on_empty_table_yields_header() -> None:
+    session = _FakeSession(_FakeStream([]))
+
+    with patch("app.api.streaming.AsyncSessionLocal", MagicMock(return_value=session)):
+        chunks = asyncio.run(_collect(stream_export(select(Currency), _Row, ExportFormat.csv)))
+
+    assert chunks == ["id,name,extra\r\n"]
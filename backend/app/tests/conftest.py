@@ -1,5 +1,6 @@
 from collections.abc import Generator
 
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session, delete
@@ -51,3 +52,15 @@ def normal_user_token_headers(client: TestClient, db: Session) -> dict[str, str]
     return authentication_token_from_email(
         client=client, email=settings.EMAIL_TEST_USER, db=db
     )
+
+
+@pytest.fixture
+def redis_server() -> fakeredis.FakeServer:
+    """Backs `fake_redis`; set `connected = False` to make every command fail."""
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def fake_redis(redis_server: fakeredis.FakeServer) -> fakeredis.FakeAsyncRedis:
+    """In-memory redis.asyncio client that runs Lua scripts, through lupa."""
+    return fakeredis.FakeAsyncRedis(server=redis_server, decode_responses=True)
@@ -0,0 +1,75 @@
+import asyncio
+import os
+import threading
+from typing import Any
+from unittest.mock import patch
+
+from app.core.concurrency import NamedExecutor, cpu_bound_task, executors
+
+
+def test_queue_depth_gauges_track_waiting_calls() -> None:
+    executor = NamedExecutor("test-io", "thread", 1)
+    release = threading.Event()
+
+    async def run() -> dict[str, Any]:
+        calls = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        stats = executor.stats()
+        release.set()
+        await asyncio.gather(*calls)
+        return stats
+
+    stats = asyncio.run(run())
+    executor.shutdown()
+
+    assert stats["pending"] == 3
+    assert stats["queued"] == 2
+    final = executor.stats()
+    assert final["pending"] == 0
+    assert final["completed"] == 3
+    assert final["peak_pending"] == 3
+
+
+def test_saturated_pool_does_not_starve_another() -> None:
+    io = NamedExecutor("test-io", "thread", 1)
+    other = NamedExecutor("test-other", "thread", 1)
+    release = threading.Event()
+
+    async def run() -> str:
+        blocked = asyncio.ensure_future(io.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        # The io pool's only worker is busy, the other pool answers anyway
+        result = await asyncio.wait_for(other.run(lambda: "other"), timeout=1)
+        release.set()
+        await blocked
+        return result
+
+    assert asyncio.run(run()) == "other"
+    io.shutdown()
+    other.shutdown()
+
+
+def test_cpu_tasks_run_in_prewarmed_worker_processes() -> None:
+    cpu = NamedExecutor("cpu", "process", 2)
+
+    async def run() -> int:
+        await cpu.warm()
+        return await cpu_bound_task(os.getpid)
+
+    try:
+        with patch.object(executors, "cpu", cpu):
+            pid = asyncio.run(run())
+    finally:
+        cpu.shutdown()
+
+    assert pid != os.getpid()
+    assert cpu.stats()["submitted"] == 3
+
+
+def test_shutdown_allows_lazy_restart() -> None:
+    executor = NamedExecutor("test-io", "thread", 1)
+    assert asyncio.run(executor.run(lambda: 1)) == 1
+    executor.shutdown()
+    assert executor.stats()["started"] is False
+    assert asyncio.run(executor.run(lambda: 2)) == 2
+    executor.shutdown()
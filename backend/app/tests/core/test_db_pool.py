@@ -0,0 +1,42 @@
+import pytest
+from sqlalchemy import Engine, create_engine, exc
+
+from app.core.db_pool import TimedQueuePool, pool_status
+
+
+def _engine() -> Engine:
+    return create_engine(
+        "sqlite://",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+
+
+def test_pool_status_reports_checked_out_connections() -> None:
+    engine = _engine()
+    with engine.connect():
+        status = pool_status(engine.pool)
+        assert status["size"] == 1
+        assert status["checked_out"] == 1
+        assert status["wait"]["checkouts"] == 1
+    assert pool_status(engine.pool)["checked_out"] == 0
+
+
+def test_pool_records_checkout_timeouts() -> None:
+    engine = _engine()
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    wait = pool_status(engine.pool)["wait"]
+    assert wait["timeouts"] == 1
+    assert wait["max_wait_seconds"] >= 0.05
+
+
+def test_wait_stats_survive_dispose() -> None:
+    engine = _engine()
+    with engine.connect():
+        pass
+    engine.dispose()
+    assert pool_status(engine.pool)["wait"]["checkouts"] == 1
@@ -0,0 +1,69 @@
+import os
+from pathlib import Path
+
+from jinja2 import Template
+
+from app.build_email_templates import SAMPLE_CONTEXT, bench
+from app.core.email_templates import BUILD_DIR, TemplateRegistry
+
+
+def _registry(tmp_path: Path, directory: Path = BUILD_DIR, auto_reload: bool = False) -> TemplateRegistry:
+    return TemplateRegistry(directory, auto_reload=auto_reload, bytecode_cache_dir=str(tmp_path / "cache"))
+
+
+def test_preload_compiles_every_built_template(tmp_path: Path) -> None:
+    (tmp_path / "cache").mkdir()
+    registry = _registry(tmp_path)
+
+    names = registry.preload()
+
+    assert names == sorted(path.name for path in BUILD_DIR.glob("*.html"))
+    assert "new_account.html" in names
+    # Bytecode is cached for the next process
+    assert len(list((tmp_path / "cache").iterdir())) == len(names)
+
+
+def test_render_matches_compiling_the_file(tmp_path: Path) -> None:
+    (tmp_path / "cache").mkdir()
+    registry = _registry(tmp_path)
+    registry.preload()
+
+    for name in registry.stats()["templates"]:
+        expected = Template((BUILD_DIR / name).read_text()).render(SAMPLE_CONTEXT)
+        assert registry.render(name, SAMPLE_CONTEXT) == expected
+
+
+def test_templates_are_not_reread_without_auto_reload(tmp_path: Path) -> None:
+    templates = tmp_path / "build"
+    templates.mkdir()
+    (tmp_path / "cache").mkdir()
+    (templates / "hello.html").write_text("Hello {{ name }}")
+    registry = _registry(tmp_path, templates)
+    registry.preload()
+
+    (templates / "hello.html").write_text("Bye {{ name }}")
+
+    assert registry.render("hello.html", {"name": "Ada"}) == "Hello Ada"
+
+
+def test_auto_reload_picks_up_changed_templates(tmp_path: Path) -> None:
+    templates = tmp_path / "build"
+    templates.mkdir()
+    (tmp_path / "cache").mkdir()
+    path = templates / "hello.html"
+    path.write_text("Hello {{ name }}")
+    registry = _registry(tmp_path, templates, auto_reload=True)
+    registry.preload()
+
+    path.write_text("Bye {{ name }}")
+    stat = path.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+    assert registry.render("hello.html", {"name": "Ada"}) == "Bye Ada"
+
+
+def test_bench_reports_both_modes() -> None:
+    results = bench(seconds=0.01)
+
+    assert set(results) == {path.name for path in BUILD_DIR.glob("*.html")}
+    assert all(result["registry"] > 0 and result["per_call_compile"] > 0 for result in results.values())
@@ -0,0 +1,72 @@
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.graphDB import AsyncGraphDatabase
+
+
+def _graph_db() -> tuple[AsyncGraphDatabase, MagicMock, AsyncMock]:
+    tx = AsyncMock()
+    session = MagicMock()
+
+    async def execute(tx_func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        return await tx_func(tx, *args, **kwargs)
+
+    session.execute_write = AsyncMock(side_effect=execute)
+    session.execute_read = AsyncMock(side_effect=execute)
+
+    @asynccontextmanager
+    async def open_session(**_config: Any) -> AsyncIterator[MagicMock]:
+        yield session
+
+    driver = MagicMock()
+    driver.session = MagicMock(side_effect=open_session)
+    graph_db = AsyncGraphDatabase("neo4j://graph:7687", "neo4j", "secret", database="social")
+    graph_db._driver = driver
+    return graph_db, driver, tx
+
+
+def test_merge_nodes_unwinds_rows_in_batches() -> None:
+    graph_db, driver, tx = _graph_db()
+    rows = [{"id": str(i), "name": f"user-{i}"} for i in range(2500)]
+
+    written = asyncio.run(graph_db.merge_nodes("User", "id", rows, batch_size=1000))
+
+    assert written == 2500
+    assert driver.session.call_count == 3
+    batch_sizes = [len(call.args[1]["rows"]) for call in tx.run.call_args_list]
+    assert batch_sizes == [1000, 1000, 500]
+    query = tx.run.call_args.args[0]
+    assert query.startswith("UNWIND $rows AS row MERGE (n:`User`")
+
+
+def test_merge_relationships_matches_both_ends() -> None:
+    graph_db, _, tx = _graph_db()
+
+    asyncio.run(graph_db.merge_relationships("User", "User", "FOLLOWS", [{"start": "a", "end": "b"}]))
+
+    query = tx.run.call_args.args[0]
+    assert "MATCH (a:`User` {`id`: row.start})" in query
+    assert "MERGE (a)-[r:`FOLLOWS`]->(b)" in query
+
+
+def test_identifiers_are_validated() -> None:
+    graph_db, _, _ = _graph_db()
+    with pytest.raises(ValueError):
+        asyncio.run(graph_db.merge_nodes("User) DETACH DELETE (n", "id", [{"id": "1"}]))
+
+
+def test_sessions_share_the_bookmark_manager() -> None:
+    graph_db, driver, tx = _graph_db()
+    tx.run.return_value.data = AsyncMock(return_value=[{"n": 1}])
+
+    assert asyncio.run(graph_db.read("RETURN 1 AS n")) == [{"n": 1}]
+    asyncio.run(graph_db.merge_nodes("User", "id", [{"id": "1"}]))
+
+    managers = {id(call.kwargs["bookmark_manager"]) for call in driver.session.call_args_list}
+    assert len(managers) == 1
+    assert all(call.kwargs["database"] == "social" for call in driver.session.call_args_list)
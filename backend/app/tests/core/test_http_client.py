@@ -0,0 +1,117 @@
+import asyncio
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.core.http_client import HttpClient
+
+URL = "https://rates.example.com/latest"
+
+
+@pytest.fixture(autouse=True)
+def no_backoff() -> Iterator[None]:
+    with patch("app.core.http_client.backoff_delay", return_value=0), \
+            patch("app.core.http_client.time.sleep"):
+        yield
+
+
+def test_retries_retryable_status_then_succeeds() -> None:
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    client = HttpClient(transport=httpx.MockTransport(handler))
+
+    response = client.request("GET", URL)
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+def test_retries_transport_errors_until_exhausted() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused", request=request)
+
+    client = HttpClient(transport=httpx.MockTransport(handler))
+
+    with pytest.raises(httpx.ConnectError):
+        client.request("GET", URL)
+
+
+def test_fetch_json_revalidates_with_etag() -> None:
+    seen_headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(request.headers)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            json={"base": "EUR", "rates": {"USD": 1.08}},
+            headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        )
+
+    client = HttpClient(transport=httpx.MockTransport(handler))
+
+    first = client.fetch_json(URL)
+    second = client.fetch_json(URL)
+
+    assert first.modified is True
+    assert second.modified is False
+    assert second.status_code == 304
+    assert second.data == first.data
+    assert seen_headers[1]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+def test_fetch_json_detects_identical_body_without_validators() -> None:
+    payloads = iter([{"rates": {"USD": 1.08}}, {"rates": {"USD": 1.08}}, {"rates": {"USD": 1.09}}])
+
+    def handler(_request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=next(payloads))
+
+    client = HttpClient(transport=httpx.MockTransport(handler))
+
+    assert client.fetch_json(URL).modified is True
+    assert client.fetch_json(URL).modified is False
+    assert client.fetch_json(URL).modified is True
+
+
+def test_uncommitted_payloads_are_fetched_again() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"rates": {"USD": 1.08}}, headers={"ETag": '"v1"'})
+
+    client = HttpClient(transport=httpx.MockTransport(handler))
+
+    # The caller's write failed, so it never committed: the next fetch is not a 304
+    assert client.fetch_json(URL, commit=False).modified is True
+    assert client.fetch_json(URL, commit=False).modified is True
+
+    client.commit_validators(URL)
+    result = client.fetch_json(URL, commit=False)
+    assert result.modified is False
+    assert result.status_code == 304
+
+
+def test_async_fetch_json_shares_validators() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"rates": {}}, headers={"ETag": '"v1"'})
+
+    client = HttpClient(async_transport=httpx.MockTransport(handler))
+
+    async def run() -> tuple[bool, bool]:
+        first = await client.afetch_json(URL)
+        second = await client.afetch_json(URL)
+        await client.aclose()
+        return first.modified, second.modified
+
+    assert asyncio.run(run()) == (True, False)
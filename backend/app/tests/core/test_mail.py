@@ -0,0 +1,146 @@
+import socket
+from collections.abc import Generator
+from email import message_from_bytes
+from email.message import Message
+from typing import Any
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import SMTP, Envelope, Session
+
+from app.core.mail import MailMessage, MailTransport, SMTPConnectionPool
+
+
+class RecordingHandler:
+    """Keeps every envelope the local server accepts and counts sessions."""
+
+    def __init__(self) -> None:
+        self.envelopes: list[Envelope] = []
+        self.sessions = 0
+
+    async def handle_EHLO(
+        self, server: SMTP, session: Session, envelope: Envelope, hostname: str, responses: list[str]
+    ) -> list[str]:
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(
+        self, server: SMTP, session: Session, envelope: Envelope, address: str, rcpt_options: list[str]
+    ) -> str:
+        if address.startswith("bounce@"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server: SMTP, session: Session, envelope: Envelope) -> str:
+        self.envelopes.append(envelope)
+        return "250 Message accepted"
+
+
+@pytest.fixture
+def smtp_server() -> Generator[tuple[RecordingHandler, int], None, None]:
+    handler = RecordingHandler()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        yield handler, port
+    finally:
+        controller.stop()
+
+
+def _parsed(envelope: Envelope) -> Message:
+    assert isinstance(envelope.content, bytes)
+    return message_from_bytes(envelope.content)
+
+
+def _transport(port: int, **kwargs: Any) -> MailTransport:
+    pool = SMTPConnectionPool(host="127.0.0.1", port=port, user="", tls=False, ssl=False, **kwargs)
+    return MailTransport(pool, sender="App <app@example.com>")
+
+
+def test_batch_reuses_one_connection(smtp_server: tuple[RecordingHandler, int]) -> None:
+    handler, port = smtp_server
+    transport = _transport(port)
+    messages = [MailMessage(to=(f"user{i}@example.com",), subject=f"Hello {i}", html="<p>Hi</p>") for i in range(5)]
+
+    result = transport.send_batch(messages)
+    transport.send(MailMessage(to=("late@example.com",), subject="Later", text="Hi"))
+    transport.close()
+
+    assert result.sent == 5 and not result.unsent and not result.rejected
+    assert len(handler.envelopes) == 6
+    assert handler.sessions == 1
+    assert transport.pool.stats()["opened"] == 1
+    assert _parsed(handler.envelopes[0])["Subject"] == "Hello 0"
+
+
+def test_multi_recipient_message_is_one_transaction(smtp_server: tuple[RecordingHandler, int]) -> None:
+    handler, port = smtp_server
+    transport = _transport(port)
+    to = ("a@example.com", "b@example.com", "c@example.com")
+
+    transport.send(MailMessage(to=to, subject="News", html="<p>News</p>", undisclosed_recipients=True))
+    transport.close()
+
+    (envelope,) = handler.envelopes
+    assert envelope.rcpt_tos == list(to)
+    assert "a@example.com" not in _parsed(envelope)["To"]
+
+
+def test_refused_message_does_not_stop_the_batch(smtp_server: tuple[RecordingHandler, int]) -> None:
+    handler, port = smtp_server
+    transport = _transport(port)
+    bounce = MailMessage(to=("bounce@example.com",), subject="x", text="x")
+
+    result = transport.send_batch([bounce, MailMessage(to=("ok@example.com",), subject="y", text="y")])
+    transport.close()
+
+    assert result.sent == 1
+    assert result.rejected == [bounce]
+    assert [envelope.rcpt_tos for envelope in handler.envelopes] == [["ok@example.com"]]
+
+
+def test_dropped_connection_is_replaced(smtp_server: tuple[RecordingHandler, int]) -> None:
+    handler, port = smtp_server
+    transport = _transport(port)
+    transport.send(MailMessage(to=("first@example.com",), subject="1", text="1"))
+    # Simulate the server timing out the idle connection
+    sock = transport.pool._idle[0].smtp.sock
+    assert sock is not None
+    sock.shutdown(socket.SHUT_RDWR)
+
+    result = transport.send_batch([MailMessage(to=("second@example.com",), subject="2", text="2")])
+    transport.close()
+
+    assert result.sent == 1
+    assert transport.pool.stats()["opened"] == 2
+
+
+def test_connections_are_retired_after_max_messages(smtp_server: tuple[RecordingHandler, int]) -> None:
+    handler, port = smtp_server
+    transport = _transport(port, max_messages=2)
+
+    result = transport.send_batch([MailMessage(to=(f"u{i}@example.com",), subject="s", text="t") for i in range(5)])
+    transport.close()
+
+    assert result.sent == 5
+    assert handler.sessions == 3
+
+
+def test_unreachable_server_leaves_messages_unsent() -> None:
+    transport = _transport(1, timeout=1)
+    message = MailMessage(to=("a@example.com",), subject="s", text="t")
+
+    result = transport.send_batch([message])
+
+    assert result.sent == 0 and result.unsent == [message]
+
+
+def test_message_round_trips_through_celery_payload() -> None:
+    message = MailMessage(to=("a@example.com", "b@example.com"), subject="s", html="<p>h</p>")
+
+    assert MailMessage.from_dict(message.as_dict()) == message
@@ -0,0 +1,133 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+import pytest
+from sqlalchemy import DateTime, Integer, String, Uuid, create_engine, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column
+from sqlalchemy.sql import Select
+
+from app.core.pagination import CountMode, InvalidCursorError, KeysetPaginator
+
+PG_DIALECT = postgresql.dialect()  # type: ignore[no-untyped-call]
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Entry(Base):
+    __tablename__ = "entry"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    name: Mapped[str] = mapped_column(String)
+    group: Mapped[int] = mapped_column(Integer)
+
+
+def _session(count: int) -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    start = datetime(2026, 1, 1)
+    # Pairs share a timestamp, so the id tiebreaker is exercised
+    session.add_all(
+        Entry(created_at=start + timedelta(minutes=i // 2), name=f"entry-{i}", group=i % 3)
+        for i in range(count)
+    )
+    session.commit()
+    return session
+
+
+def _walk(paginator: KeysetPaginator, session: Session, statement: Select[Any], limit: int) -> list[Entry]:
+    seen: list[Entry] = []
+    cursor: str | None = None
+    while True:
+        page = paginator.paginate(session, statement, limit, cursor)
+        seen.extend(page.data)
+        if page.next_cursor is None:
+            return seen
+        cursor = page.next_cursor
+
+
+def test_pages_cover_every_row_once_in_key_order() -> None:
+    session = _session(25)
+    paginator = KeysetPaginator(Entry.created_at, Entry.id, descending=True)
+
+    seen = _walk(paginator, session, select(Entry), limit=4)
+
+    assert len(seen) == 25
+    assert len({entry.id for entry in seen}) == 25
+    keys = [(entry.created_at, entry.id) for entry in seen]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_pagination_keeps_filters() -> None:
+    session = _session(30)
+    paginator = KeysetPaginator(Entry.id)
+
+    seen = _walk(paginator, session, select(Entry).where(Entry.group == 1), limit=3)
+
+    assert len(seen) == 10
+    assert all(entry.group == 1 for entry in seen)
+
+
+def test_last_page_has_no_cursor() -> None:
+    session = _session(3)
+    page = KeysetPaginator(Entry.id).paginate(session, select(Entry), limit=3)
+    assert len(page.data) == 3
+    assert page.next_cursor is None
+    assert page.count is None
+
+
+def test_exact_count_applies_filters() -> None:
+    session = _session(30)
+    page = KeysetPaginator(Entry.id).paginate(
+        session, select(Entry).where(Entry.group == 0), limit=2, count=CountMode.exact
+    )
+    assert page.count == 10
+
+
+def test_estimated_count_reads_reltuples_for_unfiltered_listings() -> None:
+    paginator = KeysetPaginator(Entry.id)
+
+    estimate = paginator._estimate_statement(select(Entry))
+    assert estimate is not None
+    sql = str(estimate.compile(dialect=PG_DIALECT))
+
+    assert "reltuples" in sql and "pg_class" in sql
+    assert paginator._estimate_statement(select(Entry).where(Entry.group == 1)) is None
+
+
+def test_keyset_predicate_uses_row_comparison() -> None:
+    session = _session(5)
+    paginator = KeysetPaginator(Entry.created_at, Entry.id)
+    cursor = paginator.paginate(session, select(Entry), limit=2).next_cursor
+
+    statement = paginator.page_statement(select(Entry), 2, cursor)
+    sql = str(statement.compile(dialect=PG_DIALECT))
+
+    assert "(entry.created_at, entry.id) >" in sql
+    assert "OFFSET" not in sql
+
+
+def test_offset_pages_for_legacy_skip_clients() -> None:
+    session = _session(10)
+    paginator = KeysetPaginator(Entry.id)
+    ordered = _walk(paginator, session, select(Entry), limit=10)
+
+    page = paginator.paginate(session, select(Entry), limit=3, offset=3, count=CountMode.exact)
+
+    assert [entry.id for entry in page.data] == [entry.id for entry in ordered[3:6]]
+    assert page.count == 10
+    # A cursor takes precedence over the offset
+    cursor = paginator.paginate(session, select(Entry), limit=2).next_cursor
+    page = paginator.paginate(session, select(Entry), limit=2, cursor=cursor, offset=5)
+    assert [entry.id for entry in page.data] == [entry.id for entry in ordered[2:4]]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bnVsbA", "WzEsMiwzXQ"])
+def test_malformed_cursors_are_rejected(cursor: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        KeysetPaginator(Entry.created_at, Entry.id).decode_cursor(cursor)
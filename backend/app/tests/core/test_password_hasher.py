@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.password_hasher import PasswordHasher, PasswordHasherBusyError
+
+
+@pytest.fixture
+def real_hashing() -> Generator[None, None, None]:
+    # The integration conftest patches pwd_context out; these tests need bcrypt
+    with patch.object(security, "pwd_context", security.pwd_context.copy()):
+        yield
+
+
+def _hasher(**kwargs: Any) -> PasswordHasher:
+    # A thread pool keeps the unit tests fast; the process pool is covered below
+    return PasswordHasher(executor=ThreadPoolExecutor(max_workers=2), **kwargs)
+
+
+def test_hash_and_verify_round_trip() -> None:
+    hasher = _hasher()
+
+    async def run() -> tuple[bool, bool]:
+        hashed = await hasher.hash("correct horse")
+        return await hasher.verify("correct horse", hashed), await hasher.verify("wrong", hashed)
+
+    assert asyncio.run(run()) == (True, False)
+    stats = hasher.stats()
+    assert stats["completed"] == 3
+    assert stats["pending"] == 0
+
+
+def test_full_queue_rejects_new_work() -> None:
+    release = threading.Event()
+
+    def blocking_hash(_password: str) -> str:
+        release.wait(5)
+        return "hashed"
+
+    hasher = _hasher(workers=1, max_pending=1)
+
+    async def run() -> str:
+        first = asyncio.ensure_future(hasher.hash("one"))
+        await asyncio.sleep(0.05)
+        assert hasher.stats()["pending"] == 1
+        with pytest.raises(PasswordHasherBusyError):
+            await hasher.hash("two")
+        release.set()
+        return await first
+
+    with patch.object(security, "get_password_hash", blocking_hash):
+        assert asyncio.run(run()) == "hashed"
+    stats = hasher.stats()
+    assert stats["rejected"] == 1
+    assert stats["peak_pending"] == 1
+
+
+@pytest.mark.usefixtures("real_hashing")
+def test_login_rehashes_weaker_hashes_to_configured_cost() -> None:
+    weak_hash = security.pwd_context.copy(
+        bcrypt__default_rounds=4, bcrypt__min_rounds=4
+    ).hash("secret-pass")
+    hasher = _hasher()
+
+    valid, new_hash = asyncio.run(hasher.verify_and_update("secret-pass", weak_hash))
+
+    assert valid
+    assert new_hash is not None
+    assert new_hash.startswith(f"$2b${settings.PASSWORD_BCRYPT_ROUNDS:02d}$")
+    assert security.verify_password("secret-pass", new_hash)
+    assert hasher.stats()["rehashed"] == 1
+    assert asyncio.run(hasher.verify_and_update("secret-pass", new_hash)) == (True, None)
+
+
+@pytest.mark.usefixtures("real_hashing")
+def test_process_pool_hashes_off_the_event_loop() -> None:
+    hasher = PasswordHasher(workers=1)
+    try:
+        hashed = asyncio.run(hasher.hash("in-a-subprocess"))
+    finally:
+        hasher.shutdown()
+    assert security.verify_password("in-a-subprocess", hashed)
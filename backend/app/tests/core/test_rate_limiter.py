@@ -0,0 +1,242 @@
+import asyncio
+from collections.abc import Awaitable
+from datetime import timedelta
+from typing import cast
+
+import fakeredis
+import pytest
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core.rate_limiter import (
+    Algorithm,
+    RateLimiter,
+    RateLimitResult,
+    RateLimitStore,
+)
+from app.core.security import create_access_token
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> Clock:
+    return Clock()
+
+
+def _store(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock, local_share: float = 0.0) -> RateLimitStore:
+    return RateLimitStore(client_factory=lambda: fake_redis, local_share=local_share, local_ttl_seconds=1.0, clock=clock)
+
+
+def _hit(
+    store: RateLimitStore, key: str, limit: int, window: float, algorithm: Algorithm, burst: int | None = None
+) -> RateLimitResult:
+    return asyncio.run(store.hit(key, limit, window, algorithm, burst))
+
+
+async def _age(redis: fakeredis.FakeAsyncRedis, ms: int) -> None:
+    # The scripts read Redis' own clock, so move the stored timestamps back instead
+    for key in await redis.keys("*"):
+        if await redis.type(key) == "zset":
+            entries = await redis.zrange(key, 0, -1, withscores=True)
+            await redis.zadd(key, {member: score - ms for member, score in entries})
+        else:
+            # redis-py types hash commands as sync-or-async
+            await cast(Awaitable[float], redis.hincrbyfloat(key, "ts", -ms))
+
+
+def _advance(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock, seconds: float) -> None:
+    asyncio.run(_age(fake_redis, int(seconds * 1000)))
+    clock.now += seconds
+
+
+async def _all_keys(redis: fakeredis.FakeAsyncRedis) -> list[str]:
+    keys: list[str] = await redis.keys("*")
+    return keys
+
+
+async def _zcard(redis: fakeredis.FakeAsyncRedis, key: str) -> int:
+    count: int = await redis.zcard(key)
+    return count
+
+
+def _keys(fake_redis: fakeredis.FakeAsyncRedis) -> list[str]:
+    return asyncio.run(_all_keys(fake_redis))
+
+
+def _client(limiter: RateLimiter) -> TestClient:
+    router = APIRouter()
+
+    @router.get("/items/{item_id}", dependencies=[Depends(limiter)])
+    async def read_item(item_id: int) -> dict[str, int]:
+        return {"id": item_id}
+
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_sliding_window_counts_the_last_window(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock) -> None:
+    store = _store(fake_redis, clock)
+
+    results = [_hit(store, "k", 3, 60, "sliding_window") for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0]
+    assert results[-1].retry_after == pytest.approx(60, abs=0.5)
+
+    # The first requests leave the window one by one
+    _advance(fake_redis, clock, 60.5)
+    assert _hit(store, "k", 3, 60, "sliding_window").allowed
+    assert store.stats()["denied"] == 1
+
+
+def test_token_bucket_refills_and_bursts(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock) -> None:
+    store = _store(fake_redis, clock)
+
+    results = [_hit(store, "k", 2, 60, "token_bucket", burst=4) for _ in range(5)]
+    assert [r.allowed for r in results] == [True, True, True, True, False]
+    # One token every 30 seconds
+    assert results[-1].retry_after == pytest.approx(30, abs=0.5)
+
+    _advance(fake_redis, clock, 30)
+    assert _hit(store, "k", 2, 60, "token_bucket", burst=4).allowed
+    assert not _hit(store, "k", 2, 60, "token_bucket", burst=4).allowed
+
+
+def test_local_tier_admits_a_share_and_charges_it_later(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock) -> None:
+    store = _store(fake_redis, clock, local_share=0.5)
+
+    first = _hit(store, "k", 100, 60, "sliding_window")
+    assert first.remaining == 99
+    # Half of the remaining 99 is admitted without Redis
+    for _ in range(49):
+        assert _hit(store, "k", 100, 60, "sliding_window").allowed
+    assert store.stats()["redis_checks"] == 1
+    assert store.stats()["local_allowed"] == 49
+
+    # Once the allowance is used up, the next check records all of them
+    result = _hit(store, "k", 100, 60, "sliding_window")
+    assert store.stats()["redis_checks"] == 2
+    assert result.remaining == 49
+    assert asyncio.run(_zcard(fake_redis, "k")) == 51
+
+
+def test_local_lease_expires(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock) -> None:
+    store = _store(fake_redis, clock, local_share=0.5)
+    _hit(store, "k", 100, 60, "sliding_window")
+    _hit(store, "k", 100, 60, "sliding_window")
+
+    _advance(fake_redis, clock, 1.5)
+    _hit(store, "k", 100, 60, "sliding_window")
+    assert store.stats()["redis_checks"] == 2
+    assert asyncio.run(_zcard(fake_redis, "k")) == 3
+
+
+def test_small_limits_always_ask_redis(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock) -> None:
+    store = _store(fake_redis, clock, local_share=0.1)
+    for _ in range(3):
+        _hit(store, "k", 3, 60, "sliding_window")
+    assert store.stats()["redis_checks"] == 3
+
+
+def test_denials_are_cached_until_reset(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock) -> None:
+    store = _store(fake_redis, clock)
+    for _ in range(2):
+        _hit(store, "k", 1, 10, "sliding_window")
+    assert store.stats()["redis_checks"] == 2
+
+    result = _hit(store, "k", 1, 10, "sliding_window")
+    assert not result.allowed
+    assert store.stats()["redis_checks"] == 2
+    assert store.stats()["local_denied"] == 1
+
+    _advance(fake_redis, clock, 10.5)
+    assert _hit(store, "k", 1, 10, "sliding_window").allowed
+    assert store.stats()["redis_checks"] == 3
+
+
+def test_redis_errors_allow_requests(fake_redis: fakeredis.FakeAsyncRedis, redis_server: fakeredis.FakeServer, clock: Clock) -> None:
+    store = _store(fake_redis, clock)
+    redis_server.connected = False
+    assert _hit(store, "k", 1, 10, "sliding_window").allowed
+    assert _hit(store, "k", 1, 10, "sliding_window").allowed
+    assert store.stats()["errors"] == 2
+
+
+def test_headers_and_429(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock) -> None:
+    client = _client(RateLimiter(times=2, seconds=60, store=_store(fake_redis, clock)))
+
+    r = client.get("/items/1")
+    assert r.status_code == 200
+    assert r.headers["RateLimit-Limit"] == "2"
+    assert r.headers["RateLimit-Remaining"] == "1"
+    assert r.headers["RateLimit-Reset"] == "60"
+    assert r.headers["RateLimit-Policy"] == "2;w=60"
+
+    # Keyed by the route template, so other items share the limit
+    assert client.get("/items/2").status_code == 200
+    r = client.get("/items/3")
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "60"
+    assert r.headers["RateLimit-Remaining"] == "0"
+    assert _keys(fake_redis) == ["rate-limit:sliding_window:GET:/items/{item_id}:ip:testclient"]
+
+
+def test_user_keys(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock) -> None:
+    client = _client(RateLimiter(times=1, seconds=60, by="user", store=_store(fake_redis, clock)))
+
+    for user in ("alice", "bob"):
+        token = create_access_token(user, timedelta(minutes=5))
+        r = client.get("/items/1", headers={"Authorization": f"Bearer {token}"})
+        assert r.status_code == 200
+    # An invalid token is counted by IP
+    assert client.get("/items/1", headers={"Authorization": "Bearer nope"}).status_code == 200
+    assert client.get("/items/1").status_code == 429
+    assert sorted(key.rsplit(":", 2)[-2] for key in _keys(fake_redis)) == ["ip", "user", "user"]
+
+
+def _request(peer: str, forwarded_for: str | None = None) -> Request:
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "client": (peer, 50000), "headers": headers})
+
+
+def test_forwarded_for_is_read_from_trusted_proxies_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", ["10.0.0.0/8"])
+    client_ip = RateLimiter._client_ip
+
+    assert client_ip(_request("10.0.0.2", "203.0.113.7")) == "203.0.113.7"
+    # A forged first hop is skipped: the nearest untrusted hop is the client
+    assert client_ip(_request("10.0.0.2", "198.51.100.1, 203.0.113.7, 10.0.0.3")) == "203.0.113.7"
+    assert client_ip(_request("10.0.0.2")) == "10.0.0.2"
+    # Direct callers cannot pick their own key
+    assert client_ip(_request("203.0.113.9", "198.51.100.1")) == "203.0.113.9"
+
+
+def test_disabled(fake_redis: fakeredis.FakeAsyncRedis, clock: Clock, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    store = _store(fake_redis, clock)
+    client = _client(RateLimiter(times=1, seconds=60, store=store))
+    for _ in range(3):
+        r = client.get("/items/1")
+        assert r.status_code == 200
+        assert "RateLimit-Limit" not in r.headers
+    assert store.stats()["redis_checks"] == 0
+    assert _keys(fake_redis) == []
+
+
+def test_needs_a_limit() -> None:
+    with pytest.raises(ValueError):
+        RateLimiter(times=0, seconds=60)
+    with pytest.raises(ValueError):
+        RateLimiter(times=1)
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+from collections.abc import Iterator
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import route_cache as route_cache_module
+from app.core.route_cache import (
+    CachedResponse,
+    CachedRoute,
+    RouteCache,
+    cached,
+    invalidates,
+)
+
+CacheApp = tuple[TestClient, fakeredis.FakeAsyncRedis, RouteCache, dict[str, int]]
+
+
+@pytest.fixture
+def cache_app(fake_redis: fakeredis.FakeAsyncRedis) -> Iterator[CacheApp]:
+    cache = RouteCache(client_factory=lambda: fake_redis)
+    calls = {"count": 0}
+    router = APIRouter(route_class=CachedRoute)
+
+    @router.get("/things")
+    @cached(ttl=60, tags=["things"])
+    async def list_things() -> list[dict[str, int]]:
+        calls["count"] += 1
+        return [{"n": calls["count"]}]
+
+    @router.post("/things")
+    @invalidates("things")
+    async def create_thing() -> dict[str, bool]:
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    with patch.object(route_cache_module, "route_cache", cache):
+        yield TestClient(app), fake_redis, cache, calls
+
+
+def test_second_request_is_served_from_redis(cache_app: CacheApp) -> None:
+    client, _, cache, calls = cache_app
+
+    first = client.get("/things")
+    second = client.get("/things")
+
+    assert first.json() == second.json() == [{"n": 1}]
+    assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+    assert calls["count"] == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_matching_etag_gets_304(cache_app: CacheApp) -> None:
+    client, _, cache, _ = cache_app
+    etag = client.get("/things").headers["etag"]
+
+    response = client.get("/things", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert cache.not_modified == 1
+
+
+def test_write_invalidates_tagged_entries(cache_app: CacheApp) -> None:
+    client, _, _, calls = cache_app
+    client.get("/things")
+
+    assert client.post("/things").status_code == 200
+    response = client.get("/things")
+
+    assert response.json() == [{"n": 2}]
+    assert response.headers["x-cache"] == "MISS"
+
+
+async def _expire_entry(fake: fakeredis.FakeAsyncRedis) -> None:
+    entry_key, = await fake.keys("*@*")
+    entry = CachedResponse.from_json(await fake.get(entry_key))
+    await fake.set(entry_key, json.dumps({**entry.__dict__, "fresh_until": time.time() - 1}), keepttl=True)
+
+
+def test_stale_entry_is_served_and_revalidated(cache_app: CacheApp) -> None:
+    client, fake, _, calls = cache_app
+    client.get("/things")
+    asyncio.run(_expire_entry(fake))
+
+    response = client.get("/things")
+
+    assert response.headers["x-cache"] == "STALE"
+    assert response.json() == [{"n": 1}]
+    # The background request replaced the entry with a fresh one
+    assert calls["count"] == 2
+    assert client.get("/things").json() == [{"n": 2}]
+
+
+def test_redis_errors_fail_open(cache_app: CacheApp, redis_server: fakeredis.FakeServer) -> None:
+    client, _, cache, calls = cache_app
+    redis_server.connected = False
+
+    assert client.get("/things").json() == [{"n": 1}]
+    assert client.get("/things").json() == [{"n": 2}]
+    assert cache.errors == 2
@@ -0,0 +1,87 @@
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock, patch
+
+from app.core.user_cache import CachedUser, UserCache
+
+
+def _cached_user() -> CachedUser:
+    return CachedUser(id=uuid.uuid4(), is_active=True, is_superuser=False)
+
+
+def test_hit_and_miss_counters() -> None:
+    cache = UserCache(max_size=10, ttl_seconds=60)
+    user = _cached_user()
+    assert cache.get(str(user.id)) is None
+    cache.put(str(user.id), user)
+    assert cache.get(str(user.id)) == user
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache = UserCache(max_size=10, ttl_seconds=0.01)
+    user = _cached_user()
+    cache.put(str(user.id), user)
+    time.sleep(0.02)
+    assert cache.get(str(user.id)) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_least_recently_used_entry_is_dropped() -> None:
+    cache = UserCache(max_size=2, ttl_seconds=60)
+    first, second, third = _cached_user(), _cached_user(), _cached_user()
+    cache.put(str(first.id), first)
+    cache.put(str(second.id), second)
+    # Touch the first entry so the second becomes the oldest
+    cache.get(str(first.id))
+    cache.put(str(third.id), third)
+    assert cache.get(str(second.id)) is None
+    assert cache.get(str(first.id)) == first
+    assert cache.get(str(third.id)) == third
+
+
+def test_invalidate_evicts_and_broadcasts() -> None:
+    cache = UserCache(max_size=10, ttl_seconds=60)
+    user = _cached_user()
+    cache.put(str(user.id), user)
+    with patch("app.core.user_cache.get_sync_redis") as redis_mock:
+        cache.invalidate(user.id)
+        redis_mock.return_value.publish.assert_called_once()
+    assert cache.get(str(user.id)) is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_async_invalidate_publishes_on_the_async_client() -> None:
+    cache = UserCache(max_size=10, ttl_seconds=60)
+    user = _cached_user()
+    cache.put(str(user.id), user)
+    with patch("app.core.user_cache.get_async_redis") as redis_mock:
+        redis_mock.return_value.publish = AsyncMock()
+        asyncio.run(cache.ainvalidate(user.id))
+        redis_mock.return_value.publish.assert_awaited_once_with("user-cache:evict", str(user.id))
+    assert cache.get(str(user.id)) is None
+
+
+def test_put_is_dropped_after_a_concurrent_eviction() -> None:
+    cache = UserCache(max_size=10, ttl_seconds=60)
+    user = _cached_user()
+    generation = cache.generation()
+    # Evicted by a write while the row was loading
+    cache.evict(str(user.id))
+    cache.put(str(user.id), user, generation=generation)
+    assert cache.get(str(user.id)) is None
+
+    cache.put(str(user.id), user, generation=cache.generation())
+    assert cache.get(str(user.id)) == user
+
+
+def test_broadcast_message_evicts_entry() -> None:
+    cache = UserCache(max_size=10, ttl_seconds=60)
+    user = _cached_user()
+    cache.put(str(user.id), user)
+    cache._on_message({"data": str(user.id)})
+    assert cache.get(str(user.id)) is None
@@ -0,0 +1,171 @@
+import time
+import uuid
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.exchange_rate_service import (
+    ExchangeRateMatrix,
+    ExchangeRateMatrixStore,
+    ExchangeRateService,
+)
+
+# Roughly the size of a full "latest rates" payload from the provider
+CURRENCY_COUNT = 180
+PG_DIALECT = postgresql.dialect()  # type: ignore[no-untyped-call]
+
+
+def _currency_codes(count: int) -> list[str]:
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    return [
+        "EUR",
+        *(f"{a}{b}X" for a in letters for b in letters)
+    ][:count]
+
+
+def _session_with_currencies(codes: list[str]) -> MagicMock:
+    session = MagicMock()
+    session.exec.return_value.all.return_value = [(code, uuid.uuid4()) for code in codes]
+    return session
+
+
+def test_upsert_refreshes_all_currencies_in_one_round_trip() -> None:
+    codes = _currency_codes(CURRENCY_COUNT)
+    rates = {code: 1.0 + i / 100 for i, code in enumerate(codes)}
+    session = _session_with_currencies(codes)
+    service = ExchangeRateService(db_session=session)
+
+    start = time.perf_counter()
+    written = service.upsert_exchange_rates("EUR", rates)
+    elapsed = time.perf_counter() - start
+
+    assert written == CURRENCY_COUNT
+    # One query resolves every ISO code, one statement writes every rate
+    assert session.exec.call_count == 1
+    assert session.execute.call_count == 1
+    session.commit.assert_called_once()
+    assert elapsed < 1.0
+
+    stmt = session.execute.call_args.args[0]
+    sql = str(stmt.compile(dialect=PG_DIALECT))
+    assert "ON CONFLICT (base_currency_id, target_currency_id) DO UPDATE" in sql
+    assert len(stmt.compile(dialect=PG_DIALECT).params) == CURRENCY_COUNT * 5
+
+
+def test_upsert_skips_unknown_currencies() -> None:
+    session = _session_with_currencies(["EUR", "USD"])
+    service = ExchangeRateService(db_session=session)
+
+    written = service.upsert_exchange_rates("eur", {"USD": 1.08, "XYZ": 3.2})
+
+    assert written == 1
+    session.execute.assert_called_once()
+
+
+def test_upsert_writes_one_row_per_normalized_code() -> None:
+    session = _session_with_currencies(["EUR", "USD"])
+    service = ExchangeRateService(db_session=session)
+
+    written = service.upsert_exchange_rates("EUR", {"usd": 1.07, "USD": 1.08})
+
+    assert written == 1
+    params = session.execute.call_args.args[0].compile(dialect=PG_DIALECT).params
+    assert [value for key, value in params.items() if key.startswith("rate")] == [Decimal("1.08")]
+
+
+def test_upsert_without_base_currency_writes_nothing() -> None:
+    session = _session_with_currencies(["USD"])
+    service = ExchangeRateService(db_session=session)
+
+    assert service.upsert_exchange_rates("EUR", {"USD": 1.08}) == 0
+    session.execute.assert_not_called()
+
+
+def test_update_exchange_rates_uses_payload_base() -> None:
+    service = ExchangeRateService(db_session=MagicMock())
+    with patch.object(service, "fetch_latest_rates", return_value=("USD", {"EUR": 0.92}, True)), \
+            patch.object(service, "upsert_exchange_rates", return_value=1) as upsert, \
+            patch("app.services.exchange_rate_service.http_client") as client:
+        assert service.update_exchange_rates() == 1
+    upsert.assert_called_once_with("USD", {"EUR": 0.92})
+    client.commit_validators.assert_called_once()
+
+
+def test_failed_write_leaves_validators_uncommitted() -> None:
+    service = ExchangeRateService(db_session=MagicMock())
+    with patch.object(service, "fetch_latest_rates", return_value=("EUR", {"USD": 1.08}, True)) as fetch, \
+            patch.object(service, "upsert_exchange_rates", side_effect=RuntimeError("db down")), \
+            patch("app.services.exchange_rate_service.http_client") as client:
+        with pytest.raises(RuntimeError):
+            service.update_exchange_rates()
+    assert fetch.call_args.kwargs == {"commit": False}
+    client.commit_validators.assert_not_called()
+
+
+def test_update_exchange_rates_skips_write_when_unchanged() -> None:
+    session = MagicMock()
+    service = ExchangeRateService(db_session=session)
+    with patch.object(service, "fetch_latest_rates", return_value=("EUR", {"USD": 1.08}, False)):
+        assert service.update_exchange_rates() == 0
+    session.exec.assert_not_called()
+    session.execute.assert_not_called()
+
+
+def test_rate_matrix_derives_cross_rates_through_base() -> None:
+    matrix = ExchangeRateMatrix.build("EUR", {"USD": 1.25, "GBP": 0.8})
+
+    assert matrix.rate("EUR", "USD") == pytest.approx(1.25)
+    assert matrix.rate("USD", "EUR") == pytest.approx(0.8)
+    assert matrix.rate("GBP", "USD") == pytest.approx(1.5625)
+    assert matrix.convert("usd", "gbp", 100) == pytest.approx(64.0)
+    with pytest.raises(KeyError):
+        matrix.rate("EUR", "XYZ")
+
+
+def test_rate_matrix_converts_batches_vectorized() -> None:
+    matrix = ExchangeRateMatrix.build("EUR", {"USD": 1.25, "GBP": 0.8})
+    amounts = np.arange(10_000, dtype=np.float64)
+
+    converted = matrix.convert_many(["EUR"] * len(amounts), ["USD"] * len(amounts), amounts)
+
+    assert converted.shape == (10_000,)
+    assert converted[400] == pytest.approx(500.0)
+
+
+def test_matrix_store_swaps_whole_snapshots() -> None:
+    store = ExchangeRateMatrixStore()
+    old = ExchangeRateMatrix.build("EUR", {"USD": 1.0})
+    new = ExchangeRateMatrix.build("EUR", {"USD": 2.0})
+    store.swap(old)
+    snapshot = store.current()
+
+    store.swap(new)
+
+    assert snapshot.rate("EUR", "USD") == 1.0
+    assert store.current().rate("EUR", "USD") == 2.0
+
+
+def test_service_convert_many_uses_live_matrix() -> None:
+    store = ExchangeRateMatrixStore()
+    store.swap(ExchangeRateMatrix.build("EUR", {"USD": 1.25}))
+    with patch("app.services.exchange_rate_service.exchange_rate_matrix", store):
+        rate, converted = ExchangeRateService().convert_many("EUR", "USD", [1.0, 2.0])
+    assert rate == pytest.approx(1.25)
+    assert converted == pytest.approx([1.25, 2.5])
+
+
+def test_load_rate_matrix_uses_the_stored_base() -> None:
+    session = MagicMock()
+    session.exec.return_value.first.return_value = "USD"
+    session.exec.return_value.all.return_value = [("EUR", 0.8), ("GBP", 0.75)]
+
+    matrix = ExchangeRateService(db_session=session).load_rate_matrix()
+
+    assert matrix.base == "USD"
+    assert matrix.convert("EUR", "GBP", 8) == pytest.approx(7.5)
+    sql = str(session.exec.call_args.args[0].compile(dialect=PG_DIALECT))
+    assert "iso_code = %(iso_code_1)s" in sql
+    assert session.exec.call_args.args[0].compile().params["iso_code_1"] == "USD"
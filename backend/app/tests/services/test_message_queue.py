@@ -0,0 +1,69 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.concurrency import WorkerLoop
+from app.services import message_queue
+from app.services.message_queue import RabbitPublisher
+
+
+def _fake_connection() -> MagicMock:
+    exchange = MagicMock()
+    exchange.publish = AsyncMock()
+    channel = MagicMock(is_closed=False, default_exchange=exchange)
+    channel.declare_queue = AsyncMock()
+    channel.declare_exchange = AsyncMock()
+    channel.get_exchange = AsyncMock(return_value=exchange)
+    connection = MagicMock(is_closed=False)
+    connection.channel = AsyncMock(return_value=channel)
+    connection.close = AsyncMock()
+    connection.fake_channel = channel
+    connection.fake_exchange = exchange
+    return connection
+
+
+def test_publisher_reuses_connection_and_declarations() -> None:
+    connection = _fake_connection()
+    publisher = RabbitPublisher("amqp://test", pool_size=2, confirm_batch_size=10)
+
+    async def run() -> None:
+        await publisher.publish("notifications", "a")
+        await publisher.publish("notifications", "b")
+        await publisher.close()
+
+    with patch("app.services.message_queue.aio_pika.connect_robust", AsyncMock(return_value=connection)) as connect:
+        asyncio.run(run())
+
+    connect.assert_awaited_once()
+    assert connection.channel.await_count == 2
+    connection.fake_channel.declare_queue.assert_awaited_once()
+    assert connection.fake_exchange.publish.await_count == 2
+
+
+def test_publish_batch_confirms_in_batches() -> None:
+    connection = _fake_connection()
+    publisher = RabbitPublisher("amqp://test", pool_size=1, confirm_batch_size=200)
+
+    async def run() -> int:
+        return await publisher.publish_batch("notifications", (f"m{i}" for i in range(450)), exchange="events")
+
+    with patch("app.services.message_queue.aio_pika.connect_robust", AsyncMock(return_value=connection)):
+        assert asyncio.run(run()) == 450
+
+    assert connection.fake_exchange.publish.await_count == 450
+    connection.fake_channel.declare_exchange.assert_awaited_once()
+
+
+def test_sync_facade_reuses_one_loop_per_process() -> None:
+    connection = _fake_connection()
+    loop = WorkerLoop("test-worker-loop")
+
+    with patch("app.services.message_queue.aio_pika.connect_robust", AsyncMock(return_value=connection)) as connect, \
+            patch.object(message_queue, "worker_loop", loop), \
+            patch.object(message_queue, "_worker_publisher", None):
+        message_queue.send_message("notifications", "a")
+        first_loop = loop.loop
+        message_queue.send_message("notifications", "b")
+        assert loop.loop is first_loop
+
+    connect.assert_awaited_once()
+    assert connection.fake_exchange.publish.await_count == 2
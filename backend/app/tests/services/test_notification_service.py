@@ -0,0 +1,188 @@
+import asyncio
+import json
+from collections.abc import Iterator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from app.services.notification_service import NotificationService, chunked
+
+
+def _service(insert_many: AsyncMock) -> tuple[NotificationService, MagicMock]:
+    collection = MagicMock()
+    collection.insert_many = insert_many
+    counters = MagicMock()
+    counters.bulk_write = AsyncMock()
+    counters.update_one = AsyncMock()
+    collection.aggregate.return_value.to_list = AsyncMock(return_value=[])
+    publisher = MagicMock()
+    publisher.publish = AsyncMock()
+    db = {"notifications": collection, "notification_counters": counters}
+    return NotificationService(db=db, publisher=publisher), publisher
+
+
+def _inserted(documents: list[dict[str, Any]], **_kwargs: Any) -> MagicMock:
+    return MagicMock(inserted_ids=list(range(len(documents))))
+
+
+def test_chunked_is_lazy() -> None:
+    def ids() -> Iterator[int]:
+        yield from range(5)
+        raise AssertionError("consumed past the second chunk")
+
+    chunks = chunked(ids(), 2)
+    assert next(chunks) == [0, 1]
+    assert next(chunks) == [2, 3]
+
+
+def test_fan_out_writes_and_publishes_once_per_chunk() -> None:
+    insert_many = AsyncMock(side_effect=_inserted)
+    service, publisher = _service(insert_many)
+
+    report = asyncio.run(service.fan_out(range(2500), "system", "hello", chunk_size=1000))
+
+    assert report.recipients == 2500
+    assert report.inserted == 2500
+    assert [chunk.size for chunk in report.chunks] == [1000, 1000, 500]
+    assert insert_many.await_count == 3
+    assert insert_many.await_args is not None
+    assert insert_many.await_args.kwargs["ordered"] is False
+    assert publisher.publish.await_count == 3
+    assert publisher.publish.await_args is not None
+    body = json.loads(publisher.publish.await_args.args[1])
+    assert body["user_ids"][0] == "2000"
+    assert report.as_dict()["chunks"][0]["per_second"] >= 0
+
+
+def test_fan_out_counts_partial_chunk_failures() -> None:
+    insert_many = AsyncMock(side_effect=BulkWriteError({"nInserted": 7, "writeErrors": [{}] * 3}))
+    service, publisher = _service(insert_many)
+
+    report = asyncio.run(service.fan_out(range(10), "system", "hello", chunk_size=10))
+
+    assert report.inserted == 7
+    publisher.publish.assert_awaited_once()
+    # Recounted with one grouped query rather than one per user
+    service.collection.aggregate.assert_called_once()
+
+
+def test_retried_fan_out_skips_delivered_notifications() -> None:
+    duplicate = {"code": 11000}
+    insert_many = AsyncMock(side_effect=BulkWriteError({"nInserted": 2, "writeErrors": [duplicate] * 8}))
+    service, publisher = _service(insert_many)
+
+    report = asyncio.run(service.fan_out(range(10), "system", "hello", chunk_size=10, fan_out_id="task-1"))
+
+    assert (report.inserted, report.duplicates) == (2, 8)
+    assert insert_many.await_args is not None
+    assert {doc["fan_out_id"] for doc in insert_many.await_args.args[0]} == {"task-1"}
+    # The chunk is announced again under the same id, for consumers to drop
+    assert publisher.publish.await_args is not None
+    assert publisher.publish.await_args.kwargs["message_id"] == "notification-fan-out:task-1:0"
+
+
+class _FakeCursor:
+    def __init__(self, documents: list[dict[str, Any]]):
+        self.documents = documents
+
+    def sort(self, key: str, direction: int) -> "_FakeCursor":
+        self.documents = sorted(self.documents, key=lambda d: d[key], reverse=direction == -1)
+        return self
+
+    def limit(self, n: int) -> "_FakeCursor":
+        self.documents = self.documents[:n]
+        return self
+
+    async def to_list(self, length: int) -> list[dict[str, Any]]:
+        return self.documents[:length]
+
+
+class _FakeInbox:
+    """Just enough of a Motor collection for keyset paging queries."""
+
+    def __init__(self, documents: list[dict[str, Any]]):
+        self.documents = documents
+
+    def find(self, query: dict[str, Any]) -> _FakeCursor:
+        def matches(doc: dict[str, Any]) -> bool:
+            for key, condition in query.items():
+                if isinstance(condition, dict):
+                    if "$lt" in condition and not doc[key] < condition["$lt"]:
+                        return False
+                    if "$gt" in condition and not doc[key] > condition["$gt"]:
+                        return False
+                elif doc[key] != condition:
+                    return False
+            return True
+
+        return _FakeCursor([d for d in self.documents if matches(d)])
+
+
+def _inbox_service(count: int) -> tuple[NotificationService, list[ObjectId]]:
+    ids = [ObjectId() for _ in range(count)]
+    documents = [{"_id": oid, "user_id": "u1", "is_read": i % 2 == 0} for i, oid in enumerate(ids)]
+    documents.append({"_id": ObjectId(), "user_id": "u2", "is_read": False})
+    service = NotificationService(db={"notifications": _FakeInbox(documents), "notification_counters": MagicMock()})
+    return service, ids
+
+
+def test_list_notifications_pages_with_before_and_after_cursors() -> None:
+    service, ids = _inbox_service(5)
+
+    first = asyncio.run(service.list_notifications("u1", limit=2))
+    assert [d["_id"] for d in first["data"]] == [ids[4], ids[3]]
+    assert first["after"] is None
+    assert first["before"] == str(ids[3])
+
+    second = asyncio.run(service.list_notifications("u1", limit=2, before=ObjectId(first["before"])))
+    assert [d["_id"] for d in second["data"]] == [ids[2], ids[1]]
+    assert second["after"] == str(ids[2])
+
+    last = asyncio.run(service.list_notifications("u1", limit=2, before=ObjectId(second["before"])))
+    assert [d["_id"] for d in last["data"]] == [ids[0]]
+    assert last["before"] is None
+
+    back = asyncio.run(service.list_notifications("u1", limit=2, after=ObjectId(second["after"])))
+    assert [d["_id"] for d in back["data"]] == [ids[4], ids[3]]
+    assert back["after"] is None
+    assert back["before"] == str(ids[3])
+
+
+def test_list_notifications_unread_only() -> None:
+    service, ids = _inbox_service(5)
+
+    page = asyncio.run(service.list_notifications("u1", limit=10, unread_only=True))
+
+    assert [d["_id"] for d in page["data"]] == [ids[3], ids[1]]
+
+
+def test_unread_counter_follows_reads() -> None:
+    collection = MagicMock()
+    collection.find_one_and_update = AsyncMock(side_effect=[{"user_id": "u1"}, None, None])
+    # Second call: already read; third call: someone else's or deleted
+    collection.find_one = AsyncMock(side_effect=[{"_id": ObjectId()}, None])
+    counters = MagicMock()
+    counters.update_one = AsyncMock()
+    counters.find_one = AsyncMock(return_value={"_id": "u1", "unread": 4})
+    service = NotificationService(db={"notifications": collection, "notification_counters": counters})
+
+    assert asyncio.run(service.mark_notification_as_read(str(ObjectId()), user_id="u1")) is True
+    assert asyncio.run(service.mark_notification_as_read(str(ObjectId()), user_id="u1")) is True
+    assert asyncio.run(service.mark_notification_as_read(str(ObjectId()), user_id="u1")) is False
+    counters.update_one.assert_awaited_once_with({"_id": "u1"}, {"$inc": {"unread": -1}}, upsert=True)
+    assert asyncio.run(service.get_unread_count("u1")) == 4
+
+
+def test_recount_groups_all_users_in_one_query() -> None:
+    collection = MagicMock()
+    collection.aggregate.return_value.to_list = AsyncMock(return_value=[{"_id": "u1", "unread": 3}])
+    counters = MagicMock()
+    counters.bulk_write = AsyncMock()
+    service = NotificationService(db={"notifications": collection, "notification_counters": counters})
+
+    assert asyncio.run(service.recount_unread_many(["u1", "u2"])) == {"u1": 3, "u2": 0}
+    collection.aggregate.assert_called_once()
+    counters.bulk_write.assert_awaited_once()
+    assert len(counters.bulk_write.await_args.args[0]) == 2
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from celery.exceptions import Retry  # type: ignore[import-untyped]
+
+from app.core.config import settings
+from app.core.metrics import LatencyHistogram
+from app.services import otp_delivery_service
+from app.services.otp_delivery_service import (
+    StubOTPProvider,
+    deliver_otp,
+    dispatch_otp,
+    mask_destination,
+    otp_destination,
+)
+from app.services.tasks import send_otp_task
+
+
+def test_destination_prefers_phone() -> None:
+    assert otp_destination(SimpleNamespace(phone="+15550100", email="a@example.com")) == ("sms", "+15550100")
+    assert otp_destination(SimpleNamespace(phone=None, email="a@example.com")) == ("email", "a@example.com")
+    with pytest.raises(ValueError):
+        otp_destination(SimpleNamespace(phone=None, email=None))
+
+
+def test_queued_dispatch_publishes_a_task(monkeypatch: pytest.MonkeyPatch) -> None:
+    send_task = MagicMock()
+    monkeypatch.setattr("app.core.config.settings.OTP_DELIVERY_MODE", "queued")
+    monkeypatch.setattr("app.services.otp_delivery_service.celery_worker.send_task", send_task)
+
+    asyncio.run(dispatch_otp(SimpleNamespace(phone="+15550100", email=None), "123456", 600))
+
+    name, = send_task.call_args.args
+    channel, destination, code, expires_at = send_task.call_args.kwargs["args"]
+    assert (name, channel, destination, code) == ("tasks.send_otp_task", "sms", "+15550100", "123456")
+    assert 590 < expires_at - time.time() <= 600
+
+
+def test_inline_dispatch_sends_through_the_provider(monkeypatch: pytest.MonkeyPatch) -> None:
+    provider = StubOTPProvider()
+    monkeypatch.setattr("app.core.config.settings.OTP_DELIVERY_MODE", "inline")
+    monkeypatch.setattr(otp_delivery_service, "_provider", provider)
+
+    asyncio.run(dispatch_otp(SimpleNamespace(phone=None, email="a@example.com"), "123456", 600))
+
+    assert provider.outbox[0]["channel"] == "email"
+    assert "123456" in provider.outbox[0]["body"]
+
+
+def test_task_skips_expired_codes(monkeypatch: pytest.MonkeyPatch) -> None:
+    provider = StubOTPProvider()
+    monkeypatch.setattr(otp_delivery_service, "_provider", provider)
+
+    assert send_otp_task.run("sms", "+15550100", "123456", time.time() - 1) == {"status": "expired"}
+    assert provider.outbox == []
+
+
+def test_task_retries_then_dead_letters(monkeypatch: pytest.MonkeyPatch) -> None:
+    provider = MagicMock()
+    provider.send_sms.side_effect = ConnectionError("provider down")
+    monkeypatch.setattr(otp_delivery_service, "_provider", provider)
+    args = ("sms", "+15550100", "123456", time.time() + 600)
+
+    retry = MagicMock(side_effect=Retry())
+    monkeypatch.setattr(send_otp_task, "retry", retry)
+    send_otp_task.push_request(retries=1)
+    try:
+        with pytest.raises(Retry):
+            send_otp_task.run(*args)
+    finally:
+        send_otp_task.pop_request()
+    assert retry.call_args.kwargs["countdown"] == 2 * settings.OTP_DELIVERY_RETRY_BACKOFF_SECONDS
+
+    producer = MagicMock()
+    acquire = MagicMock()
+    acquire.return_value.__enter__.return_value = producer
+    monkeypatch.setattr("app.services.otp_delivery_service.celery_worker.producer_or_acquire", acquire)
+    send_otp_task.push_request(retries=send_otp_task.max_retries)
+    try:
+        assert send_otp_task.run(*args) == {"status": "dead_lettered"}
+    finally:
+        send_otp_task.pop_request()
+    record, = producer.publish.call_args.args
+    assert producer.publish.call_args.kwargs["routing_key"] == "otp.dead"
+    assert record["destination"] == "*****0100"
+    assert "123456" not in str(record)
+
+
+def test_destinations_are_masked() -> None:
+    assert mask_destination("sms", "+15550100") == "*****0100"
+    assert mask_destination("email", "alice@example.com") == "a***@example.com"
+
+
+def test_stub_provider_keeps_messages() -> None:
+    provider = StubOTPProvider()
+
+    deliver_otp("sms", "+15550100", "654321", provider)
+
+    assert provider.outbox == [{"channel": "sms", "to": "+15550100", "body": provider.outbox[0]["body"]}]
+    assert provider.outbox[0]["body"].endswith("654321")
+
+
+def test_histogram_quantiles_use_bucket_bounds() -> None:
+    histogram = LatencyHistogram(buckets=(0.01, 0.1, 1.0))
+    for seconds in [0.005] * 90 + [0.05] * 9 + [2.0]:
+        histogram.record(seconds)
+
+    snapshot = histogram.snapshot()
+
+    assert snapshot["count"] == 100
+    assert (snapshot["p50_seconds"], snapshot["p95_seconds"], snapshot["max_seconds"]) == (0.01, 0.1, 2.0)
+    assert snapshot["buckets"] == {"le_0.01": 90, "le_0.1": 9, "le_1.0": 0, "le_inf": 1}
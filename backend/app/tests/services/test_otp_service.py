@@ -0,0 +1,124 @@
+import asyncio
+import uuid
+
+import fakeredis
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session
+
+from app.models import OTP, User
+from app.services.otp_service import (
+    IssuedOTP,
+    OTPCooldownError,
+    OTPStatus,
+    PostgresOTPBackend,
+    RedisOTPBackend,
+)
+
+
+async def _advance(redis: fakeredis.FakeAsyncRedis, seconds: float) -> None:
+    """Bring every key's expiry `seconds` closer, as if that much time had passed."""
+    for key in await redis.keys("*"):
+        ttl = await redis.pttl(key)
+        if ttl > seconds * 1000:
+            await redis.pexpire(key, ttl - int(seconds * 1000))
+        elif ttl >= 0:
+            await redis.delete(key)
+
+
+def _postgres_backend() -> tuple[PostgresOTPBackend, uuid.UUID]:
+    # One shared connection, since the backend runs on executor threads
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    User.__table__.create(engine)
+    OTP.__table__.create(engine)
+    user_id = uuid.uuid4()
+    with engine.begin() as connection:
+        connection.execute(User.__table__.insert().values(
+            id=user_id, email="otp@example.com", hashed_password="x", is_active=True, is_superuser=False,
+        ))
+    backend = PostgresOTPBackend(lambda: Session(engine), ttl_seconds=600, cooldown_seconds=120, max_attempts=3)
+    return backend, user_id
+
+
+def _redis_backend(redis: fakeredis.FakeAsyncRedis) -> RedisOTPBackend:
+    return RedisOTPBackend(lambda: redis, ttl_seconds=600, cooldown_seconds=120, max_attempts=3)
+
+
+def test_redis_issue_then_verify_once(fake_redis: fakeredis.FakeAsyncRedis) -> None:
+    backend = _redis_backend(fake_redis)
+    user_id = uuid.uuid4()
+
+    async def run() -> tuple[IssuedOTP, OTPStatus, OTPStatus]:
+        otp = await backend.issue(user_id)
+        return otp, await backend.verify(user_id, otp.code), await backend.verify(user_id, otp.code)
+
+    otp, first, second = asyncio.run(run())
+
+    assert len(otp.code) == 6 and otp.expires_in == 600
+    assert (first, second) == (OTPStatus.VERIFIED, OTPStatus.EXPIRED)
+
+
+def test_redis_cooldown_then_resend_keeps_live_code(fake_redis: fakeredis.FakeAsyncRedis) -> None:
+    backend = _redis_backend(fake_redis)
+    user_id = uuid.uuid4()
+
+    async def run() -> tuple[IssuedOTP, IssuedOTP]:
+        first = await backend.issue(user_id)
+        with pytest.raises(OTPCooldownError) as e:
+            await backend.issue(user_id, reuse=True)
+        assert e.value.retry_after == 120
+        await _advance(fake_redis, 121)
+        return first, await backend.issue(user_id, reuse=True)
+
+    first, resent = asyncio.run(run())
+
+    assert resent.reused and resent.code == first.code
+    assert resent.expires_in == 600 - 121
+
+
+def test_redis_code_is_discarded_after_max_attempts(fake_redis: fakeredis.FakeAsyncRedis) -> None:
+    backend = _redis_backend(fake_redis)
+    user_id = uuid.uuid4()
+
+    async def run() -> list[OTPStatus]:
+        otp = await backend.issue(user_id)
+        wrong = "x" * 6
+        return [await backend.verify(user_id, wrong) for _ in range(3)] + [await backend.verify(user_id, otp.code)]
+
+    assert asyncio.run(run()) == [OTPStatus.INVALID, OTPStatus.INVALID, OTPStatus.LOCKED, OTPStatus.EXPIRED]
+
+
+def test_redis_code_expires_with_its_key(fake_redis: fakeredis.FakeAsyncRedis) -> None:
+    backend = _redis_backend(fake_redis)
+    user_id = uuid.uuid4()
+
+    async def run() -> OTPStatus:
+        otp = await backend.issue(user_id)
+        await _advance(fake_redis, 601)
+        return await backend.verify(user_id, otp.code)
+
+    assert asyncio.run(run()) == OTPStatus.EXPIRED
+
+
+def test_postgres_backend_matches_redis_semantics() -> None:
+    backend, user_id = _postgres_backend()
+
+    async def run() -> list[OTPStatus]:
+        otp = await backend.issue(user_id)
+        with pytest.raises(OTPCooldownError):
+            await backend.issue(user_id)
+        results = [await backend.verify(user_id, "x" * 6), await backend.verify(user_id, otp.code)]
+        return results + [await backend.verify(user_id, otp.code)]
+
+    assert asyncio.run(run()) == [OTPStatus.INVALID, OTPStatus.VERIFIED, OTPStatus.EXPIRED]
+
+
+def test_postgres_code_is_discarded_after_max_attempts() -> None:
+    backend, user_id = _postgres_backend()
+
+    async def run() -> list[OTPStatus]:
+        otp = await backend.issue(user_id)
+        return [await backend.verify(user_id, "x" * 6) for _ in range(3)] + [await backend.verify(user_id, otp.code)]
+
+    assert asyncio.run(run()) == [OTPStatus.INVALID, OTPStatus.INVALID, OTPStatus.LOCKED, OTPStatus.EXPIRED]
@@ -0,0 +1,138 @@
+import asyncio
+import uuid
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session
+
+from app.models import PageView, PageViewUrlRollup
+from app.services.pageview_service import (
+    PageViewBuffer,
+    _rollup_statement,
+    add_months,
+    drop_expired_page_view_partitions,
+    ensure_page_view_partitions,
+    page_view_row,
+    partition_month,
+    partition_name,
+    write_page_views,
+)
+
+PG_DIALECT = postgresql.dialect()  # type: ignore[no-untyped-call]
+
+
+def _buffer(sender: Callable[[list[list[Any]]], None], flush_size: int = 3, max_rows: int = 10) -> PageViewBuffer:
+    return PageViewBuffer(flush_size=flush_size, flush_interval=60, max_rows=max_rows, sender=sender)
+
+
+def test_buffer_flushes_in_batches_of_flush_size() -> None:
+    batches: list[list[list[Any]]] = []
+    buffer = _buffer(batches.append)
+    user_id = uuid.uuid4()
+
+    async def run() -> None:
+        for i in range(7):
+            buffer.add(page_view_row(user_id, f"/page/{i}", "agent"))
+        await buffer.flush()
+
+    asyncio.run(run())
+
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert [row[2] for batch in batches for row in batch] == [f"/page/{i}" for i in range(7)]
+    assert buffer.stats()["flushed_batches"] == 3
+    assert len(buffer) == 0
+
+
+def test_full_buffer_drops_new_page_views() -> None:
+    buffer = _buffer(lambda _batch: None, flush_size=100, max_rows=2)
+
+    async def run() -> list[bool]:
+        return [buffer.add(page_view_row(uuid.uuid4(), "/", None)) for _ in range(3)]
+
+    assert asyncio.run(run()) == [True, True, False]
+    assert buffer.dropped == 1
+
+
+def test_failed_batch_is_put_back() -> None:
+    def refuse(_batch: list[list[Any]]) -> None:
+        raise ConnectionError("broker down")
+
+    buffer = _buffer(refuse)
+
+    async def run() -> int:
+        buffer.add(page_view_row(uuid.uuid4(), "/", None))
+        return await buffer.flush()
+
+    assert asyncio.run(run()) == 0
+    assert len(buffer) == 1
+    assert buffer.failed_batches == 1
+
+
+def test_stop_flushes_remaining_rows() -> None:
+    batches: list[list[list[Any]]] = []
+    buffer = _buffer(batches.append, flush_size=100)
+
+    async def run() -> None:
+        buffer.start()
+        buffer.add(page_view_row(uuid.uuid4(), "/", None))
+        await buffer.stop()
+
+    asyncio.run(run())
+
+    assert len(batches) == 1
+
+
+def test_write_page_views_inserts_one_batch() -> None:
+    engine = create_engine("sqlite://")
+    PageView.__table__.create(engine)
+    rows = [page_view_row(uuid.uuid4(), f"/page/{i}", "agent") for i in range(5)]
+
+    with Session(engine) as session:
+        assert write_page_views(session, rows) == 5
+        assert session.scalar(select(func.count()).select_from(PageView)) == 5
+
+
+def test_partition_names_round_trip() -> None:
+    month = datetime(2026, 12, 1)
+
+    assert partition_name(month) == "pageview_y2026m12"
+    assert partition_month("pageview_y2026m12") == month
+    assert partition_month("pageview_default") is None
+    assert add_months(month, 1) == datetime(2027, 1, 1)
+    assert add_months(month, -13) == datetime(2025, 11, 1)
+
+
+def test_partitions_are_created_ahead() -> None:
+    session = MagicMock()
+
+    names = ensure_page_view_partitions(session, now=datetime(2026, 11, 20), ahead=2)
+
+    assert names == ["pageview_y2026m11", "pageview_y2026m12", "pageview_y2027m01"]
+    last = str(session.execute.call_args.args[0])
+    assert "FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')" in last
+
+
+def test_only_partitions_past_retention_are_dropped() -> None:
+    session = MagicMock()
+    session.execute.return_value.scalars.return_value.all.return_value = [
+        "pageview_y2025m09", "pageview_y2025m10", "pageview_y2026m10",
+    ]
+
+    dropped = drop_expired_page_view_partitions(session, now=datetime(2026, 11, 5), retention_months=13)
+
+    assert dropped == ["pageview_y2025m09"]
+
+
+def test_rollups_upsert_hours_from_rows_and_days_from_hours() -> None:
+    start, end = datetime(2026, 1, 1), datetime(2026, 1, 2)
+
+    hourly = str(_rollup_statement(PageViewUrlRollup, "url", "hour", start, end).compile(dialect=PG_DIALECT))
+    daily = str(_rollup_statement(PageViewUrlRollup, "url", "day", start, end).compile(dialect=PG_DIALECT))
+
+    assert "FROM pageview " in hourly and "date_trunc('hour', pageview.timestamp)" in hourly
+    assert "FROM pageviewurlrollup" in daily and "sum(pageviewurlrollup.views)" in daily
+    assert "ON CONFLICT (grain, bucket, url) DO UPDATE SET views = excluded.views" in daily
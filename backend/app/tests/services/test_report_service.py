@@ -0,0 +1,74 @@
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+from unittest.mock import MagicMock
+
+from sqlalchemy import func
+from sqlmodel import select
+
+from app.models import Record, ReportWatermark
+from app.models.user import RecordType
+from app.services.report_service import REPORTS, ReportEngine, ReportSection
+
+
+def _session(rows: Iterable[tuple[Any, ...]] = (), watermark: datetime | None = None) -> MagicMock:
+    session = MagicMock()
+    session.get.return_value = ReportWatermark(name="daily", watermark=watermark) if watermark else None
+    session.exec.return_value.partitions.return_value = [list(rows)]
+    return session
+
+
+def test_window_starts_at_watermark_and_ends_on_full_hour() -> None:
+    engine = ReportEngine(_session(watermark=datetime(2026, 3, 1, 0, 0)))
+
+    since, until = engine.window("daily", now=datetime(2026, 3, 2, 0, 10, 42))
+
+    assert since == datetime(2026, 3, 1, 0, 0)
+    assert until == datetime(2026, 3, 2, 0, 0)
+
+
+def test_first_run_looks_back_a_default_window() -> None:
+    engine = ReportEngine(_session())
+
+    since, until = engine.window("daily", now=datetime(2026, 3, 2, 0, 10))
+
+    assert (until - since).total_seconds() == 24 * 3600
+
+
+def test_build_renders_sections_and_keeps_watermark() -> None:
+    section = ReportSection(
+        "Records by type", ("Type", "Records"),
+        lambda since, until: select(Record.record_type, func.count()).group_by(Record.record_type),
+    )
+    rows = [(RecordType.TYPE_A, 3), ("<script>", 2), (RecordType.TYPE_B, 1)]
+    session = _session(rows)
+    engine = ReportEngine(session, reports={"daily": [section]}, max_rows=2)
+
+    report = engine.build("daily", now=datetime(2026, 3, 2, 0, 10))
+
+    assert report.sections[0].rows == [("Type A", 3), ("<script>", 2)]
+    assert report.sections[0].truncated
+    assert "<td>Type A</td>" in report.html
+    assert "&lt;script&gt;" in report.html
+    assert "Showing the top 2 rows" in report.html
+    assert session.exec.call_args.args[0].get_execution_options()["yield_per"] == engine.chunk_size
+    session.merge.assert_not_called()
+
+
+def test_commit_watermark_moves_to_end_of_window() -> None:
+    session = _session()
+    engine = ReportEngine(session, reports={"daily": []})
+    report = engine.build("daily", now=datetime(2026, 3, 2, 0, 10))
+
+    engine.commit_watermark(report)
+
+    saved = session.merge.call_args.args[0]
+    assert (saved.name, saved.watermark) == ("daily", datetime(2026, 3, 2, 0, 0))
+    session.commit.assert_called_once()
+
+
+def test_daily_report_reads_rollups_not_raw_page_views() -> None:
+    statements = [str(section.query(datetime(2026, 3, 1), datetime(2026, 3, 2))) for section in REPORTS["daily"]]
+
+    assert not any("FROM pageview " in statement or statement.endswith("FROM pageview") for statement in statements)
+    assert any("pageviewurlrollup" in statement for statement in statements)
@@ -0,0 +1,119 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import DateTime, Integer, Uuid, create_engine, func, inspect, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlmodel import Session
+
+from app.services.retention_service import (
+    RetentionEngine,
+    RetentionPolicy,
+    RetentionResult,
+)
+
+NOW = datetime(2026, 6, 1)
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Event(Base):
+    __tablename__ = "event"
+
+    id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+class Reading(Base):
+    __tablename__ = "reading"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    taken_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+
+
+def _session(model: type[Base], column: str, expired: int, kept: int) -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    for i in range(expired + kept):
+        age = timedelta(days=40 + i) if i < expired else timedelta(days=i - expired)
+        session.add(model(**{"id": i + 1} if model is Reading else {}, **{column: NOW - age}))
+    session.commit()
+    return session
+
+
+def _policy(name: str, model: type[Base], column: str, monkeypatch: pytest.MonkeyPatch) -> RetentionPolicy:
+    monkeypatch.setattr("app.core.config.settings.RETENTION_DAYS", {name: 30})
+    return RetentionPolicy(name, model, column)
+
+
+def test_expired_rows_are_deleted_in_bounded_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _session(Event, "created_at", expired=23, kept=7)
+    pauses: list[float] = []
+    engine = RetentionEngine(session, batch_size=10, pause_seconds=0.5, sleep=pauses.append)
+
+    result = engine.apply(_policy("event", Event, "created_at", monkeypatch), now=NOW)
+
+    assert result.deleted == 23
+    assert result.batches == 3
+    assert pauses == [0.5, 0.5]
+    assert session.scalar(select(func.count()).select_from(Event)) == 7
+    assert result.as_dict()["rows_per_second"] > 0
+
+
+def test_supporting_index_is_created(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _session(Event, "created_at", expired=1, kept=1)
+
+    RetentionEngine(session, sleep=lambda _: None).apply(_policy("event", Event, "created_at", monkeypatch), now=NOW)
+
+    indexes = {index["name"]: index["column_names"] for index in inspect(session.get_bind()).get_indexes("event")}
+    assert indexes["ix_event_retention"] == ["created_at", "id"]
+
+
+def test_composite_primary_keys_are_deleted_by_tuple(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _session(Reading, "taken_at", expired=5, kept=3)
+
+    result = RetentionEngine(session, batch_size=2, sleep=lambda _: None).apply(
+        _policy("reading", Reading, "taken_at", monkeypatch), now=NOW
+    )
+
+    assert result.deleted == 5
+    assert session.scalar(select(func.count()).select_from(Reading)) == 3
+
+
+def test_time_budget_stops_the_run(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _session(Event, "created_at", expired=30, kept=0)
+    engine = RetentionEngine(session, batch_size=10, max_seconds=1e-9, sleep=lambda _: None)
+
+    result = engine.apply(_policy("event", Event, "created_at", monkeypatch), now=NOW)
+
+    assert result.incomplete
+    assert result.batches == 1
+
+
+def test_failing_and_missing_tables_do_not_stop_the_others(monkeypatch: pytest.MonkeyPatch) -> None:
+    session = _session(Event, "created_at", expired=2, kept=1)
+    Base.metadata.tables["reading"].drop(session.get_bind())
+    monkeypatch.setattr("app.core.config.settings.RETENTION_DAYS", {"event": 30, "reading": 30, "locked": 30})
+    engine = RetentionEngine(session, sleep=lambda _: None)
+    apply = engine.apply
+
+    def failing_apply(policy: RetentionPolicy, now: datetime | None = None) -> RetentionResult:
+        if policy.name == "locked":
+            raise OperationalError("DELETE", {}, Exception("lock timeout"))
+        return apply(policy, now)
+
+    monkeypatch.setattr(engine, "apply", failing_apply)
+    results = engine.apply_all([
+        RetentionPolicy("locked", Event, "created_at"),
+        RetentionPolicy("reading", Reading, "taken_at"),
+        RetentionPolicy("event", Event, "created_at"),
+    ], now=NOW)
+
+    assert [(result.table, result.deleted, result.error is not None) for result in results] == [
+        ("event", 0, True),
+        ("event", 2, False),
+    ]
@@ -0,0 +1,129 @@
+import asyncio
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.core.config import settings
+from app.services.social_graph_service import (
+    PROJECTIONS,
+    SocialGraphCache,
+    SocialGraphService,
+    stream_projection_rows,
+)
+
+
+def _service(records: list[dict[str, Any]] | None = None) -> tuple[SocialGraphService, MagicMock]:
+    graph = MagicMock()
+    graph.read = AsyncMock(return_value=records or [])
+    graph.write_batches = AsyncMock(side_effect=lambda query, rows, **params: len(rows))
+    return SocialGraphService(graph=graph, cache=SocialGraphCache(max_size=100, ttl_seconds=30)), graph
+
+
+def test_query_results_are_cached_per_user() -> None:
+    service, graph = _service([{"id": str(uuid.uuid4()), "full_name": "Ann", "mutual": 2}])
+    me, other = uuid.uuid4(), uuid.uuid4()
+
+    async def run() -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+        first = await service.people_you_may_know(me)
+        second = await service.people_you_may_know(me)
+        await service.people_you_may_know(other)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    assert graph.read.await_count == 2
+    assert service.cache.hits == 1
+
+
+def test_cache_entries_expire() -> None:
+    cache = SocialGraphCache(max_size=10, ttl_seconds=30)
+    cache.put(("user", "people", 20), ["cached"])
+    with patch("app.services.social_graph_service.time.monotonic", return_value=10**9):
+        assert cache.get(("user", "people", 20)) is None
+
+
+def test_invalidate_user_drops_only_that_user() -> None:
+    cache = SocialGraphCache(max_size=10, ttl_seconds=30)
+    cache.put(("a", "people", 20), [1])
+    cache.put(("a", "connections", 2, 50), [2])
+    cache.put(("b", "people", 20), [3])
+
+    cache.invalidate_user("a")
+
+    assert cache.get(("a", "people", 20)) is None
+    assert cache.get(("b", "people", 20)) == [3]
+
+
+def test_connection_hops_are_clamped() -> None:
+    service, graph = _service()
+
+    asyncio.run(service.connections(uuid.uuid4(), hops=50))
+
+    query = graph.read.call_args.args[0]
+    assert f"[:CONNECTED*1..{settings.SOCIAL_GRAPH_MAX_HOPS}]" in query
+
+
+def test_incremental_sync_filters_only_timestamped_tables() -> None:
+    since = datetime(2026, 1, 1)
+    statements = {p.name: p.statement(since) for p in PROJECTIONS}
+
+    assert statements["users"].whereclause is None
+    assert statements["professionals"].whereclause is None
+    assert statements["posts"].whereclause is not None
+    assert statements["comments"].whereclause is not None
+
+
+def test_projection_rows_are_graph_friendly() -> None:
+    user_id = uuid.uuid4()
+    row = MagicMock()
+    row._mapping = {"id": user_id, "created_at": datetime(2026, 1, 2, 3, 4), "title": "Hi"}
+    session = MagicMock()
+    session.execute.return_value = [row]
+
+    rows = list(stream_projection_rows(session, PROJECTIONS[2].statement()))
+
+    assert rows == [{"id": str(user_id), "created_at": "2026-01-02T03:04:00", "title": "Hi"}]
+
+
+def test_project_writes_one_unwind_batch() -> None:
+    service, graph = _service()
+    rows = [{"id": str(uuid.uuid4()), "full_name": None, "is_active": True} for _ in range(3)]
+
+    assert asyncio.run(service.project(PROJECTIONS[0], rows)) == 3
+    assert graph.write_batches.call_args.args[0].startswith("UNWIND $rows AS row")
+    assert graph.write_batches.call_args.kwargs == {"sync_run": None}
+
+
+def test_reconcile_deletes_what_the_run_did_not_write() -> None:
+    service, graph = _service()
+    deleted = iter([2, 0, 1, 0])
+
+    queries: list[tuple[Any, ...]] = []
+
+    async def write_tx(tx_func: Callable[[MagicMock], Awaitable[int]]) -> int:
+        tx = MagicMock()
+        tx.run = AsyncMock(return_value=MagicMock(single=AsyncMock(return_value={"deleted": next(deleted)})))
+        result = await tx_func(tx)
+        queries.append(tx.run.call_args.args)
+        return result
+
+    graph.write_tx = write_tx
+    posts = next(p for p in PROJECTIONS if p.name == "posts")
+
+    assert asyncio.run(service.reconcile(posts, "run-1")) == 3
+    # Batched until nothing is left, nodes first, then the derived relationships
+    assert len(queries) == 4
+    assert queries[0][0].startswith("MATCH (n:Post)")
+    assert "DETACH DELETE n" in queries[0][0]
+    assert queries[2][0].startswith("MATCH ()-[r:AUTHORED]->()")
+    assert queries[0][1] == {"sync_run": "run-1", "limit": settings.NEO4J_UNWIND_BATCH_SIZE}
+
+
+def test_comments_on_authorless_posts_are_projected() -> None:
+    comments = next(p for p in PROJECTIONS if p.name == "comments")
+
+    assert "OPTIONAL MATCH (p)<-[:AUTHORED]-(author:User)" in comments.cypher
+    assert all("$sync_run" in p.cypher for p in PROJECTIONS)
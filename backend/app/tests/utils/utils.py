@@ -2,11 +2,13 @@ import random
 import string
 from collections.abc import Generator
 from contextlib import contextmanager
+from typing import Any
 from unittest.mock import patch
 
 from fastapi.testclient import TestClient
 
 from app.core.config import settings
+from app.core.password_hasher import password_hasher
 
 
 def random_lower_string() -> str:
@@ -32,17 +34,24 @@ def get_superuser_token_headers(client: TestClient) -> dict[str, str]:
 def patch_password_hashing(*modules: str) -> Generator[None, None, None]:
     """
     Contextmanager to patch ``pwd_context`` in the given modules.
+    ``password_hasher`` runs on threads meanwhile, since the patches don't
+    reach its worker processes.
     :param modules: list of modules to patch.
     :return:
     """
-    patchers = []
+    password_hasher.shutdown()
+    patchers: list[Any] = [patch.object(password_hasher, "kind", "thread")]
+    patchers[0].start()
     for module in modules:
         patcher_p = patch(f"{module}.pwd_context.verify", lambda x, y: x == y)
         patcher_h = patch(f"{module}.pwd_context.hash", lambda x: x)
+        patcher_u = patch(f"{module}.pwd_context.verify_and_update", lambda x, y: (x == y, None))
         patcher_p.start()
         patcher_h.start()
+        patcher_u.start()
 
-        patchers.extend((patcher_p, patcher_h))
+        patchers.extend((patcher_p, patcher_h, patcher_u))
     yield
     for patcher in patchers:
         patcher.stop()
+    password_hasher.shutdown()
@@ -1,16 +1,16 @@
 import logging
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 from typing import Any
 
-import emails  # type: ignore
 import jwt
-from jinja2 import Template
 from jwt.exceptions import InvalidTokenError
 
 from app.core import security
 from app.core.config import settings
+from app.core.email_templates import email_templates
+from app.core.mail import MailMessage, get_mail_transport
+from app.workers.celery_worker import celery_worker
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,11 +21,7 @@ class EmailData:
     subject: str
 
 def render_email_template(*, template_name: str, context: dict[str, Any]) -> str:
-    template_str = (
-        Path(__file__).parent / "email-templates" / "build" / template_name
-    ).read_text()
-    html_content = Template(template_str).render(context)
-    return html_content
+    return email_templates.render(template_name, context)
 
 def send_email(
     *,
@@ -33,23 +29,23 @@ def send_email(
     subject: str = "",
     html_content: str = "",
 ) -> None:
+    """Send an email now over the pooled SMTP transport, blocking until it is accepted."""
     assert settings.emails_enabled, "no provided configuration for email variables"
-    message = emails.Message(
-        subject=subject,
-        html=html_content,
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
-    )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options["tls"] = True
-    elif settings.SMTP_SSL:
-        smtp_options["ssl"] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-    response = message.send(to=email_to, smtp=smtp_options)
-    logger.info(f"send email result: {response}")
+    get_mail_transport().send(MailMessage(to=(email_to,), subject=subject, html=html_content))
+    logger.info(f"Sent email to {email_to}")
+
+def queue_email(
+    *,
+    email_to: str,
+    subject: str = "",
+    html_content: str = "",
+) -> None:
+    """
+    Hand an email to a Celery worker, which sends it over its pooled SMTP
+    transport; use from request handlers instead of `send_email`.
+    """
+    message = MailMessage(to=(email_to,), subject=subject, html=html_content)
+    celery_worker.send_task("tasks.send_mail_batch_task", args=[[message.as_dict()]])
 
 def generate_test_email(email_to: str) -> EmailData:
     project_name = settings.PROJECT_NAME